@@ -0,0 +1,79 @@
+"""
+Benchmark do CORS: custo do middleware por requisição e tempo do preflight.
+
+Mede o CorsMiddleware do projeto sobre uma view vazia (só o overhead do
+CORS), comparando com o django-cors-headers quando ele estiver instalado, e
+o preflight passando pela pilha completa de middlewares do settings.
+
+    python benchmarks/cors.py [--requests 20000]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import Client, RequestFactory  # noqa: E402
+
+from core.middleware import CorsMiddleware  # noqa: E402
+
+try:
+    from corsheaders.middleware import CorsMiddleware as CorsHeadersMiddleware  # noqa: E402
+except ImportError:
+    CorsHeadersMiddleware = None
+
+
+def empty_view(request):
+    return HttpResponse(b"{}", content_type="application/json")
+
+
+def per_request(middleware, requests):
+    started = time.perf_counter()
+    for request in requests:
+        middleware(request)
+    return (time.perf_counter() - started) / len(requests) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    origin = settings.CORS_ALLOWED_ORIGINS[0]
+    factory = RequestFactory()
+    simple = [factory.get("/api/tools/", HTTP_ORIGIN=origin) for _ in range(args.requests)]
+    preflight = [
+        factory.options("/api/tools/", HTTP_ORIGIN=origin, HTTP_ACCESS_CONTROL_REQUEST_METHOD="POST")
+        for _ in range(args.requests)
+    ]
+
+    baseline = per_request(empty_view, simple)
+    print(f"{'sem CORS':<24} {baseline:7.2f} µs/req")
+    candidates = [("core CorsMiddleware", CorsMiddleware(empty_view))]
+    if CorsHeadersMiddleware is not None:
+        candidates.append(("django-cors-headers", CorsHeadersMiddleware(empty_view)))
+    for label, middleware in candidates:
+        simple_cost = per_request(middleware, simple) - baseline
+        preflight_cost = per_request(middleware, preflight)
+        print(f"{label:<24} GET +{simple_cost:6.2f} µs/req   preflight {preflight_cost:7.2f} µs/req")
+
+    client = Client()
+    count = max(args.requests // 20, 100)
+    started = time.perf_counter()
+    for _ in range(count):
+        client.options("/api/tools/", HTTP_ORIGIN=origin, HTTP_ACCESS_CONTROL_REQUEST_METHOD="POST")
+    elapsed = (time.perf_counter() - started) / count * 1e6
+    print(f"{'preflight (pilha toda)':<24} {elapsed:7.2f} µs/req")
+
+
+if __name__ == "__main__":
+    main()
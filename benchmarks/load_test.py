@@ -0,0 +1,169 @@
+"""
+Teste de carga: latência de cauda servindo por WSGI x ASGI com o mesmo número de workers.
+
+WSGI é o gunicorn com workers síncronos (uma requisição por worker); ASGI é
+o gunicorn com o UvicornWorker, em que as leituras usam as views async
+(marketplace/async_views.py). Cada servidor sobe numa porta local e recebe
+`--requests` requisições de `--concurrency` clientes simultâneos; o script
+mostra vazão e p50/p95/p99.
+
+Por padrão cada requisição leva um parâmetro único na query (`_=<n>`), que
+não muda a resposta mas escapa do cache de respostas: toda leitura vai ao
+banco (`--cached` mantém a URL fixa). Usa o banco das settings
+(DATABASE_URL), que precisa estar migrado e com ferramentas cadastradas.
+`--db-latency` soma uma espera a cada query nos workers, simulando a rede
+até um banco remoto (o SQLite local responde em microssegundos e esconde a
+diferença entre os modos). O modo ASGI precisa do uvicorn e do
+uvicorn-worker (requirements.txt).
+
+    python benchmarks/load_test.py [--workers 2] [--concurrency 64] [--requests 4000]
+                                   [--path /api/tools/] [--db-latency 20]
+"""
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HOST = "127.0.0.1"
+
+SERVERS = {
+    "wsgi": ["core.wsgi:application"],
+    "asgi": ["core.asgi:application", "--worker-class", "uvicorn_worker.UvicornWorker"],
+}
+
+
+def post_worker_init(worker):
+    """Hook do gunicorn (--config python:benchmarks.load_test): latência simulada do banco."""
+    latency = float(os.environ.get("LOAD_TEST_DB_LATENCY", 0)) / 1000
+    if not latency:
+        return
+    from django.db.backends.utils import CursorWrapper
+
+    execute = CursorWrapper.execute
+
+    def slow_execute(self, *args, **kwargs):
+        time.sleep(latency)
+        return execute(self, *args, **kwargs)
+
+    CursorWrapper.execute = slow_execute
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, workers, port, db_latency):
+    command = [
+        sys.executable, "-m", "gunicorn", *SERVERS[mode],
+        "--config", "python:benchmarks.load_test",
+        "--workers", str(workers),
+        "--bind", f"{HOST}:{port}",
+        "--log-level", "warning",
+    ]
+    env = {**os.environ, "LOAD_TEST_DB_LATENCY": str(db_latency)}
+    return subprocess.Popen(command, cwd=ROOT, env=env)
+
+
+async def fetch(port, path):
+    """GET com Connection: close (o worker síncrono do gunicorn não mantém conexões)."""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nConnection: close\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return int(data.split(b" ", 2)[1])
+
+
+async def wait_ready(server, port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("o servidor terminou antes de responder")
+        try:
+            await fetch(port, path)
+            return
+        except (OSError, IndexError, ValueError):
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"o servidor não respondeu em {timeout}s")
+
+
+async def run_load(port, path, total, concurrency, cached):
+    latencies = []
+    errors = 0
+    counter = itertools.count()
+    separator = "&" if "?" in path else "?"
+
+    async def client():
+        nonlocal errors
+        while (number := next(counter)) < total:
+            target = path if cached else f"{path}{separator}_={number}"
+            started = time.perf_counter()
+            try:
+                status = await fetch(port, target)
+            except (OSError, IndexError, ValueError):
+                status = None
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def report(mode, latencies, errors, elapsed):
+    percentiles = statistics.quantiles(latencies, n=100)
+    p50, p95, p99 = (percentiles[index] * 1000 for index in (49, 94, 98))
+    print(
+        f"{mode:<6} {len(latencies) / elapsed:8.0f} {p50:8.1f} {p95:8.1f} {p99:8.1f}"
+        f" {max(latencies) * 1000:8.1f} {errors:6d}"
+    )
+
+
+async def benchmark(mode, args):
+    port = free_port()
+    server = start_server(mode, args.workers, port, args.db_latency)
+    try:
+        await wait_ready(server, port, args.path)
+        await run_load(port, args.path, min(args.requests, 200), args.concurrency, args.cached)  # aquecimento
+        report(mode, *await run_load(port, args.path, args.requests, args.concurrency, args.cached))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--path", default="/api/tools/")
+    parser.add_argument("--db-latency", type=float, default=0, help="espera por query, em ms")
+    parser.add_argument("--cached", action="store_true", help="URL fixa (respostas anônimas vêm do cache)")
+    parser.add_argument("--modes", nargs="+", choices=sorted(SERVERS), default=["wsgi", "asgi"])
+    args = parser.parse_args()
+
+    print(
+        f"{args.workers} workers, {args.concurrency} clientes, {args.requests} requisições em {args.path}"
+        f" (latência do banco: {args.db_latency:g} ms)"
+    )
+    print(f"{'modo':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'erros':>6}")
+    for mode in args.modes:
+        if mode == "asgi" and importlib.util.find_spec("uvicorn_worker") is None:
+            print("asgi   uvicorn-worker não instalado (pip install -r requirements.txt)")
+            continue
+        asyncio.run(benchmark(mode, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark da pilha de middlewares em requisições da API.
+
+Compara a pilha atual (sessão, CSRF, auth e mensagens só fora de /api/, ver
+core.middleware.SiteOnlyMiddleware) com a pilha completa de antes, em que
+todos os middlewares rodavam em toda requisição. Usa um endpoint da API que
+não consulta o banco (GET /api/auth/me/ sem token, 401), com e sem o cookie
+de sessão que o navegador envia quando o usuário também está logado no admin.
+
+    python benchmarks/middleware.py [--requests 5000]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.base import BaseHandler  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+
+SITE_ONLY = "core.middleware.SiteOnlyMiddleware"
+
+
+def full_stack():
+    """MIDDLEWARE com os middlewares do site no lugar do SiteOnlyMiddleware."""
+    middleware = []
+    for path in settings.MIDDLEWARE:
+        middleware.extend(settings.SITE_ONLY_MIDDLEWARE if path == SITE_ONLY else [path])
+    return middleware
+
+
+def make_handler(middleware):
+    with override_settings(MIDDLEWARE=middleware):
+        handler = BaseHandler()
+        handler.load_middleware()
+    return handler
+
+
+def per_request(handler, requests):
+    started = time.perf_counter()
+    for request in requests:
+        response = handler.get_response(request)
+        assert response.status_code == 401, response.status_code
+    return (time.perf_counter() - started) / len(requests) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    factory = RequestFactory()
+    handlers = [("pilha completa", make_handler(full_stack())), ("pilha da API", make_handler(settings.MIDDLEWARE))]
+    for label, cookies in (("sem cookie", {}), ("com cookie de sessão", {"HTTP_COOKIE": "sessionid=abc; csrftoken=x"})):
+        print(label)
+        results = []
+        for name, handler in handlers:
+            requests = [factory.get("/api/auth/me/", **cookies) for _ in range(args.requests)]
+            per_request(handler, requests[:100])  # aquecimento
+            results.append(per_request(handler, requests))
+            print(f"  {name:<16} {results[-1]:8.1f} µs/req")
+        print(f"  economia         {results[0] - results[1]:8.1f} µs/req ({1 - results[1] / results[0]:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark da serialização de listagens: caminho do DRF x caminho compilado.
+
+Usa instâncias em memória (sem banco), com as relações já associadas, como
+as views entregam ao serializer depois do select_related.
+
+    python benchmarks/serialization.py [--items 500] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import cloudinary  # noqa: E402
+from cloudinary import CloudinaryResource  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from marketplace.images import build_photo_urls  # noqa: E402
+from marketplace.models import Rental, Tool  # noqa: E402
+from marketplace.serializers import RentalSerializer, ToolSerializer  # noqa: E402
+
+
+def make_rentals(count):
+    owner = User(pk=1, username="dono")
+    renter = User(pk=2, username="locatario")
+    created = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    rentals = []
+    for index in range(count):
+        photo = CloudinaryResource(f"tools/foto{index}", version="1700000000", format="jpg",
+                                   type="upload", resource_type="image")
+        tool = Tool(
+            pk=index + 1, owner=owner, title=f"Ferramenta {index}", description="Descrição",
+            category="construcao", price_per_day=Decimal("25.00"), photo=photo,
+            photo_urls=build_photo_urls(photo), state="SP", city="São Paulo",
+            created_at=created, updated_at=created,
+        )
+        rentals.append(Rental(
+            pk=index + 1, tool=tool, renter=renter, start_date=date(2026, 2, 1),
+            end_date=date(2026, 2, 1) + timedelta(days=3), total_price=Decimal("100.00"),
+            status="pending", created_at=created, updated_at=created,
+        ))
+    return rentals
+
+
+def measure(serializer_class, instances, context, fast, repeat):
+    settings.API_FAST_SERIALIZATION = fast
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = serializer_class(instances, many=True, context=context).data
+        best = min(best, time.perf_counter() - started)
+    return best, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if not cloudinary.config().cloud_name:
+        cloudinary.config(cloud_name="benchmark")
+    context = {"request": APIRequestFactory().get("/api/rentals/")}
+    rentals = make_rentals(args.items)
+    tools = [rental.tool for rental in rentals]
+
+    for label, serializer_class, instances in (
+        ("ToolSerializer", ToolSerializer, tools),
+        ("RentalSerializer", RentalSerializer, rentals),
+    ):
+        slow, slow_data = measure(serializer_class, instances, context, False, args.repeat)
+        fast, fast_data = measure(serializer_class, instances, context, True, args.repeat)
+        assert fast_data == slow_data, f"{label}: saídas diferentes"
+        print(
+            f"{label:<17} {args.items} itens  DRF {slow * 1000:8.2f} ms  "
+            f"compilado {fast * 1000:8.2f} ms  ({slow / fast:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,10 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Servido com `gunicorn core.asgi:application -k uvicorn_worker.UvicornWorker`
+(ver Procfile). Sob ASGI as leituras da API usam as views async
+(API_ASYNC_READS, marketplace/async_views.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +16,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('API_ASYNC_READS', 'True')
 
 application = get_asgi_application()
@@ -1,47 +1,353 @@
 """
-Middleware customizado para garantir que headers CORS sejam sempre enviados
+Middlewares customizados do projeto:
+
+- CorsMiddleware: CORS com política pré-compilada e preflight respondido direto
+- StaticFilesMiddleware: WhiteNoise que também roda sob ASGI
+- CompressionMiddleware: compressão gzip/brotli das respostas da API
+- SiteOnlyMiddleware: middlewares de sessão/CSRF/mensagens só fora da API
+
+Todos funcionam nos dois modos (WSGI e ASGI): um middleware só síncrono faria
+o Django rodar o resto da pilha e as views async (marketplace/async_views.py)
+em threads, uma por requisição.
 """
+import gzip
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+
+class CorsPolicy:
+    """
+    Política CORS compilada uma vez a partir das settings: origens exatas num
+    frozenset, regexes compiladas e os headers fixos já montados em tuplas.
+    """
+
+    __slots__ = ("origins", "origin_regexes", "preflight_headers", "response_headers")
+
+    def __init__(self, origins, origin_regexes, methods, headers, expose_headers, credentials, max_age):
+        self.origins = frozenset(origin.strip().rstrip("/") for origin in origins if origin.strip())
+        self.origin_regexes = tuple(re.compile(pattern) for pattern in origin_regexes)
+        common = (("Access-Control-Allow-Credentials", "true"),) if credentials else ()
+        self.preflight_headers = common + (
+            ("Access-Control-Allow-Methods", ", ".join(method.upper() for method in methods)),
+            ("Access-Control-Allow-Headers", ", ".join(headers)),
+            ("Access-Control-Max-Age", str(max_age)),
+        )
+        self.response_headers = common + (
+            (("Access-Control-Expose-Headers", ", ".join(expose_headers)),) if expose_headers else ()
+        )
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            origins=settings.CORS_ALLOWED_ORIGINS,
+            origin_regexes=settings.CORS_ALLOWED_ORIGIN_REGEXES,
+            methods=settings.CORS_ALLOW_METHODS,
+            headers=settings.CORS_ALLOW_HEADERS,
+            expose_headers=settings.CORS_EXPOSE_HEADERS,
+            credentials=settings.CORS_ALLOW_CREDENTIALS,
+            max_age=settings.CORS_PREFLIGHT_MAX_AGE,
+        )
+
+    def allows(self, origin):
+        return origin in self.origins or any(regex.match(origin) for regex in self.origin_regexes)
+
+
+class CorsMiddleware:
+    """
+    CORS de toda a aplicação, no topo do MIDDLEWARE. A política é compilada
+    na inicialização (CorsPolicy); cada requisição faz só a busca da origem.
+    Preflights (OPTIONS com Access-Control-Request-Method) são respondidos
+    aqui mesmo, sem passar pelo resto da pilha nem resolver a URL. Origens
+    fora da política não recebem headers CORS (o navegador bloqueia).
+    """
+
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.policy = CorsPolicy.from_settings()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.preflight_response(request)
+        if response is None:
+            response = self.add_headers(request, self.get_response(request))
+        return response
+
+    async def __acall__(self, request):
+        response = self.preflight_response(request)
+        if response is None:
+            response = self.add_headers(request, await self.get_response(request))
+        return response
+
+    def preflight_response(self, request):
+        if request.method != "OPTIONS" or "HTTP_ACCESS_CONTROL_REQUEST_METHOD" not in request.META:
+            return None
+        origin = request.META.get("HTTP_ORIGIN")
+        response = HttpResponse()
+        if origin and self.policy.allows(origin):
+            response["Access-Control-Allow-Origin"] = origin
+            for header, value in self.policy.preflight_headers:
+                response[header] = value
+        response["Vary"] = "Origin"
+        return response
+
+    def add_headers(self, request, response):
+        origin = request.META.get("HTTP_ORIGIN")
+        if origin and self.policy.allows(origin):
+            response["Access-Control-Allow-Origin"] = origin
+            for header, value in self.policy.response_headers:
+                response[header] = value
+        patch_vary_headers(response, ("Origin",))
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware que também roda em modo async (o original é só
+    síncrono). Sob ASGI, os arquivos estáticos são servidos numa thread
+    (leitura do disco) e as demais requisições seguem direto para a pilha.
+    """
+
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+# Tipos de conteúdo que valem a pena comprimir (imagens e arquivos já comprimidos não)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.oai.openapi",
+    "image/svg+xml",
+)
+
+# Nível de compressão para respostas dinâmicas: bom ganho sem pesar na CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def accepted_encodings(header):
+    """Codificações aceitas no Accept-Encoding, com q > 0."""
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = accepted_encodings(header)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
 
 
-class CorsMiddleware(MiddlewareMixin):
+def _is_compressible(response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith(("+json", "+xml"))
+
+
+class CompressionMiddleware(MiddlewareMixin):
     """
-    Middleware que força headers CORS para todas as requisições.
-    Garante que funcionem mesmo se django-cors-headers tiver problemas.
+    Comprime as respostas da API (API_PATH_PREFIX) com brotli (se o pacote
+    estiver instalado) ou gzip, conforme o Accept-Encoding. Ignora respostas
+    menores que RESPONSE_COMPRESSION_MIN_SIZE, streaming, já codificadas, com
+    Cache-Control: no-transform ou de tipos já comprimidos (imagens). Os
+    estáticos já saem pré-comprimidos pelo WhiteNoise.
+
+    Como no GZipMiddleware do Django, o ETag forte vira fraco (W/"..."): os
+    bytes mudaram. As precondições da API (marketplace/conditional.py e o
+    cache de respostas) aceitam a forma fraca, já que os ETags identificam a
+    versão do recurso (id + updated_at). O Vary: Accept-Encoding separa as
+    codificações nos caches intermediários.
     """
 
     def process_response(self, request, response):
-        # Origem permitida (da variável de ambiente)
-        import os
-        allowed_origins_env = os.environ.get('CORS_ALLOWED_ORIGINS', '').strip()
-        origin = request.META.get('HTTP_ORIGIN', '')
-
-        # Se temos origem configurada
-        if allowed_origins_env:
-            # Remove barras finais e espaços
-            allowed_list = [o.strip().rstrip('/') for o in allowed_origins_env.split(',') if o.strip()]
-
-            # Se a origem da requisição está na lista de permitidas
-            if origin in allowed_list:
-                response['Access-Control-Allow-Origin'] = origin
-            elif allowed_list:
-                # Se não está na lista mas temos origens configuradas, usa a primeira
-                # Isso permite que funcione mesmo se a origem não corresponder exatamente
-                response['Access-Control-Allow-Origin'] = allowed_list[0]
+        if not request.path.startswith(settings.API_PATH_PREFIX):
+            return response
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < settings.RESPONSE_COMPRESSION_MIN_SIZE or not _is_compressible(response):
+            return response
+        if "no-transform" in response.get("Cache-Control", ""):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
         else:
-            # Fallback para desenvolvimento (localhost)
-            if origin and ('localhost' in origin or '127.0.0.1' in origin):
-                response['Access-Control-Allow-Origin'] = origin
+            compressed = gzip.compress(response.content, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = f"W/{etag}"
+        return response
+
+
+class SiteOnlyMiddleware:
+    """
+    Executa os middlewares de SITE_ONLY_MIDDLEWARE (sessão, CSRF, auth do
+    Django, mensagens) apenas fora de API_PATH_PREFIX. A API autentica só
+    por JWT e as views do DRF já são csrf_exempt: em /api/ a requisição
+    segue direto, sem carregar sessão nem montar o storage de mensagens.
+    /admin/ e a página inicial passam pela pilha completa, na ordem da lista.
+
+    Os hooks process_view/process_exception/process_template_response dos
+    middlewares internos são repassados por este, que o Django registra.
+    Sob ASGI os middlewares internos rodam em modo async (os do Django
+    suportam) e os hooks são async: o Django levaria um hook síncrono a uma
+    thread em toda requisição, e aqui isso só acontece fora da API.
+    """
+
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.api_prefix = settings.API_PATH_PREFIX
+        self.middleware = []
+        handler = get_response
+        for middleware_path in reversed(settings.SITE_ONLY_MIDDLEWARE):
+            try:
+                middleware = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            self.middleware.insert(0, middleware)
+            handler = convert_exception_to_response(middleware)
+        self.site_handler = handler
+        self.view_hooks = [m.process_view for m in self.middleware if hasattr(m, "process_view")]
+        self.exception_hooks = [
+            m.process_exception for m in reversed(self.middleware) if hasattr(m, "process_exception")
+        ]
+        self.template_hooks = [
+            m.process_template_response for m in reversed(self.middleware)
+            if hasattr(m, "process_template_response")
+        ]
+
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+            self.process_exception = self.aprocess_exception
+            self.process_template_response = self.aprocess_template_response
+
+    def is_api(self, request):
+        return request.path_info.startswith(self.api_prefix)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.is_api(request):
+            return self.get_response(request)
+        return self.site_handler(request)
+
+    async def __acall__(self, request):
+        if self.is_api(request):
+            return await self.get_response(request)
+        return await self.site_handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        return self.run_view_hooks(request, view_func, view_args, view_kwargs)
+
+    def process_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        return self.run_exception_hooks(request, exception)
+
+    def process_template_response(self, request, response):
+        if self.is_api(request):
+            return response
+        return self.run_template_hooks(request, response)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        return await sync_to_async(self.run_view_hooks)(request, view_func, view_args, view_kwargs)
+
+    async def aprocess_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        return await sync_to_async(self.run_exception_hooks)(request, exception)
+
+    async def aprocess_template_response(self, request, response):
+        if self.is_api(request):
+            return response
+        return await sync_to_async(self.run_template_hooks)(request, response)
 
-        # Headers CORS sempre presentes se tivermos origem configurada
-        if 'Access-Control-Allow-Origin' in response:
-            response['Access-Control-Allow-Methods'] = 'GET, POST, PUT, PATCH, DELETE, OPTIONS'
-            response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-CSRFToken, X-Requested-With'
-            response['Access-Control-Allow-Credentials'] = 'true'
-            response['Access-Control-Max-Age'] = '86400'  # 24 horas
+    def run_view_hooks(self, request, view_func, view_args, view_kwargs):
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
 
-        # Responde OPTIONS requests (preflight) com sucesso
-        if request.method == 'OPTIONS':
-            response.status_code = 200
+    def run_exception_hooks(self, request, exception):
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
 
+    def run_template_hooks(self, request, response):
+        for hook in self.template_hooks:
+            response = hook(request, response)
         return response
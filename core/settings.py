@@ -1,4 +1,5 @@
 from pathlib import Path
+import importlib.util
 import os
 from datetime import timedelta
 import dj_database_url
@@ -33,28 +34,39 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'cloudinary_storage',  # Cloudinary para armazenamento de mídia (deve vir antes de staticfiles)
     'django.contrib.staticfiles',
+    # Depois de staticfiles: os estáticos ficam com o WhiteNoise, e o collectstatic
+    # do cloudinary_storage (que só envia para o Cloudinary) não substitui o do Django
+    'cloudinary_storage',  # Cloudinary para armazenamento de mídia
     'rest_framework',
     'drf_spectacular',  # Swagger/OpenAPI documentation
-    'corsheaders',  # CORS headers para permitir requisições do frontend
     'cloudinary',  # SDK do Cloudinary
     'marketplace',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.CorsMiddleware',  # CORS; responde os preflights antes do resto da pilha
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise para servir arquivos estáticos
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'core.middleware.CorsMiddleware',  # Middleware CORS customizado (FORÇA headers CORS)
-    'corsheaders.middleware.CorsMiddleware',  # CORS middleware do django-cors-headers (backup)
+    'core.middleware.StaticFilesMiddleware',  # WhiteNoise para servir arquivos estáticos (também sob ASGI)
+    'core.middleware.CompressionMiddleware',  # gzip/brotli das respostas da API (estáticos já vêm comprimidos)
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.SiteOnlyMiddleware',  # SITE_ONLY_MIDDLEWARE, exceto em /api/
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Middlewares só do site (admin, página inicial). A API autentica por JWT e
+# não usa sessão, CSRF nem mensagens (ver core.middleware.SiteOnlyMiddleware)
+API_PATH_PREFIX = '/api/'
+SITE_ONLY_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# O admin procura esses middlewares direto em MIDDLEWARE; eles estão em SITE_ONLY_MIDDLEWARE
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -111,6 +123,31 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hash de senhas (marketplace/hashers.py): "scrypt" (padrão), "argon2" (requer
+# argon2-cffi; sem ele usa scrypt) ou "pbkdf2" (padrão do Django, mais lento).
+# Hashes de outro perfil continuam válidos e são regravados no próximo login
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'scrypt')
+if PASSWORD_HASHER_PROFILE == 'argon2' and importlib.util.find_spec('argon2') is None:
+    PASSWORD_HASHER_PROFILE = 'scrypt'
+_PASSWORD_HASHER_PROFILES = {
+    'scrypt': 'marketplace.hashers.TunedScryptPasswordHasher',
+    'argon2': 'marketplace.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE],
+    *(hasher for profile, hasher in _PASSWORD_HASHER_PROFILES.items() if profile != PASSWORD_HASHER_PROFILE),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+# scrypt: ~16 MiB e ~80 ms por hash com os valores padrão (n=2^14, r=8, p=1)
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.environ.get('PASSWORD_SCRYPT_BLOCK_SIZE', 8))
+PASSWORD_SCRYPT_PARALLELISM = int(os.environ.get('PASSWORD_SCRYPT_PARALLELISM', 1))
+# argon2id: memória em KiB
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 65536))
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', 2))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -137,9 +174,20 @@ STATICFILES_DIRS = [
     BASE_DIR / 'core' / 'static',
 ]
 
-# WhiteNoise para servir arquivos estáticos em produção
-# Usa CompressedStaticFilesStorage (mais simples) em vez de CompressedManifestStaticFilesStorage
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# WhiteNoise para servir arquivos estáticos em produção. O collectstatic grava os
+# arquivos com hash do conteúdo no nome (manifest) e as versões .gz e .br (com o
+# pacote Brotli); os arquivos com hash são servidos com Cache-Control de 10 anos
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Respostas menores que isso (bytes) não são comprimidas (core.middleware.CompressionMiddleware)
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -177,14 +225,93 @@ else:
     MEDIA_URL = '/media/'
     MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Pipeline assíncrono de fotos (ver marketplace/photos.py)
+# Sem Cloudinary configurado, as fotos são gravadas localmente (LocalPhotoBackend)
+TOOL_PHOTO_BACKEND = os.environ.get(
+    'TOOL_PHOTO_BACKEND',
+    'marketplace.photos.CloudinaryPhotoBackend' if CLOUDINARY_CLOUD_NAME and CLOUDINARY_API_KEY and CLOUDINARY_API_SECRET
+    else 'marketplace.photos.LocalPhotoBackend',
+)
+# thread (worker no próprio processo), inline (logo após o commit) ou off (só o comando upload_tool_photos)
+TOOL_PHOTO_WORKER = os.environ.get('TOOL_PHOTO_WORKER', 'thread')
+TOOL_PHOTO_STAGING_ROOT = os.environ.get('TOOL_PHOTO_STAGING_ROOT', os.path.join(BASE_DIR, 'media', 'staging'))
+TOOL_PHOTO_LOCAL_ROOT = os.environ.get('TOOL_PHOTO_LOCAL_ROOT', os.path.join(BASE_DIR, 'media', 'photos'))
+TOOL_PHOTO_LOCAL_URL = MEDIA_URL + 'photos/'
+# Limites da foto (validados pelo cabeçalho, sem decodificar a imagem)
+TOOL_PHOTO_MAX_DIMENSION = int(os.environ.get('TOOL_PHOTO_MAX_DIMENSION', 8000))
+TOOL_PHOTO_MAX_PIXELS = int(os.environ.get('TOOL_PHOTO_MAX_PIXELS', 40_000_000))
+# Processos que geram as miniaturas WEBP no armazenamento local
+TOOL_THUMBNAIL_WORKERS = int(os.environ.get('TOOL_THUMBNAIL_WORKERS', 2))
+
+# Cache
+# Em produção com vários workers/dynos, configure REDIS_URL para compartilhar o cache
+# entre processos. Sem ela, usa cache em memória local (desenvolvimento e testes).
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Tempo (segundos) que listagem/detalhe públicos de ferramentas ficam em cache.
+# Escritas em Tool/Rental invalidam o cache imediatamente.
+TOOL_CACHE_TIMEOUT = int(os.environ.get('TOOL_CACHE_TIMEOUT', 300))
+
+# Views async (async ORM) para as leituras de ferramentas e /api/auth/me/
+# (marketplace/async_views.py). Ligado pelo core/asgi.py: sob WSGI cada view
+# async rodaria num event loop próprio, sem ganho
+API_ASYNC_READS = os.environ.get('API_ASYNC_READS', 'False') == 'True'
+
+# Máximo de linhas por importação em massa via API (POST /api/tools/import/)
+TOOL_IMPORT_MAX_ROWS = int(os.environ.get('TOOL_IMPORT_MAX_ROWS', 10000))
+
+# Facetas sem filtro lidas da tabela agregada ToolFacetCount
+TOOL_FACETS_AGGREGATE_TABLE = os.environ.get('TOOL_FACETS_AGGREGATE_TABLE', 'True') == 'True'
+
+# Serialização compilada das respostas de leitura (ver marketplace/representation.py)
+API_FAST_SERIALIZATION = os.environ.get('API_FAST_SERIALIZATION', 'True') == 'True'
+
+# JSON da API: "orjson" (padrão; usa o json da biblioteca padrão se o orjson
+# não estiver instalado) ou "stdlib". Ver marketplace/renderers.py
+API_JSON_BACKEND = os.environ.get('API_JSON_BACKEND', 'orjson')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'marketplace.authentication.StatelessJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'marketplace.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PARSER_CLASSES': (
+        'marketplace.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Número de página por padrão; ?pagination=cursor ativa paginação por cursor (keyset)
+    'DEFAULT_PAGINATION_CLASS': 'marketplace.pagination.MarketplacePagination',
     # 9 itens por página (3 linhas x 3 colunas no grid) para alinhar com o frontend
     'PAGE_SIZE': 9,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Proxies reversos na frente da aplicação (o roteador da plataforma): o IP
+    # dos limites é o que o último proxy anexou ao X-Forwarded-For, não o que
+    # o cliente mandou no header. 0 ignora o X-Forwarded-For
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 1)),
+    # Limites de login e registro por IP e por usuário (marketplace/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.environ.get('THROTTLE_LOGIN_IP', '30/min'),
+        'login_username': os.environ.get('THROTTLE_LOGIN_USERNAME', '10/min'),
+        'register_ip': os.environ.get('THROTTLE_REGISTER_IP', '20/hour'),
+        'register_username': os.environ.get('THROTTLE_REGISTER_USERNAME', '10/hour'),
+    },
 }
 
 SIMPLE_JWT = {
@@ -192,6 +319,22 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),   # dura 7 dias
 }
 
+# Autenticação JWT (marketplace/authentication.py): leituras usam as claims do
+# token, sem consultar o usuário; escritas usam um LRU de usuários por processo.
+# As leituras sem consulta conferem a versão do usuário no cache do Django, então
+# só ficam ligadas por padrão com o cache compartilhado entre processos (REDIS_URL):
+# com cache local, os outros workers não veem a troca de senha/desativação.
+AUTH_STATELESS_READS = os.environ.get('AUTH_STATELESS_READS', str(bool(REDIS_URL))) == 'True'
+if AUTH_STATELESS_READS and not REDIS_URL:
+    print("[WARNING] AUTH_STATELESS_READS com cache local: use apenas com um único processo.")
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))  # segundos
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 1024))
+
+# Revogação de tokens (marketplace/revocation.py): intervalo de recarga do
+# filtro de Bloom de cada processo e sua taxa de falsos positivos
+AUTH_REVOCATION_REFRESH_INTERVAL = int(os.environ.get('AUTH_REVOCATION_REFRESH_INTERVAL', 30))  # segundos
+AUTH_REVOCATION_ERROR_RATE = float(os.environ.get('AUTH_REVOCATION_ERROR_RATE', 0.001))
+
 # Configurações do drf-spectacular (Swagger/OpenAPI)
 SPECTACULAR_SETTINGS = {
     'TITLE': 'My Tools API',
@@ -214,12 +357,14 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
-# Configuração CORS - Permite requisições do frontend
+# Configuração CORS - Permite requisições do frontend (core.middleware.CorsMiddleware,
+# compilada uma vez na inicialização)
 # Em produção, use variável de ambiente CORS_ALLOWED_ORIGINS separada por vírgula
 # IMPORTANTE: As origens NÃO podem ter barra final ou path (apenas domínio)
 CORS_ALLOWED_ORIGINS_ENV = os.environ.get('CORS_ALLOWED_ORIGINS', '')
+CORS_ALLOWED_ORIGIN_REGEXES = []
 if CORS_ALLOWED_ORIGINS_ENV:
-    # Remove espaços e remove barra final se houver (django-cors-headers não permite paths)
+    # Remove espaços e remove barra final se houver (origem não tem path)
     CORS_ALLOWED_ORIGINS = [
         origin.strip().rstrip('/')
         for origin in CORS_ALLOWED_ORIGINS_ENV.split(',')
@@ -233,6 +378,8 @@ else:
         "http://localhost:3000",  # Caso use outra porta
         "http://127.0.0.1:3000",  # Caso use outra porta
     ]
+    # localhost em qualquer porta
+    CORS_ALLOWED_ORIGIN_REGEXES = [r'^https?://(localhost|127\.0\.0\.1)(:\d+)?$']
 
 # Debug: Log das origens permitidas
 if DEBUG:
@@ -266,6 +413,11 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    # Requisições condicionais (ETag / Last-Modified, ver marketplace/conditional.py)
+    'if-match',
+    'if-modified-since',
+    'if-none-match',
+    'if-unmodified-since',
     'origin',
     'user-agent',
     'x-csrftoken',
@@ -275,9 +427,14 @@ CORS_ALLOW_HEADERS = [
 # Expor headers customizados
 CORS_EXPOSE_HEADERS = [
     'content-type',
+    'etag',
+    'last-modified',
     'x-total-count',
 ]
 
+# Cache do preflight no navegador (segundos)
+CORS_PREFLIGHT_MAX_AGE = 86400  # 24 horas
+
 # Configurações de Segurança para Produção
 # Aplicadas apenas quando DEBUG=False (produção)
 # NOTA: Railway já gerencia HTTPS através de proxy reverso
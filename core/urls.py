@@ -3,14 +3,13 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from rest_framework_simplejwt.views import TokenRefreshView
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
     SpectacularRedocView,
 )
 
-from marketplace.auth import CustomTokenObtainPairView
+from marketplace.auth import CustomTokenObtainPairView, CustomTokenRefreshView, LogoutView
 from core.views import home
 
 urlpatterns = [
@@ -22,7 +21,8 @@ urlpatterns = [
 
     # Rotas de autenticação JWT
     path('api/auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain'),
-    path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/auth/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
+    path('api/auth/logout/', LogoutView.as_view(), name='logout'),
 
     # Documentação Swagger/OpenAPI
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
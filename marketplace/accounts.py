@@ -0,0 +1,172 @@
+"""
+Criação de contas apoiada nas constraints do banco.
+
+O registro é um único INSERT: username repetido esbarra na constraint unique
+de auth_user.username e email repetido (sem diferenciar maiúsculas) no índice
+único user_email_ci_unique (migration 0015). A violação vira a mesma
+mensagem de erro da API, sem consultas prévias e sem condição de corrida
+entre dois registros simultâneos.
+
+`provision_users` cria contas em massa (integração de parceiros) a partir de
+linhas com a senha já em hash, com bulk_create em lotes.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Upper
+
+from .importer import INVALID_LINE_MESSAGE
+
+USERNAME_TAKEN_MESSAGE = "Nome de usuário já está em uso"
+EMAIL_TAKEN_MESSAGE = "Email já está cadastrado"
+INVALID_EMAIL_MESSAGE = "Email inválido"
+INVALID_HASH_MESSAGE = "password deve ser um hash reconhecido pelo Django (ou vazio para senha inutilizável)"
+
+# Índice único de UPPER(email) em auth_user (emails vazios ficam de fora)
+EMAIL_UNIQUE_INDEX = "user_email_ci_unique"
+
+# Constraints de unicidade de auth_user e a mensagem de cada uma. O
+# PostgreSQL informa o nome da constraint; o SQLite, só o alvo no texto do erro.
+UNIQUE_VIOLATIONS = {
+    EMAIL_UNIQUE_INDEX: EMAIL_TAKEN_MESSAGE,
+    f"index '{EMAIL_UNIQUE_INDEX}'": EMAIL_TAKEN_MESSAGE,
+    "auth_user_username_key": USERNAME_TAKEN_MESSAGE,
+    "auth_user.username": USERNAME_TAKEN_MESSAGE,
+}
+SQLITE_UNIQUE_PREFIX = "UNIQUE constraint failed: "
+
+PROVISION_CHUNK_SIZE = 1000
+PROVISION_FIELDS = ("username", "email", "password", "first_name", "last_name")
+
+
+def _violated_constraint(exc):
+    """Constraint violada no IntegrityError `exc` (nome no PostgreSQL, alvo no SQLite)."""
+    diag = getattr(exc.__cause__, "diag", None)
+    name = getattr(diag, "constraint_name", None)
+    if name:
+        return name
+    text = str(exc)
+    return text[len(SQLITE_UNIQUE_PREFIX):] if text.startswith(SQLITE_UNIQUE_PREFIX) else None
+
+
+def conflict_message(exc):
+    """Mensagem da API para a violação de unicidade `exc` (None se for outra)."""
+    return UNIQUE_VIOLATIONS.get(_violated_constraint(exc))
+
+
+def create_account(username, email, password, **extra_fields):
+    """
+    Cria o usuário num único INSERT. Levanta IntegrityError em conflito;
+    `conflict_message(exc)` dá a mensagem.
+    """
+    with transaction.atomic():
+        return get_user_model().objects.create_user(
+            username=username, email=email, password=password, **extra_fields
+        )
+
+
+def _clean_row(row):
+    """Valida uma linha de provisionamento; retorna (dados, erros)."""
+    data = {field: str(row.get(field) or "").strip() for field in PROVISION_FIELDS}
+    errors = {}
+    if not data["username"]:
+        errors["username"] = ["username é obrigatório"]
+    if not data["email"]:
+        errors["email"] = ["email é obrigatório"]
+    else:
+        try:
+            validate_email(data["email"])
+        except ValidationError:
+            errors["email"] = [INVALID_EMAIL_MESSAGE]
+    if data["password"]:
+        try:
+            identify_hasher(data["password"])
+        except ValueError:
+            errors["password"] = [INVALID_HASH_MESSAGE]
+    else:
+        data["password"] = make_password(None)
+    return data, errors
+
+
+def _taken(chunk):
+    """Usernames e emails (em maiúsculas) do lote que já existem no banco."""
+    User = get_user_model()
+    usernames = set(
+        User.objects.filter(username__in=[data["username"] for _, data in chunk]).values_list("username", flat=True)
+    )
+    emails = set(
+        User.objects.annotate(email_upper=Upper("email"))
+        .filter(email_upper__in=[data["email"].upper() for _, data in chunk])
+        .values_list("email_upper", flat=True)
+    )
+    return usernames, emails
+
+
+def _insert_chunk(chunk, errors):
+    User = get_user_model()
+    usernames, emails = _taken(chunk)
+    users = []
+    for number, data in chunk:
+        if data["username"] in usernames:
+            errors.append({"row": number, "errors": {"username": [USERNAME_TAKEN_MESSAGE]}})
+        elif data["email"].upper() in emails:
+            errors.append({"row": number, "errors": {"email": [EMAIL_TAKEN_MESSAGE]}})
+        else:
+            # Repetidos dentro do próprio lote também são recusados
+            usernames.add(data["username"])
+            emails.add(data["email"].upper())
+            users.append((number, User(**data)))
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user in users])
+        return len(users)
+    except IntegrityError:
+        pass
+
+    # Conta criada por outra conexão no meio do lote: grava uma a uma
+    created = 0
+    for number, user in users:
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+            created += 1
+        except IntegrityError as exc:
+            message = conflict_message(exc)
+            if message is None:
+                raise
+            field = "email" if message == EMAIL_TAKEN_MESSAGE else "username"
+            errors.append({"row": number, "errors": {field: [message]}})
+    return created
+
+
+def provision_users(rows, chunk_size=PROVISION_CHUNK_SIZE):
+    """
+    Cria as contas das linhas (dicts com username, email, password em hash,
+    first_name, last_name). Linhas inválidas ou repetidas não interrompem o
+    processo: são devolvidas em `errors` com o número da linha (a partir de 1).
+    """
+    created = 0
+    errors = []
+    chunk = []
+
+    for number, row in enumerate(rows, start=1):
+        if row is None:
+            errors.append({"row": number, "errors": [INVALID_LINE_MESSAGE]})
+            continue
+        data, row_errors = _clean_row(row)
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+            continue
+        chunk.append((number, data))
+        if len(chunk) >= chunk_size:
+            created += _insert_chunk(chunk, errors)
+            chunk = []
+
+    if chunk:
+        created += _insert_chunk(chunk, errors)
+
+    errors.sort(key=lambda error: error["row"])
+    return {"created": created, "errors": errors}
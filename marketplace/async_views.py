@@ -0,0 +1,122 @@
+"""
+Leituras assíncronas da API, usadas sob ASGI (API_ASYNC_READS, ligado pelo
+core/asgi.py).
+
+GET/HEAD da listagem e do detalhe de ferramentas e de /api/auth/me/ rodam
+como views async do Django, com o async ORM e o cache async: enquanto a
+consulta ao banco (ou ao Redis) não volta, o worker atende outras
+requisições em vez de ficar preso nela. A resposta é a mesma das views
+síncronas: mesmo ViewSet, serializers, ETags, cache e paginação.
+
+Os demais métodos das mesmas rotas (POST/PUT/PATCH/DELETE) seguem para as
+views síncronas do DRF, numa thread, como o Django faria com qualquer view
+síncrona sob ASGI. Autenticação, permissões e throttles (código síncrono do
+DRF e do simplejwt) também rodam numa thread antes do handler async, assim
+como a montagem do queryset filtrado: a busca textual consulta o banco
+(backend instalado, fallback por substring), o que o Django não permite no
+event loop. Em cache hit o queryset nem é montado.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
+from django.urls import URLPattern, path
+from rest_framework.response import Response
+
+from .authentication import afull_user
+from .cache import acached_response
+from .serializers import UserSerializer
+from .views import me as sync_me
+
+READ_METHODS = ("GET", "HEAD")
+
+
+def _filtered_queryset(view):
+    return view.filter_queryset(view.get_queryset())
+
+
+async def aget_object(view):
+    """GenericAPIView.get_object com o async ORM."""
+    queryset = await sync_to_async(_filtered_queryset)(view)
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    try:
+        obj = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    except (queryset.model.DoesNotExist, TypeError, ValueError, DjangoValidationError):
+        raise Http404
+    view.check_object_permissions(view.request, obj)
+    return obj
+
+
+async def tool_list(view, request, *args, **kwargs):
+    async def build_response():
+        queryset = await sync_to_async(_filtered_queryset)(view)
+        return await view.aconditional_list_response(queryset)
+
+    return await acached_response(request, build_response)
+
+
+async def tool_retrieve(view, request, *args, **kwargs):
+    async def build_response():
+        return view.conditional_object_response(await aget_object(view))
+
+    return await acached_response(request, build_response)
+
+
+async def me(view, request, *args, **kwargs):
+    # Nas leituras request.user tem só as claims do token
+    return Response(UserSerializer(await afull_user(request.user)).data)
+
+
+async def dispatch(sync_view, handler, request, *args, **kwargs):
+    """APIView.dispatch com o handler async, na instância que a view síncrona usaria."""
+    view = sync_view.cls(**sync_view.initkwargs)
+    actions = getattr(sync_view, "actions", None)
+    if actions is not None:
+        # ViewSets: initialize_request define view.action pelo método
+        view.action_map = {**actions, "head": actions["get"]}
+    view.args = args
+    view.kwargs = kwargs
+    request = view.initialize_request(request, *args, **kwargs)
+    view.request = request
+    view.headers = view.default_response_headers
+
+    try:
+        await sync_to_async(view.initial)(request, *args, **kwargs)
+        response = await handler(view, request, *args, **kwargs)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+    return view.finalize_response(request, response, *args, **kwargs)
+
+
+def async_reads(sync_view, handler):
+    """
+    View async da rota de `sync_view` (view do DRF): GET/HEAD vão para
+    `handler`, os outros métodos para a própria `sync_view`.
+    """
+    run_sync_view = sync_to_async(sync_view)
+
+    # cls/initkwargs/actions copiados: o drf-spectacular documenta a view do DRF
+    @functools.wraps(sync_view)
+    async def view(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await dispatch(sync_view, handler, request, *args, **kwargs)
+        return await run_sync_view(request, *args, **kwargs)
+
+    return view
+
+
+# Rotas do router com leitura async (os padrões com sufixo de formato inclusos)
+ROUTER_READS = {"tool-list": tool_list, "tool-detail": tool_retrieve}
+
+
+def async_urlpatterns(router):
+    """Rotas async que precedem as do router e as views síncronas de marketplace/urls.py."""
+    patterns = [
+        URLPattern(pattern.pattern, async_reads(pattern.callback, ROUTER_READS[pattern.name]),
+                   pattern.default_args, pattern.name)
+        for pattern in router.urls
+        if pattern.name in ROUTER_READS
+    ]
+    patterns.append(path("auth/me/", async_reads(sync_me, me)))
+    return patterns
@@ -1,11 +1,30 @@
 from drf_spectacular.utils import extend_schema
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from .authentication import REVOKED_MESSAGE, VERSION_CLAIM, load_user, token_user_id, token_version
+from .revocation import is_revoked, revoke_token
 from .serializers import UserSerializer
+from .throttling import LoginIPThrottle, LoginUsernameThrottle
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Claims usadas pela autenticação sem consulta ao banco (authentication.py)
+        token["username"] = user.username
+        token["is_active"] = user.is_active
+        token[VERSION_CLAIM] = token_version(user)
+        return token
+
     def validate(self, attrs):
         data = super().validate(attrs)
         data["user"] = UserSerializer(self.user).data
@@ -19,4 +38,61 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 )
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    # Antes da verificação da senha: tentativas em excesso não chegam ao hasher
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
+
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if is_revoked(refresh):
+            raise InvalidToken("O refresh token foi revogado.")
+        # Trocar a senha ou desativar o usuário também invalida os refresh tokens
+        if VERSION_CLAIM in refresh:
+            user = load_user(token_user_id(refresh))
+            if user is None or refresh[VERSION_CLAIM] != token_version(user):
+                raise InvalidToken(REVOKED_MESSAGE)
+        return super().validate(attrs)
+
+
+@extend_schema(
+    summary="Renovar access token",
+    description="Gera um novo access token a partir do refresh token (recusado se o refresh token foi revogado no logout).",
+    tags=["Autenticação"],
+)
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = RevocableTokenRefreshSerializer
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            token = RefreshToken(value)
+        except TokenError as exc:
+            raise serializers.ValidationError(str(exc))
+        if str(token[api_settings.USER_ID_CLAIM]) != str(self.context["request"].user.pk):
+            raise serializers.ValidationError("O refresh token pertence a outro usuário.")
+        return token
+
+
+@extend_schema(
+    summary="Logout",
+    description="Revoga o access token usado na requisição e, se enviado, o refresh token. Os tokens revogados deixam de ser aceitos.",
+    tags=["Autenticação"],
+    request=LogoutSerializer,
+    responses={204: None},
+)
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
 
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        if "refresh" in serializer.validated_data:
+            revoke_token(serializer.validated_data["refresh"])
+        if isinstance(request.auth, AccessToken):
+            revoke_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,222 @@
+"""
+Autenticação JWT sem consulta ao usuário a cada requisição.
+
+O JWTAuthentication do simplejwt busca o User no banco em toda requisição
+autenticada. Aqui o token de acesso carrega as claims necessárias
+(`username`, `is_active` e `ver`, a versão do token; ver
+CustomTokenObtainPairSerializer) e:
+
+- leituras (GET/HEAD/OPTIONS) usam um User montado a partir das claims, sem
+  query, se a versão atual do usuário está no cache do Django (senão o
+  usuário vem do LRU/banco, como nas escritas). O usuário completo, quando
+  necessário, vem de `full_user()`. Ligado por padrão só com o cache em
+  Redis (AUTH_STATELESS_READS): com cache local, a versão gravada por um
+  processo não chega aos outros
+- escritas (e tokens sem as claims) usam o User de um cache LRU em memória
+  do processo, com validade curta (AUTH_USER_CACHE_TTL)
+
+A versão do token é um HMAC do hash da senha e de is_active: trocar a senha
+ou desativar o usuário muda a versão e invalida os tokens emitidos antes. A
+cada save/delete de um User, os signals removem o usuário do LRU e gravam a
+versão atual no cache do Django (compartilhado entre processos com Redis),
+onde as leituras e o refresh conferem a claim `ver`.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.crypto import salted_hmac
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .revocation import is_revoked
+
+VERSION_CLAIM = "ver"
+USER_CLAIMS = ("username", "is_active", VERSION_CLAIM)
+
+# Marca de usuário removido na chave de versão
+DELETED_VERSION = "deleted"
+
+REVOKED_MESSAGE = "Token inválido: a senha foi alterada ou o usuário foi desativado."
+
+
+def token_version(user):
+    """Versão dos tokens do usuário: muda ao trocar a senha ou is_active."""
+    value = f"{user.password}:{user.is_active}"
+    return salted_hmac("marketplace.token_version", value).hexdigest()[:16]
+
+
+def _version_key(user_id):
+    return f"marketplace:auth:version:{user_id}"
+
+
+def record_user_version(user_id, version):
+    """Guarda a versão atual até os tokens emitidos antes dela expirarem (inclusive os refresh)."""
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    cache.set(_version_key(user_id), version, lifetime.total_seconds())
+
+
+class UserCache:
+    """LRU de usuários por id, com validade curta, seguro entre threads."""
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return user
+
+    def set(self, user):
+        with self.lock:
+            self.entries[user.pk] = (user, time.monotonic() + settings.AUTH_USER_CACHE_TTL)
+            self.entries.move_to_end(user.pk)
+            while len(self.entries) > settings.AUTH_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+def _is_stale(user, current_version):
+    # Alterado em outro processo desde que entrou no LRU
+    return current_version is not None and current_version != token_version(user)
+
+
+def _user_queryset(user_id):
+    return get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+
+
+def token_user_id(token):
+    """Id do usuário do token, no tipo do campo (o simplejwt grava como string)."""
+    try:
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken("O token não identifica o usuário.")
+    id_field = get_user_model()._meta.get_field(api_settings.USER_ID_FIELD)
+    return id_field.to_python(user_id)
+
+
+def load_user(user_id):
+    """
+    User completo pelo id, do LRU ou do banco (None se não existe).
+    Devolve uma cópia: a instância do LRU é compartilhada entre requisições.
+    """
+    user = user_cache.get(user_id)
+    if user is not None and _is_stale(user, cache.get(_version_key(user_id))):
+        user_cache.discard(user_id)
+        user = None
+    if user is None:
+        user = _user_queryset(user_id).first()
+        if user is None:
+            return None
+        user_cache.set(user)
+    return copy.copy(user)
+
+
+async def aload_user(user_id):
+    """load_user com o cache e o ORM async (views async, ver async_views.py)."""
+    user = user_cache.get(user_id)
+    if user is not None and _is_stale(user, await cache.aget(_version_key(user_id))):
+        user_cache.discard(user_id)
+        user = None
+    if user is None:
+        user = await _user_queryset(user_id).afirst()
+        if user is None:
+            return None
+        user_cache.set(user)
+    return copy.copy(user)
+
+
+def full_user(user):
+    """O User completo de `request.user` (que pode ter vindo só das claims)."""
+    if getattr(user, "from_token_claims", False):
+        return load_user(user.pk) or user
+    return user
+
+
+async def afull_user(user):
+    if getattr(user, "from_token_claims", False):
+        return await aload_user(user.pk) or user
+    return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        # O DRF cria os autenticadores por requisição
+        self.request_method = request.method
+        return super().authenticate(request)
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        # Logout/comprometimento; sem I/O para tokens não revogados (revocation.py)
+        if is_revoked(validated_token):
+            raise AuthenticationFailed("O token foi revogado.", code="token_revoked")
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id = token_user_id(validated_token)
+
+        has_claims = all(claim in validated_token for claim in USER_CLAIMS)
+        if has_claims and settings.AUTH_STATELESS_READS and self.request_method in SAFE_METHODS:
+            return self._user_from_claims(user_id, validated_token)
+        return self._checked_user(user_id, validated_token)
+
+    def _checked_user(self, user_id, validated_token):
+        user = load_user(user_id)
+        if user is None:
+            raise AuthenticationFailed("Usuário não encontrado.", code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed("Usuário inativo.", code="user_inactive")
+        if VERSION_CLAIM in validated_token and validated_token[VERSION_CLAIM] != token_version(user):
+            raise AuthenticationFailed(REVOKED_MESSAGE, code="token_revoked")
+        return user
+
+    def _user_from_claims(self, user_id, validated_token):
+        if not validated_token["is_active"]:
+            raise AuthenticationFailed("Usuário inativo.", code="user_inactive")
+        current = cache.get(_version_key(user_id))
+        if current is None:
+            # Versão fora do cache (expirou, foi despejada, Redis reiniciado):
+            # sem ela as claims não bastam, a versão é conferida no usuário
+            return self._checked_user(user_id, validated_token)
+        if current != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(REVOKED_MESSAGE, code="token_revoked")
+
+        User = get_user_model()
+        user = User(
+            **{api_settings.USER_ID_FIELD: user_id},
+            username=validated_token["username"],
+            is_active=True,
+        )
+        user._state.adding = False
+        user.from_token_claims = True
+        return user
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    # O drf-spectacular não aplica a extensão do simplejwt a subclasses
+    target_class = "marketplace.authentication.StatelessJWTAuthentication"
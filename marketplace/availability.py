@@ -0,0 +1,103 @@
+"""
+Calendário de disponibilidade de uma ferramenta.
+
+Os dias bloqueados (aluguéis pendentes ou aprovados) de uma janela saem de
+uma única query no índice de períodos dos aluguéis e são devolvidos de duas
+formas compactas:
+
+- `blocked`: intervalos fechados [início, fim] já mesclados (run-length)
+- `bitmap`: base64 de um bit por dia da janela, a partir de `from`
+  (bit mais significativo do primeiro byte = primeiro dia)
+
+O resultado fica em cache por ferramenta; qualquer escrita em aluguéis da
+ferramenta incrementa a geração dela (ver signals.py e booking.py). As
+gerações por ferramenta expiram com o mesmo TTL dos calendários.
+"""
+import base64
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+
+from .cache import bump_generation, get_generation
+from .filters import parse_date_param
+from .models import Rental, Tool
+
+DEFAULT_WINDOW_DAYS = 90
+MAX_WINDOW_DAYS = 366
+
+
+def _namespace(tool_id):
+    return f"availability:{tool_id}"
+
+
+def _generation_timeout():
+    # A geração de cada ferramenta expira junto com os calendários salvos:
+    # sem ela a próxima leitura só erra o cache (a nova geração vem do relógio)
+    return settings.TOOL_CACHE_TIMEOUT
+
+
+def invalidate_availability(tool_id):
+    bump_generation(_namespace(tool_id), timeout=_generation_timeout())
+
+
+def availability_window(params):
+    """Janela (from, to) pedida; padrão: hoje + DEFAULT_WINDOW_DAYS dias."""
+    start = parse_date_param(params, "from") or timezone.now().date()
+    end = parse_date_param(params, "to") or start + timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    if end < start:
+        raise ValidationError({"to": "A data final deve ser maior ou igual à data inicial."})
+    if (end - start).days + 1 > MAX_WINDOW_DAYS:
+        raise ValidationError({"to": f"A janela deve ter no máximo {MAX_WINDOW_DAYS} dias."})
+    return start, end
+
+
+def blocked_ranges(tool_id, start, end):
+    """Intervalos bloqueados dentro de [start, end], recortados e mesclados."""
+    periods = (
+        Rental.objects.active()
+        .overlapping(start, end)
+        .filter(tool_id=tool_id)
+        .order_by("start_date")
+        .values_list("start_date", "end_date")
+    )
+    ranges = []
+    for period_start, period_end in periods:
+        period_start, period_end = max(period_start, start), min(period_end, end)
+        if ranges and period_start <= ranges[-1][1] + timedelta(days=1):
+            ranges[-1][1] = max(ranges[-1][1], period_end)
+        else:
+            ranges.append([period_start, period_end])
+    return ranges
+
+
+def encode_bitmap(ranges, start, end):
+    days = (end - start).days + 1
+    bits = bytearray((days + 7) // 8)
+    for range_start, range_end in ranges:
+        for offset in range((range_start - start).days, (range_end - start).days + 1):
+            bits[offset // 8] |= 0x80 >> (offset % 8)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def tool_availability(tool_id, start, end):
+    """Calendário da janela; sem queries quando está em cache."""
+    namespace = _namespace(tool_id)
+    key = f"marketplace:{namespace}:{get_generation(namespace, timeout=_generation_timeout())}:{start}:{end}"
+    data = cache.get(key)
+    if data is None:
+        if not Tool.objects.filter(pk=tool_id).exists():
+            raise NotFound()
+        ranges = blocked_ranges(tool_id, start, end)
+        data = {
+            "tool": tool_id,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "blocked": [[first.isoformat(), last.isoformat()] for first, last in ranges],
+            "blocked_days": sum((last - first).days + 1 for first, last in ranges),
+            "bitmap": encode_bitmap(ranges, start, end),
+        }
+        cache.set(key, data, settings.TOOL_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,136 @@
+"""
+Reserva de ferramentas sem condição de corrida.
+
+A verificação de conflito e a gravação do aluguel são um único
+`INSERT ... SELECT ... WHERE NOT EXISTS (aluguel sobreposto)`, dentro de uma
+transação que também marca a ferramenta como indisponível. A garantia final
+fica no banco:
+
+- PostgreSQL: constraint de exclusão rental_no_overlap (migration 0011), que
+  barra dois aluguéis ativos sobrepostos da mesma ferramenta mesmo quando as
+  duas transações rodam ao mesmo tempo. A violação vira a mesma mensagem de
+  conflito da validação.
+- SQLite: as escritas já são serializadas pelo banco; um lock por ferramenta
+  no processo evita que requisições concorrentes disputem o lock do arquivo.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from . import facets
+from .availability import invalidate_availability
+from .cache import bump_generation
+from .models import Rental, Tool
+
+CONFLICT_MESSAGE = (
+    "Já existe um aluguel aprovado ou pendente para este período. "
+    "Escolha outras datas."
+)
+UNAVAILABLE_MESSAGE = "Esta ferramenta não está disponível para aluguel."
+
+# Nome da constraint de exclusão criada no PostgreSQL
+OVERLAP_CONSTRAINT = "rental_no_overlap"
+
+# Locks por ferramenta (em faixas, para não crescer com o número de ferramentas)
+_TOOL_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+@contextmanager
+def _tool_lock(tool_id, using):
+    if connections[using].vendor != "sqlite":
+        yield
+        return
+    with _TOOL_LOCKS[tool_id % len(_TOOL_LOCKS)]:
+        yield
+
+
+def busy_rentals(rental, using):
+    """Aluguéis ativos da mesma ferramenta que se sobrepõem ao período de `rental`."""
+    return (
+        Rental.objects.using(using)
+        .active()
+        .overlapping(rental.start_date, rental.end_date)
+        .filter(tool_id=rental.tool_id)
+    )
+
+
+def _insert_if_free(rental, using):
+    """
+    Grava o aluguel se não houver aluguel ativo sobreposto.
+    Retorna o id inserido ou None em caso de conflito.
+    """
+    connection = connections[using]
+    ops = connection.ops
+    busy = busy_rentals(rental, using).values("pk")
+    busy_sql, busy_params = busy.query.sql_with_params()
+
+    fields = [Rental._meta.get_field(name) for name in (
+        "tool", "renter", "start_date", "end_date", "total_price", "status", "created_at", "updated_at",
+    )]
+    columns = ", ".join(ops.quote_name(field.column) for field in fields)
+    values = [field.get_db_prep_save(getattr(rental, field.attname), connection) for field in fields]
+    placeholders = ", ".join(["%s"] * len(values))
+    sql = (
+        f"INSERT INTO {ops.quote_name(Rental._meta.db_table)} ({columns}) "
+        f"SELECT {placeholders} WHERE NOT EXISTS ({busy_sql})"
+    )
+    returning = connection.features.can_return_columns_from_insert
+    if returning:
+        sql += f" RETURNING {ops.quote_name(Rental._meta.pk.column)}"
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*values, *busy_params])
+        if returning:
+            row = cursor.fetchone()
+            return row[0] if row else None
+        return cursor.lastrowid if cursor.rowcount else None
+
+
+def book_tool(tool, renter, start_date, end_date, total_price, using="default"):
+    """
+    Cria um aluguel pendente e bloqueia a ferramenta, de forma atômica.
+    Levanta ValidationError se o período conflita ou a ferramenta foi
+    reservada por outra requisição.
+    """
+    now = timezone.now()
+    rental = Rental(
+        tool=tool,
+        renter=renter,
+        start_date=start_date,
+        end_date=end_date,
+        total_price=total_price,
+        status="pending",
+        created_at=now,
+        updated_at=now,
+    )
+
+    with _tool_lock(tool.pk, using):
+        try:
+            with transaction.atomic(using=using):
+                rental.pk = _insert_if_free(rental, using)
+                if rental.pk is None:
+                    raise ValidationError(CONFLICT_MESSAGE)
+                # update() e o INSERT direto não disparam signals: as facetas
+                # são ajustadas a partir da linha gravada, como em Tool.save
+                facets.tool_saving(tool, update_fields=["is_available"], using=using)
+                blocked = Tool.objects.using(using).filter(pk=tool.pk, is_available=True).update(
+                    is_available=False, updated_at=now
+                )
+                if not blocked:
+                    raise ValidationError(UNAVAILABLE_MESSAGE)
+                tool.is_available = False
+                tool.updated_at = now
+                facets.tool_saved(tool, created=False, update_fields=["is_available"], using=using)
+                bump_generation("tools")
+                invalidate_availability(tool.pk)
+        except IntegrityError as exc:
+            if OVERLAP_CONSTRAINT in str(exc):
+                raise ValidationError(CONFLICT_MESSAGE)
+            raise
+
+    rental._state.adding = False
+    rental._state.db = using
+    return rental
@@ -0,0 +1,169 @@
+"""
+Cache das respostas públicas (anônimas) de ferramentas.
+
+As chaves incluem um contador de geração: qualquer escrita em Tool ou Rental
+incrementa a geração e todas as respostas anteriores deixam de ser lidas
+(expiram sozinhas pelo timeout). Funciona com qualquer backend de cache do
+Django (LocMem nos testes, Redis/Memcached compartilhado em produção).
+"""
+import copy
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+GENERATION_KEY = "marketplace:{namespace}:generation"
+
+# Headers de validação guardados junto com o corpo da resposta
+CACHED_HEADERS = ("ETag", "Last-Modified")
+
+
+def get_generation(namespace="tools", timeout=None):
+    """
+    Geração atual do namespace. Com `timeout` a chave expira: namespaces por
+    objeto (ex.: calendário de cada ferramenta) não ficam para sempre no cache.
+    """
+    key = GENERATION_KEY.format(namespace=namespace)
+    generation = cache.get(key)
+    if generation is None:
+        # Começa de um valor baseado no relógio: se a chave for despejada do
+        # cache (ou expirar), a nova geração não colide com respostas antigas
+        cache.add(key, int(time.time() * 1000), timeout=timeout)
+        generation = cache.get(key)
+    return generation
+
+
+async def aget_generation(namespace="tools", timeout=None):
+    key = GENERATION_KEY.format(namespace=namespace)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, int(time.time() * 1000), timeout=timeout)
+        generation = await cache.aget(key)
+    return generation
+
+
+def _incr_generation(namespace, timeout=None):
+    key = GENERATION_KEY.format(namespace=namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=timeout)
+
+
+def bump_generation(namespace="tools", timeout=None):
+    """
+    Invalida as respostas em cache do namespace.
+    Incrementa agora e de novo no commit, para que uma leitura concorrente
+    feita antes do commit não fique salva na geração nova.
+    """
+    _incr_generation(namespace, timeout)
+    transaction.on_commit(lambda: _incr_generation(namespace, timeout))
+
+
+def normalize_query(query_params):
+    """Query string canônica: parâmetros equivalentes geram a mesma chave."""
+    items = []
+    for key in sorted(query_params.keys()):
+        values = [value.strip() for value in query_params.getlist(key)]
+        if key == "category":
+            values = sorted(set(values))
+        elif key == "state":
+            values = [value.upper() for value in values]
+        elif key == "search":
+            values = [value.lower() for value in values]
+        values = [value for value in values if value]
+        if values:
+            items.append((key, values))
+    return urlencode(items, doseq=True)
+
+
+def _request_digest(request):
+    # O host entra na chave porque os links de paginação e URLs são absolutos
+    url = request.build_absolute_uri(request.path) + "?" + normalize_query(request.query_params)
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def response_cache_key(request, namespace="tools"):
+    return f"marketplace:{namespace}:{get_generation(namespace)}:{_request_digest(request)}"
+
+
+def _is_cacheable(request):
+    return request.method == "GET" and not request.user.is_authenticated
+
+
+def conditional_response(request, etag=None, last_modified=None):
+    """
+    get_conditional_response que aceita a forma fraca (W/"...") dos ETags.
+
+    O CompressionMiddleware enfraquece o ETag das respostas comprimidas e o
+    cliente devolve W/"..." no If-Match. Os ETags da API identificam a versão
+    do recurso, não os bytes: o W/ é ignorado também no If-Match (o
+    If-None-Match já usa comparação fraca).
+    """
+    if etag:
+        etag = etag.removeprefix("W/")
+    if_match = request.META.get("HTTP_IF_MATCH", "")
+    if "W/" in if_match:
+        request = copy.copy(request)
+        strong = ", ".join(tag.removeprefix("W/") for tag in parse_etags(if_match))
+        request.META = {**request.META, "HTTP_IF_MATCH": strong}
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def _cached_response(request, cached):
+    data, headers = cached
+    # If-None-Match contra o ETag guardado: 304 sem tocar no banco
+    response = conditional_response(request, etag=headers.get("ETag"))
+    if response is None:
+        response = Response(data)
+    for header, value in headers.items():
+        response[header] = value
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def _cache_entry(response):
+    headers = {header: response[header] for header in CACHED_HEADERS if header in response}
+    response["X-Cache"] = "MISS"
+    return response.data, headers
+
+
+def cached_response(request, build_response, namespace="tools"):
+    """
+    Serve a resposta do cache para requisições anônimas; caso contrário
+    chama build_response() e guarda o resultado se for 200.
+    """
+    if not _is_cacheable(request):
+        return build_response()
+
+    key = response_cache_key(request, namespace)
+    cached = cache.get(key)
+    if cached is not None:
+        return _cached_response(request, cached)
+
+    response = build_response()
+    if response.status_code == 200:
+        cache.set(key, _cache_entry(response), settings.TOOL_CACHE_TIMEOUT)
+    return response
+
+
+async def acached_response(request, build_response, namespace="tools"):
+    """cached_response para views async: build_response() devolve um awaitable."""
+    if not _is_cacheable(request):
+        return await build_response()
+
+    key = f"marketplace:{namespace}:{await aget_generation(namespace)}:{_request_digest(request)}"
+    cached = await cache.aget(key)
+    if cached is not None:
+        return _cached_response(request, cached)
+
+    response = await build_response()
+    if response.status_code == 200:
+        await cache.aset(key, _cache_entry(response), settings.TOOL_CACHE_TIMEOUT)
+    return response
@@ -0,0 +1,147 @@
+"""
+GET condicional (ETag / Last-Modified) e escrita condicional (If-Match).
+
+Os ETags são calculados sem serializar nada e sem queries extras:
+- listagens: id + updated_at dos itens da página já carregada, mais o estado
+  da paginação (total/número da página ou existência de próxima/anterior)
+- detalhes: id + updated_at do objeto (e dos objetos relacionados exibidos)
+"""
+import hashlib
+
+from django.db import transaction
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .cache import conditional_response, normalize_query
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return quote_etag(digest)
+
+
+def _version(obj):
+    return f"{obj._meta.label}:{obj.pk}:{obj.updated_at.isoformat()}"
+
+
+def object_etag(*objects):
+    return make_etag(*(_version(obj) for obj in objects))
+
+
+def object_last_modified(*objects):
+    return max(obj.updated_at for obj in objects)
+
+
+def not_modified_or_failed(request, etag, last_modified=None):
+    """
+    Avalia If-None-Match / If-Modified-Since / If-Match / If-Unmodified-Since.
+    Retorna a resposta 304/412 ou None se a requisição deve prosseguir.
+    ETags fracos (respostas comprimidas) valem como o forte correspondente.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        response["ETag"] = etag
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def has_write_preconditions(request):
+    return "HTTP_IF_MATCH" in request.META or "HTTP_IF_UNMODIFIED_SINCE" in request.META
+
+
+class ConditionalResponseMixin:
+    """Respostas de listagem/detalhe com ETag, para uso em ViewSets."""
+
+    # Ligado durante uma escrita condicional: get_object trava a linha
+    lock_for_write = False
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.lock_for_write:
+            queryset = queryset.select_for_update(of=("self",))
+        return queryset
+
+    def get_etag_objects(self, instance):
+        """Objetos cujo updated_at afeta a representação de `instance`."""
+        return (instance,)
+
+    def list_etag(self, items, paginated):
+        request = self.request
+        get_page_state = getattr(self.paginator, "get_page_state", None)
+        page_state = get_page_state() if paginated and get_page_state else ()
+        versions = (_version(obj) for item in items for obj in self.get_etag_objects(item))
+        return make_etag(
+            request.path,
+            normalize_query(request.query_params),
+            request.user.pk,
+            *page_state,
+            *versions,
+        )
+
+    def conditional_list_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        items = page if page is not None else list(queryset)
+        return self.list_response(items, paginated=page is not None)
+
+    async def aconditional_list_response(self, queryset):
+        """conditional_list_response com o async ORM (ver async_views.py)."""
+        page = None
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        items = page if page is not None else [item async for item in queryset]
+        return self.list_response(items, paginated=page is not None)
+
+    def list_response(self, items, paginated):
+        etag = self.list_etag(items, paginated)
+        response = not_modified_or_failed(self.request, etag)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(items, many=True)
+        if paginated:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response(serializer.data)
+        return set_validators(response, etag)
+
+    def conditional_object_response(self, instance):
+        objects = self.get_etag_objects(instance)
+        etag = object_etag(*objects)
+        last_modified = object_last_modified(*objects)
+        response = not_modified_or_failed(self.request, etag, last_modified)
+        if response is not None:
+            return response
+
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
+
+    def check_write_preconditions(self):
+        """If-Match em PUT/PATCH/DELETE: 412 se o objeto mudou desde a leitura."""
+        instance = self.get_object()
+        objects = self.get_etag_objects(instance)
+        return not_modified_or_failed(
+            self.request, object_etag(*objects), object_last_modified(*objects)
+        )
+
+    def conditional_write(self, write):
+        """
+        Executa `write` (update/destroy) respeitando If-Match / If-Unmodified-Since.
+        A verificação e a escrita rodam na mesma transação com a linha travada
+        (SELECT ... FOR UPDATE): outra escrita não passa entre as duas.
+        """
+        if not has_write_preconditions(self.request):
+            return write()
+        with transaction.atomic(using=self.get_queryset().db):
+            self.lock_for_write = True
+            try:
+                failed = self.check_write_preconditions()
+                return failed if failed is not None else write()
+            finally:
+                self.lock_for_write = False
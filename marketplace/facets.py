@@ -0,0 +1,168 @@
+"""
+Facetas do catálogo de ferramentas: contagens por categoria, UF e
+disponibilidade.
+
+Com filtros, as contagens saem de uma única query agrupada sobre o queryset
+filtrado. Sem filtros, saem da tabela ToolFacetCount, mantida
+incrementalmente a cada save/delete de Tool (O(categorias), não O(ferramentas)).
+"""
+from collections import Counter
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Coalesce, Upper
+
+from .filters import filter_tools, has_tool_filters
+from .models import Tool, ToolFacetCount, facet_key
+
+
+def _adjust(key, delta, using="default"):
+    category, state, is_available = key
+    counts = ToolFacetCount.objects.using(using).filter(
+        category=category, state=state, is_available=is_available
+    )
+    if counts.update(count=F("count") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic(using=using):
+            ToolFacetCount.objects.using(using).create(
+                category=category, state=state, is_available=is_available, count=delta
+            )
+    except IntegrityError:
+        # Outra requisição criou a linha ao mesmo tempo
+        counts.update(count=F("count") + delta)
+
+
+# Campos que compõem a chave das facetas, na ordem de facet_key
+FACET_FIELDS = ("category", "state", "is_available")
+
+
+def _touches_facets(update_fields):
+    return update_fields is None or bool(set(FACET_FIELDS) & set(update_fields))
+
+
+def tool_saving(tool, update_fields=None, using="default"):
+    """
+    Antes do save, na mesma transação (ver Tool.save): trava a linha e lê a
+    chave gravada. O delta aplicado em tool_saved parte do que está no banco,
+    não do que a instância carregou, então saves concorrentes da mesma
+    ferramenta não descontam a chave antiga duas vezes.
+    """
+    tool._stored_facet_key = None
+    if tool.pk is None or not _touches_facets(update_fields):
+        return
+    row = (
+        Tool.objects.using(using)
+        .select_for_update()
+        .filter(pk=tool.pk)
+        .values_list(*FACET_FIELDS)
+        .first()
+    )
+    if row is not None:
+        category, state, is_available = row
+        tool._stored_facet_key = (category, (state or "").upper(), is_available)
+
+
+def _saved_key(tool, stored_key, update_fields):
+    """Chave gravada pelo save: campos não salvos (adiados ou fora de update_fields) mantêm o valor do banco."""
+    written = set(FACET_FIELDS) - tool.get_deferred_fields()
+    if update_fields is not None:
+        written &= set(update_fields)
+    if stored_key is None or written == set(FACET_FIELDS):
+        return facet_key(tool)
+    return facet_key(SimpleNamespace(**{
+        name: getattr(tool, name) if name in written else value
+        for name, value in zip(FACET_FIELDS, stored_key)
+    }))
+
+
+def tool_saved(tool, created, update_fields=None, using="default"):
+    if not created and not _touches_facets(update_fields):
+        return
+    old_key = getattr(tool, "_stored_facet_key", None)
+    new_key = _saved_key(tool, old_key, update_fields)
+    if created or old_key is None:
+        _adjust(new_key, 1, using)
+    elif old_key != new_key:
+        _adjust(old_key, -1, using)
+        _adjust(new_key, 1, using)
+    tool._facet_key = new_key
+
+
+def tools_created(tools, using="default"):
+    """Ajuste das contagens para ferramentas criadas com bulk_create (sem signals)."""
+    for key, delta in Counter(facet_key(tool) for tool in tools).items():
+        _adjust(key, delta, using)
+    for tool in tools:
+        tool._facet_key = facet_key(tool)
+
+
+def tool_deleted(tool, using="default"):
+    key = getattr(tool, "_facet_key", None) or facet_key(tool)
+    _adjust(key, -1, using)
+
+
+def _grouped_counts(queryset):
+    return (
+        queryset.order_by()
+        .values("category", "is_available", uf=Upper(Coalesce("state", Value(""))))
+        .annotate(total=Count("id"))
+        .values_list("category", "uf", "is_available", "total")
+    )
+
+
+def rebuild_facet_counts(using="default"):
+    """
+    Recalcula ToolFacetCount a partir da tabela de ferramentas.
+    Necessário após escritas que não disparam signals (update(), SQL direto);
+    ver o comando rebuild_facet_counts.
+    """
+    rows = _grouped_counts(Tool.objects.using(using))
+    with transaction.atomic(using=using):
+        ToolFacetCount.objects.using(using).all().delete()
+        ToolFacetCount.objects.using(using).bulk_create(
+            ToolFacetCount(category=category, state=state, is_available=available, count=total)
+            for category, state, available, total in rows
+        )
+
+
+def compute_facets(params):
+    """
+    Contagens de facetas para os filtros em `params`.
+
+    A faceta de categoria ignora o próprio filtro de categoria (o usuário vê
+    quantas ferramentas teria em cada categoria); as demais respeitam todos
+    os filtros. Tudo sai de uma única query agrupada.
+    """
+    if not has_tool_filters(params) and settings.TOOL_FACETS_AGGREGATE_TABLE:
+        rows = ToolFacetCount.objects.filter(count__gt=0).values_list(
+            "category", "state", "is_available", "count"
+        )
+    else:
+        rows = _grouped_counts(filter_tools(Tool.objects.all(), params, exclude={"category"}))
+
+    selected = set(params.getlist("category"))
+    categories, states, availability = Counter(), Counter(), Counter()
+    for category, state, available, total in rows:
+        categories[category] += total
+        if selected and category not in selected:
+            continue
+        states[state or None] += total
+        availability[available] += total
+
+    return {
+        "total": sum(availability.values()),
+        "category": [
+            {"value": value, "label": label, "count": categories[value]}
+            for value, label in Tool.CATEGORIES
+        ],
+        "state": [
+            {"value": state, "count": total}
+            for state, total in sorted(states.items(), key=lambda item: (item[0] is None, item[0] or ""))
+        ],
+        "available": [
+            {"value": value, "count": availability[value]} for value in (True, False)
+        ],
+    }
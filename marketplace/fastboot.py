@@ -0,0 +1,125 @@
+"""
+Inicialização rápida do servidor (`manage.py fastboot`, ver Procfile).
+
+Antes, cada início de processo rodava `migrate` e `collectstatic --clear`
+em processos Python separados. O fastboot faz as duas verificações num só
+processo e só executa o que mudou:
+
+- migrations: o plano do MigrationExecutor compara as migrations em disco
+  com a tabela django_migrations (uma query). Sem pendências, o `migrate`
+  (system checks, post_migrate com content types e permissões) é pulado.
+  A tabela é a fonte da verdade, inclusive em máquinas novas sem disco
+  persistente
+- estáticos: um fingerprint (SHA-256) dos caminhos e do conteúdo dos
+  arquivos encontrados pelos finders e do storage configurado fica gravado
+  em STATIC_ROOT junto com os arquivos coletados. Se bate e o manifest
+  existe, o `collectstatic` é pulado; senão roda sem `--clear`, removendo
+  antes só as cópias dos arquivos que mudaram (os demais não são apagados
+  nem copiados de novo)
+
+Depois o comando substitui o próprio processo pelo servidor (os.execvp),
+sem um terceiro interpretador Python.
+"""
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+# Mesmos padrões ignorados pelo collectstatic
+STATIC_IGNORE_PATTERNS = ["CVS", ".*", "*~"]
+
+MARKER_FILENAME = ".fastboot-static"
+
+
+def pending_migrations(database=DEFAULT_DB_ALIAS):
+    """Migrations em disco ainda não aplicadas no banco, na ordem do plano."""
+    executor = MigrationExecutor(connections[database])
+    targets = executor.loader.graph.leaf_nodes()
+    return [migration for migration, _ in executor.migration_plan(targets)]
+
+
+def static_sources():
+    """SHA-256 do conteúdo de cada arquivo estático de origem, pelo caminho de destino."""
+    sources = {}
+    for finder in get_finders():
+        for path, storage in finder.list(STATIC_IGNORE_PATTERNS):
+            prefix = getattr(storage, "prefix", None)
+            name = os.path.join(prefix, path) if prefix else path
+            # O primeiro encontrado vence, como no collectstatic
+            if name not in sources:
+                with storage.open(path) as source:
+                    sources[name] = hashlib.sha256(source.read()).hexdigest()
+    return sources
+
+
+def static_fingerprint(sources):
+    """Fingerprint dos arquivos de origem e do storage que os coleta."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(settings.STORAGES["staticfiles"], sort_keys=True, default=str).encode("utf-8"))
+    for name in sorted(sources):
+        digest.update(f"{name}\0{sources[name]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _marker_path():
+    return os.path.join(settings.STATIC_ROOT, MARKER_FILENAME)
+
+
+def read_marker():
+    """Fingerprint e hashes gravados na última coleta (None se não há)."""
+    try:
+        with open(_marker_path(), encoding="utf-8") as marker:
+            return json.load(marker)
+    except (OSError, ValueError):
+        return None
+
+
+def write_marker(fingerprint, sources):
+    path = _marker_path()
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as marker:
+        json.dump({"fingerprint": fingerprint, "files": sources}, marker)
+    os.replace(temporary, path)
+
+
+def _manifest_exists():
+    manifest_name = getattr(staticfiles_storage, "manifest_name", None)
+    return manifest_name is None or staticfiles_storage.exists(manifest_name)
+
+
+def migrate_if_needed(database=DEFAULT_DB_ALIAS, verbosity=1):
+    """Roda o migrate só com migrations pendentes. Retorna quantas eram."""
+    pending = pending_migrations(database)
+    if pending:
+        call_command("migrate", database=database, interactive=False, verbosity=verbosity)
+    return len(pending)
+
+
+def collectstatic_if_needed(verbosity=1):
+    """Roda o collectstatic só se os estáticos mudaram. Retorna True se rodou."""
+    sources = static_sources()
+    fingerprint = static_fingerprint(sources)
+    marker = read_marker()
+    if marker is not None and marker["fingerprint"] == fingerprint and _manifest_exists():
+        return False
+
+    if marker is None:
+        # Sem registro da coleta anterior não dá para saber o que está velho
+        call_command("collectstatic", interactive=False, clear=True, verbosity=verbosity)
+    else:
+        # Sem --clear o collectstatic compara datas de modificação (com
+        # precisão de segundos), não o conteúdo: as cópias dos arquivos que
+        # mudaram são removidas para serem copiadas de novo
+        collected = marker["files"]
+        for name, digest in collected.items():
+            if sources.get(name) != digest and staticfiles_storage.exists(name):
+                staticfiles_storage.delete(name)
+        call_command("collectstatic", interactive=False, verbosity=verbosity)
+    write_marker(fingerprint, sources)
+    return True
@@ -0,0 +1,138 @@
+"""
+Campos esparsos (`?fields=`) e expansão opcional (`?expand=`) nas leituras.
+
+`?fields=id,title,price_per_day,image_url` devolve só esses campos e também
+reduz a query: o queryset passa a carregar (only) apenas as colunas usadas
+pelos campos pedidos e só faz os joins que eles precisam. Cada serializer
+declara em `field_columns` as colunas (caminhos do ORM) lidas por campo;
+campos ausentes do mapa leem a coluna de mesmo nome.
+
+`?expand=tool` inclui nos aluguéis o `tool_details` (ferramenta completa),
+que fica de fora das respostas esparsas se não for pedido (por `expand` ou
+em `fields`). Sem `fields` nem `expand` a resposta continua completa.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+# Colunas sempre carregadas: id e updated_at (ETag)
+ALWAYS_LOADED = ("id", "updated_at")
+
+
+def _split(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def parse_sparse_params(params, available_fields, available_expansions):
+    """
+    Retorna (campos, expansões) pedidos: campos é None quando `fields` não foi
+    enviado; expansões é None quando nem `fields` nem `expand` foram enviados.
+    """
+    fields = expand = None
+    if FIELDS_PARAM in params:
+        fields = _split(params[FIELDS_PARAM])
+        unknown = [name for name in fields if name not in available_fields]
+        if unknown or not fields:
+            raise ValidationError({
+                FIELDS_PARAM: (
+                    f"Campos inválidos: {', '.join(unknown) or '(vazio)'}. "
+                    f"Disponíveis: {', '.join(available_fields)}."
+                )
+            })
+        fields = tuple(dict.fromkeys(fields))
+    if EXPAND_PARAM in params or fields is not None:
+        expand = _split(params.get(EXPAND_PARAM, ""))
+        unknown = [name for name in expand if name not in available_expansions]
+        if unknown:
+            raise ValidationError({
+                EXPAND_PARAM: (
+                    f"Expansões inválidas: {', '.join(unknown)}. "
+                    f"Disponíveis: {', '.join(available_expansions)}."
+                )
+            })
+        expand = frozenset(expand)
+    return fields, expand
+
+
+def serializer_columns(serializer_class, field_names, prefix=""):
+    """Caminhos do ORM lidos pelos campos `field_names` do serializer."""
+    field_columns = getattr(serializer_class, "field_columns", {})
+    columns = [f"{prefix}{column}" for column in ALWAYS_LOADED]
+    for name in field_names:
+        columns.extend(f"{prefix}{column}" for column in field_columns.get(name, (name,)))
+    return columns
+
+
+def restrict_queryset(queryset, columns):
+    """Carrega só `columns` (e as colunas de ordenação), com os joins que elas usam."""
+    ordering = [
+        name.lstrip("-") for name in queryset.query.order_by
+        if isinstance(name, str) and name.lstrip("-") != "pk"
+    ]
+    concrete = {field.name for field in queryset.model._meta.concrete_fields}
+    columns = [*columns, *(name for name in ordering if name in concrete)]
+    relations = sorted({column.rsplit("__", 1)[0] for column in columns if "__" in column})
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*dict.fromkeys(columns))
+
+
+class SparseFieldsMixin:
+    """
+    Serializer: mantém só os campos de context["fields"] e remove as
+    expansões (`expandable_fields`) que não estão em context["expand"].
+    """
+
+    # {expansão: campo do serializer}
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("fields")
+        expand = self.context.get("expand")
+        if expand is None:
+            return fields
+        # Expansão pedida entra mesmo fora de `fields`; campo expansível listado em `fields` também
+        expanded = {name for expansion, name in self.expandable_fields.items() if expansion in expand}
+        hidden = {*self.expandable_fields.values()} - expanded - {*(requested or ())}
+        return {
+            name: field for name, field in fields.items()
+            if name not in hidden and (requested is None or name in requested or name in expanded)
+        }
+
+
+class SparseFieldsViewMixin:
+    """ViewSet: lê `fields`/`expand` nas leituras e repassa ao serializer."""
+
+    def get_sparse_params(self):
+        if self.request.method not in SAFE_METHODS:
+            return None, None
+        if not hasattr(self, "_sparse_params"):
+            serializer_class = self.get_serializer_class()
+            self._sparse_params = parse_sparse_params(
+                self.request.query_params,
+                [*serializer_class().get_fields()],
+                [*getattr(serializer_class, "expandable_fields", {})],
+            )
+        return self._sparse_params
+
+    def get_expansions(self):
+        """Expansões efetivas: todas quando o cliente não pediu resposta esparsa."""
+        fields, expand = self.get_sparse_params()
+        expandable_fields = getattr(self.get_serializer_class(), "expandable_fields", {})
+        if expand is None:
+            return frozenset(expandable_fields)
+        return expand | {
+            expansion for expansion, field_name in expandable_fields.items()
+            if fields is not None and field_name in fields
+        }
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fields, expand = self.get_sparse_params()
+        if fields is not None or expand is not None:
+            context.update(fields=fields, expand=expand)
+        return context
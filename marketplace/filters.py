@@ -0,0 +1,96 @@
+from django.db.models import Exists, OuterRef
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from .models import Rental
+from .search import search_tools
+
+# Parâmetros de filtro da listagem de ferramentas
+TOOL_FILTER_PARAMS = ("category", "state", "city", "search", "available_from", "available_to")
+
+TOOL_ORDERINGS = ["created_at", "-created_at", "price_per_day", "-price_per_day"]
+
+
+def filter_tools(queryset, params, exclude=()):
+    """
+    Aplica os filtros da listagem de ferramentas (query params).
+    `exclude` permite ignorar filtros específicos (ex.: facetas de categoria).
+    """
+    # Filtro por categoria (suporta múltiplas categorias)
+    categories = params.getlist("category")
+    if categories and "category" not in exclude:
+        queryset = queryset.filter(category__in=categories)
+
+    # Filtro por estado (UF)
+    state = params.get("state")
+    if state and "state" not in exclude:
+        queryset = queryset.filter(state__iexact=state)
+
+    # Filtro por cidade (busca parcial, case-insensitive)
+    city = params.get("city")
+    if city and "city" not in exclude:
+        queryset = queryset.filter(city__icontains=city)
+
+    # Busca textual indexada em título e descrição (param search)
+    search = params.get("search")
+    if search and "search" not in exclude:
+        queryset = search_tools(queryset, search, rank=params.get("ordering") == "relevance")
+
+    # Disponibilidade em um período (available_from / available_to)
+    period = availability_period(params)
+    if period:
+        queryset = available_between(queryset, *period)
+
+    return queryset
+
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Data inválida. Use o formato AAAA-MM-DD."})
+    return parsed
+
+
+def availability_period(params):
+    """
+    Período (início, fim) pedido em available_from/available_to, ou None.
+    Com apenas uma das datas, o período é esse único dia.
+    """
+    start = parse_date_param(params, "available_from")
+    end = parse_date_param(params, "available_to")
+    if start is None and end is None:
+        return None
+    start, end = start or end, end or start
+    if end < start:
+        raise ValidationError({"available_to": "A data final deve ser maior ou igual à data inicial."})
+    return start, end
+
+
+def available_between(queryset, start, end):
+    """
+    Ferramentas sem aluguel pendente/aprovado que se sobreponha a [start, end].
+    Anti-join (NOT EXISTS) atendido pelo índice de períodos dos aluguéis.
+    """
+    busy = Rental.objects.using(queryset.db).active().overlapping(start, end).filter(tool=OuterRef("pk"))
+    return queryset.filter(~Exists(busy))
+
+
+def order_tools(queryset, params):
+    # Ordenação (created_at, price_per_day, relevance quando há busca)
+    ordering = params.get("ordering")
+    if ordering in TOOL_ORDERINGS:
+        return queryset.order_by(ordering)
+    if ordering == "relevance" and params.get("search"):
+        return queryset.order_by("-search_rank", "-created_at")
+    # Ordenação padrão para evitar warnings de paginação
+    return queryset.order_by("-created_at")
+
+
+def has_tool_filters(params):
+    return any(params.get(name) for name in TOOL_FILTER_PARAMS)
@@ -0,0 +1,47 @@
+"""
+Hashers de senha com parâmetros ajustáveis pelas settings.
+
+O PBKDF2 padrão do Django (1.000.000 iterações) domina o tempo do login. O
+perfil PASSWORD_HASHER_PROFILE escolhe o hasher preferido (ver settings):
+scrypt (biblioteca padrão) ou argon2 (argon2-cffi), com custo definido por
+PASSWORD_SCRYPT_* / PASSWORD_ARGON2_*. Os demais hashers continuam na lista
+só para verificar senhas antigas: no login, o Django regrava com o hasher
+preferido o hash de outro algoritmo ou com parâmetros diferentes.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # O scrypt usa 128 * n * r * p bytes (o limite padrão do OpenSSL é 32 MiB);
+        # a folga cobre a verificação de hashes gravados com parâmetros maiores
+        required = 128 * self.work_factor * self.block_size * self.parallelism
+        return max(2 * required, 64 * 1024 * 1024)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
@@ -0,0 +1,65 @@
+"""
+URLs das fotos das ferramentas.
+
+Montar URLs do Cloudinary (assinatura de transformações, versão, domínio)
+custa caro quando repetido para cada item de cada listagem. As URLs de todas
+as variações são calculadas uma vez por foto e guardadas em Tool.photo_urls.
+Sem Cloudinary configurado, as URLs apontam para o armazenamento local.
+"""
+import cloudinary
+from django.conf import settings
+
+# Variações entregues ao frontend (além da original)
+IMAGE_VARIANTS = {
+    # Grid 3x3 da listagem
+    "thumbnail": {"width": 400, "height": 400, "crop": "fill", "gravity": "auto",
+                  "quality": "auto", "fetch_format": "auto"},
+    # Página de detalhe
+    "medium": {"width": 1024, "crop": "limit", "quality": "auto", "fetch_format": "auto"},
+}
+
+# Incrementar quando IMAGE_VARIANTS mudar, para recalcular as URLs guardadas
+IMAGE_VARIANTS_VERSION = 1
+
+
+def _signature(photo):
+    return f"{IMAGE_VARIANTS_VERSION}:{cloudinary.config().cloud_name}:{photo.get_prep_value()}"
+
+
+def build_photo_urls(photo):
+    """Calcula as URLs de todas as variações de uma foto (CloudinaryResource)."""
+    if not photo:
+        return {}
+    if not cloudinary.config().cloud_name:
+        return build_local_photo_urls(photo)
+    urls = {"original": photo.url}
+    for name, options in IMAGE_VARIANTS.items():
+        urls[name] = photo.build_url(**options)
+    urls["signature"] = _signature(photo)
+    return urls
+
+
+def build_local_photo_urls(photo):
+    """
+    URLs no armazenamento local (sem Cloudinary), onde LocalPhotoBackend grava
+    a original e as miniaturas WEBP <public_id>.<variação>.webp.
+    """
+    base = settings.TOOL_PHOTO_LOCAL_URL + photo.public_id
+    urls = {"original": f"{base}.{photo.format}" if photo.format else base}
+    for name in IMAGE_VARIANTS:
+        urls[name] = f"{base}.{name}.webp"
+    urls["signature"] = _signature(photo)
+    return urls
+
+
+def photo_urls_are_fresh(photo, urls):
+    if not photo:
+        return not urls
+    return bool(urls) and urls.get("signature") == _signature(photo)
+
+
+def get_photo_urls(tool):
+    """URLs guardadas da ferramenta, recalculando se estiverem desatualizadas."""
+    if photo_urls_are_fresh(tool.photo, tool.photo_urls):
+        return tool.photo_urls
+    return build_photo_urls(tool.photo)
@@ -0,0 +1,139 @@
+"""
+Validação e processamento local de imagens com Pillow.
+
+A validação lê apenas o início do arquivo: confere a assinatura (magic bytes)
+de JPEG/PNG/WEBP e usa o cabeçalho que o Pillow interpreta para obter
+formato e dimensões, sem decodificar os pixels. Imagens grandes demais são
+recusadas antes de qualquer processamento.
+
+No modo de armazenamento local (sem Cloudinary), as miniaturas WEBP das
+variações são geradas em um pool de processos, fora da thread da requisição
+e do GIL do processo web.
+"""
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from PIL import Image, UnidentifiedImageError
+
+from .images import IMAGE_VARIANTS
+from .thumbnails import render_variant, variant_path
+
+# Bytes lidos para identificar a imagem (cobre o cabeçalho da maioria dos arquivos)
+IMAGE_HEADER_BYTES = 64 * 1024
+
+IMAGE_SIGNATURES = {
+    "JPEG": lambda head: head.startswith(b"\xff\xd8\xff"),
+    "PNG": lambda head: head.startswith(b"\x89PNG\r\n\x1a\n"),
+    "WEBP": lambda head: head[:4] == b"RIFF" and head[8:12] == b"WEBP",
+}
+
+# Tamanho máximo da foto (enviada ou baixada na importação)
+MAX_PHOTO_BYTES = 5 * 1024 * 1024
+
+PHOTO_TOO_LARGE_MESSAGE = "A imagem é muito grande. Tamanho máximo permitido: 5MB."
+INVALID_FORMAT_MESSAGE = "Formato de imagem inválido. Use JPEG, PNG ou WEBP."
+CORRUPTED_MESSAGE = "Não foi possível ler a imagem. Envie um arquivo JPEG, PNG ou WEBP válido."
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def sniff_format(head):
+    """Formato pela assinatura dos primeiros bytes, ou None."""
+    for image_format, matches in IMAGE_SIGNATURES.items():
+        if matches(head):
+            return image_format
+    return None
+
+
+def _open_header(source):
+    with Image.open(source) as image:
+        return image.format, image.size
+
+
+def inspect_image(file):
+    """
+    Retorna (formato, largura, altura) lendo só o cabeçalho da imagem.
+    Levanta InvalidImage com a mensagem para o usuário.
+    """
+    file.seek(0)
+    head = file.read(IMAGE_HEADER_BYTES)
+    file.seek(0)
+
+    expected_format = sniff_format(head)
+    if expected_format is None:
+        raise InvalidImage(INVALID_FORMAT_MESSAGE)
+
+    try:
+        try:
+            image_format, (width, height) = _open_header(io.BytesIO(head))
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            # Cabeçalho maior que o primeiro bloco (ex.: EXIF extenso): o
+            # Pillow continua lendo do arquivo, ainda sem decodificar os pixels
+            image_format, (width, height) = _open_header(file)
+    except Image.DecompressionBombError:
+        raise InvalidImage(_dimensions_message())
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise InvalidImage(CORRUPTED_MESSAGE)
+    finally:
+        file.seek(0)
+
+    if image_format != expected_format:
+        raise InvalidImage(INVALID_FORMAT_MESSAGE)
+    max_side = settings.TOOL_PHOTO_MAX_DIMENSION
+    if width > max_side or height > max_side or width * height > settings.TOOL_PHOTO_MAX_PIXELS:
+        raise InvalidImage(_dimensions_message())
+    return image_format, width, height
+
+
+def _dimensions_message():
+    side = settings.TOOL_PHOTO_MAX_DIMENSION
+    return f"A imagem é muito grande. Dimensões máximas: {side}x{side} pixels."
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_thumbnail_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: o processo web tem threads, e fork com threads não é seguro
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.TOOL_THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def generate_thumbnails(source, base_path):
+    """Gera as miniaturas WEBP de todas as variações. Retorna {variação: caminho}."""
+    pool = get_thumbnail_pool()
+    futures = {
+        name: pool.submit(render_variant, source, variant_path(base_path, name), options)
+        for name, options in IMAGE_VARIANTS.items()
+    }
+    paths = {}
+    for name, future in futures.items():
+        try:
+            paths[name] = future.result()
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool):
+                _reset_pool(pool)
+            raise OSError(f"Falha ao gerar a miniatura '{name}': {exc}") from exc
+    return paths
+
+
+def _reset_pool(broken):
+    # Um processo morto inutiliza o pool; o próximo uso cria outro
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False)
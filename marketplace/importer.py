@@ -0,0 +1,119 @@
+"""
+Importação em massa de ferramentas (CSV ou JSONL).
+
+Cada linha é validada com as regras do ToolSerializer (ToolImportSerializer)
+e as válidas são gravadas com bulk_create em lotes. As fotos não são enviadas
+durante a importação: a origem de cada uma fica em PendingToolPhoto e o
+envio segue o pipeline assíncrono de fotos (ver marketplace/photos.py).
+
+Como bulk_create não dispara signals, o índice de busca, as contagens de
+facetas e o cache das listagens são atualizados aqui, uma vez por lote.
+"""
+import csv
+import json
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from . import facets, search
+from .photos import schedule_upload
+from .cache import bump_generation
+from .models import PendingToolPhoto, Tool
+from .serializers import ToolImportSerializer
+
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_CHUNK_SIZE = 500
+
+INVALID_LINE_MESSAGE = "Linha inválida: esperado um objeto JSON."
+
+
+def guess_format(filename):
+    extension = filename.lower().rsplit(".", 1)[-1]
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension == "csv":
+        return "csv"
+    return None
+
+
+class InvalidImportFile(ValueError):
+    """Arquivo que não pode ser lido até o fim (ex.: CSV malformado)."""
+
+
+def read_rows(stream, file_format):
+    """
+    Lê as linhas (dicts) de um arquivo texto. Linhas JSON inválidas viram None;
+    CSV malformado levanta InvalidImportFile.
+    """
+    if file_format == "csv":
+        # Colunas vazias do CSV são tratadas como ausentes
+        try:
+            for row in csv.DictReader(stream):
+                yield {key: value for key, value in row.items() if key and value not in ("", None)}
+        except csv.Error as exc:
+            raise InvalidImportFile(f"CSV inválido: {exc}")
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+def _insert_chunk(rows, owner, using):
+    tools = [
+        Tool(
+            owner=owner,
+            photo_status=Tool.PHOTO_PENDING,
+            **{field: value for field, value in data.items() if field != "photo"},
+        )
+        for data in rows
+    ]
+    with transaction.atomic(using=using):
+        Tool.objects.using(using).bulk_create(tools)
+        pending = PendingToolPhoto.objects.using(using).bulk_create(
+            PendingToolPhoto(tool=tool, source=data["photo"]) for tool, data in zip(tools, rows)
+        )
+        for item in pending:
+            schedule_upload(item.pk)
+        search.index_tools([tool.pk for tool in tools], using=using)
+        facets.tools_created(tools, using=using)
+        bump_generation("tools")
+    return len(tools)
+
+
+def import_tools(rows, owner, chunk_size=IMPORT_CHUNK_SIZE, max_rows=None,
+                 allow_local_photos=False, using="default"):
+    """
+    Importa as linhas para `owner`. Linhas inválidas não interrompem a
+    importação: são devolvidas em `errors` com o número da linha (a partir de 1).
+    """
+    validator = ToolImportSerializer(context={"allow_local_photos": allow_local_photos})
+    created = 0
+    errors = []
+    chunk = []
+
+    for number, row in enumerate(rows, start=1):
+        if max_rows is not None and number > max_rows:
+            errors.append({"row": number, "errors": [f"Limite de {max_rows} linhas por importação atingido."]})
+            break
+        if row is None:
+            errors.append({"row": number, "errors": [INVALID_LINE_MESSAGE]})
+            continue
+        try:
+            chunk.append(validator.run_validation(row))
+        except ValidationError as exc:
+            errors.append({"row": number, "errors": exc.detail})
+            continue
+        if len(chunk) >= chunk_size:
+            created += _insert_chunk(chunk, owner, using)
+            chunk = []
+
+    if chunk:
+        created += _insert_chunk(chunk, owner, using)
+
+    return {"created": created, "errors": errors, "photos_pending": created}
@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from marketplace.fastboot import collectstatic_if_needed, migrate_if_needed
+
+
+class Command(BaseCommand):
+    help = (
+        "Aplica migrations pendentes e coleta os estáticos só se mudaram (fingerprint), "
+        "depois executa o servidor passado como argumento (ex.: gunicorn ...)."
+    )
+    # Os system checks rodam no servidor; aqui só atrasariam a inicialização
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--no-migrate", action="store_true", help="Não confere as migrations")
+        parser.add_argument("--no-static", action="store_true", help="Não confere os arquivos estáticos")
+        parser.add_argument("server", nargs=argparse.REMAINDER, help="Comando do servidor (opcional)")
+
+    def handle(self, *args, **options):
+        verbosity = options["verbosity"]
+        if not options["no_migrate"]:
+            started = time.perf_counter()
+            applied = migrate_if_needed(options["database"], verbosity=verbosity)
+            summary = f"{applied} aplicadas" if applied else "nenhuma pendente"
+            self.stdout.write(f"Migrations: {summary} ({_elapsed(started)}).")
+        if not options["no_static"]:
+            started = time.perf_counter()
+            collected = collectstatic_if_needed(verbosity=verbosity)
+            summary = "coletados" if collected else "sem alterações"
+            self.stdout.write(f"Estáticos: {summary} ({_elapsed(started)}).")
+
+        server = options["server"]
+        if not server:
+            return
+        self.stdout.write(f"Iniciando: {' '.join(server)}")
+        self.stdout.flush()
+        sys.stderr.flush()
+        # O servidor abre as próprias conexões
+        connections.close_all()
+        try:
+            os.execvp(server[0], server)
+        except OSError as exc:
+            raise CommandError(f"Não foi possível executar {server[0]}: {exc}")
+
+
+def _elapsed(started):
+    return f"{(time.perf_counter() - started) * 1000:.0f} ms"
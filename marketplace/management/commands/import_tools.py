@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from marketplace.importer import (
+    IMPORT_CHUNK_SIZE, IMPORT_FORMATS, InvalidImportFile, guess_format, import_tools, read_rows,
+)
+from marketplace.photos import upload_pending_photos
+
+
+class Command(BaseCommand):
+    help = "Importa ferramentas em massa de um arquivo CSV ou JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Arquivo .csv ou .jsonl")
+        parser.add_argument("--owner", required=True, help="Username do dono das ferramentas")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Formato (padrão: pela extensão)")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--skip-photos",
+            action="store_true",
+            help="Não envia as fotos ao final (ficam pendentes para upload_tool_photos)",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or guess_format(path.name)
+        if file_format is None:
+            raise CommandError("Formato não reconhecido; use --format csv ou --format jsonl.")
+        try:
+            owner = User.objects.get(username=options["owner"])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário '{options['owner']}' não encontrado.")
+
+        try:
+            with path.open(encoding="utf-8-sig", newline="") as stream:
+                # Na linha de comando a foto pode ser um caminho local
+                report = import_tools(
+                    read_rows(stream, file_format),
+                    owner,
+                    chunk_size=options["chunk_size"],
+                    allow_local_photos=True,
+                )
+        except (OSError, InvalidImportFile) as exc:
+            raise CommandError(str(exc))
+
+        for error in report["errors"]:
+            self.stderr.write(f"Linha {error['row']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} ferramentas importadas, {len(report['errors'])} linhas com erro."
+        ))
+
+        if report["created"] and not options["skip_photos"]:
+            uploaded, failed = upload_pending_photos()
+            self.stdout.write(f"Fotos enviadas: {uploaded}, com falha: {failed}.")
@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marketplace.accounts import PROVISION_CHUNK_SIZE, provision_users
+from marketplace.importer import IMPORT_FORMATS, InvalidImportFile, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria contas em massa de um arquivo CSV ou JSONL (username, email, password, "
+        "first_name, last_name), com as senhas já em hash."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Arquivo .csv ou .jsonl")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Formato (padrão: pela extensão)")
+        parser.add_argument("--chunk-size", type=int, default=PROVISION_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or guess_format(path.name)
+        if file_format is None:
+            raise CommandError("Formato não reconhecido; use --format csv ou --format jsonl.")
+
+        try:
+            with path.open(encoding="utf-8-sig", newline="") as stream:
+                report = provision_users(read_rows(stream, file_format), chunk_size=options["chunk_size"])
+        except (OSError, InvalidImportFile) as exc:
+            raise CommandError(str(exc))
+
+        for error in report["errors"]:
+            self.stderr.write(f"Linha {error['row']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} contas criadas, {len(report['errors'])} linhas com erro."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from marketplace.revocation import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Apaga as revogações de tokens JWT que já expiraram."
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens()
+        self.stdout.write(f"Revogações expiradas apagadas: {deleted}.")
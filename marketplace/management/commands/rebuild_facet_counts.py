@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from marketplace.facets import rebuild_facet_counts
+from marketplace.models import ToolFacetCount
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula as contagens de facetas (ToolFacetCount) a partir da tabela de "
+        "ferramentas, após escritas em massa que não disparam signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        rebuild_facet_counts(using)
+        rows = ToolFacetCount.objects.using(using).count()
+        self.stdout.write(f"Contagens de facetas recalculadas: {rows} combinações.")
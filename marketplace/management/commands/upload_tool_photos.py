@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from marketplace.photos import upload_pending_photos
+
+
+class Command(BaseCommand):
+    help = "Envia ao Cloudinary as fotos pendentes de ferramentas importadas em massa."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Máximo de fotos nesta execução")
+
+    def handle(self, *args, **options):
+        uploaded, failed = upload_pending_photos(limit=options["limit"])
+        self.stdout.write(f"Fotos enviadas: {uploaded}, com falha: {failed}.")
@@ -0,0 +1,94 @@
+from django.db import OperationalError, migrations
+
+# SQL congelado no estado desta migration: mudanças futuras em
+# marketplace/search.py não alteram o que ela aplica.
+POSTGRES_CONFIG = "marketplace_portuguese"
+POSTGRES_TABLE = "marketplace_tool_search"
+SQLITE_TABLE = "marketplace_tool_fts"
+
+
+def install_postgres(cursor):
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    cursor.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{POSTGRES_CONFIG}') THEN
+                CREATE TEXT SEARCH CONFIGURATION {POSTGRES_CONFIG} (COPY = portuguese);
+                ALTER TEXT SEARCH CONFIGURATION {POSTGRES_CONFIG}
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+            END IF;
+        END
+        $$;
+        """
+    )
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} (
+            tool_id bigint PRIMARY KEY
+                REFERENCES marketplace_tool (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+            document tsvector NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document_gin "
+        f"ON {POSTGRES_TABLE} USING gin (document)"
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO {POSTGRES_TABLE} (tool_id, document)
+        SELECT t.id,
+            setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(t.title, '')), 'A') ||
+            setweight(to_tsvector('{POSTGRES_CONFIG}', coalesce(t.description, '')), 'B')
+        FROM marketplace_tool t
+        ON CONFLICT (tool_id) DO UPDATE SET document = EXCLUDED.document
+        """
+    )
+
+
+def install_sqlite(cursor):
+    try:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} "
+            f"USING fts5(title, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except OperationalError:
+        # SQLite compilado sem FTS5: a busca continua funcionando via icontains
+        return
+    cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+    cursor.execute(
+        f"INSERT INTO {SQLITE_TABLE} (rowid, title, description) "
+        f"SELECT id, title, description FROM marketplace_tool"
+    )
+
+
+def install_search_index(apps, schema_editor):
+    """Cria o índice e indexa as ferramentas existentes."""
+    connection = schema_editor.connection
+    installers = {"postgresql": install_postgres, "sqlite": install_sqlite}
+    installer = installers.get(connection.vendor)
+    if installer is not None:
+        with connection.cursor() as cursor:
+            installer(cursor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"DROP TABLE IF EXISTS {POSTGRES_TABLE}")
+            cursor.execute(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {POSTGRES_CONFIG}")
+        elif connection.vendor == "sqlite":
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0004_alter_tool_photo'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
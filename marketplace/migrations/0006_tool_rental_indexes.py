@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:04
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_city_trigram_index(apps, schema_editor):
+    # city__icontains vira UPPER(city) LIKE '%...%', que só um índice de trigramas atende
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS tool_city_trgm_idx '
+        'ON marketplace_tool USING gin (UPPER(city::text) gin_trgm_ops)'
+    )
+
+
+def drop_city_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS tool_city_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0005_tool_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['tool', 'status', 'start_date', 'end_date'], name='rental_conflict_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(condition=models.Q(('status__in', ('pending', 'approved'))), fields=['tool', 'start_date', 'end_date'], name='rental_active_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['renter', '-created_at'], name='rental_renter_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['tool', '-created_at'], name='rental_tool_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['created_at', 'id'], name='tool_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['price_per_day', 'id'], name='tool_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['category', '-created_at'], name='tool_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['owner', '-created_at'], name='tool_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(django.db.models.functions.text.Upper('state'), name='tool_state_upper_idx'),
+        ),
+        migrations.RunPython(create_city_trigram_index, drop_city_trigram_index),
+    ]
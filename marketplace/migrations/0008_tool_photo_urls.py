@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:14
+
+import cloudinary
+from django.db import migrations, models
+
+# Cópia congelada de marketplace.images (IMAGE_VARIANTS_VERSION = 1): mudanças
+# futuras nas variações não alteram o que esta migration grava. URLs de
+# versões antigas são recalculadas pela assinatura (images.get_photo_urls).
+IMAGE_VARIANTS_VERSION = 1
+IMAGE_VARIANTS = {
+    "thumbnail": {"width": 400, "height": 400, "crop": "fill", "gravity": "auto",
+                  "quality": "auto", "fetch_format": "auto"},
+    "medium": {"width": 1024, "crop": "limit", "quality": "auto", "fetch_format": "auto"},
+}
+
+
+def build_photo_urls(photo):
+    cloud_name = cloudinary.config().cloud_name
+    if not photo or not cloud_name:
+        return {}
+    urls = {"original": photo.url}
+    for name, options in IMAGE_VARIANTS.items():
+        urls[name] = photo.build_url(**options)
+    urls["signature"] = f"{IMAGE_VARIANTS_VERSION}:{cloud_name}:{photo.get_prep_value()}"
+    return urls
+
+
+def backfill_photo_urls(apps, schema_editor):
+    # Sem Cloudinary configurado as URLs são calculadas no próximo save/leitura
+    Tool = apps.get_model('marketplace', 'Tool')
+    for tool in Tool.objects.only('id', 'photo').iterator():
+        urls = build_photo_urls(tool.photo)
+        if urls:
+            Tool.objects.filter(pk=tool.pk).update(photo_urls=urls)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0007_tool_rental_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='photo_urls',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(backfill_photo_urls, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:17
+
+from django.db import migrations, models
+from django.db.models import Count, Value
+from django.db.models.functions import Coalesce, Upper
+
+
+def populate_facet_counts(apps, schema_editor):
+    Tool = apps.get_model('marketplace', 'Tool')
+    ToolFacetCount = apps.get_model('marketplace', 'ToolFacetCount')
+    rows = (
+        Tool.objects.order_by()
+        .values('category', 'is_available', uf=Upper(Coalesce('state', Value(''))))
+        .annotate(total=Count('id'))
+    )
+    ToolFacetCount.objects.bulk_create(
+        ToolFacetCount(category=row['category'], state=row['uf'],
+                       is_available=row['is_available'], count=row['total'])
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0008_tool_photo_urls'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=50)),
+                ('state', models.CharField(blank=True, default='', max_length=2)),
+                ('is_available', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'state', 'is_available'), name='tool_facet_count_unique')],
+            },
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
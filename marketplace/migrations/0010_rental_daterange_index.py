@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def create_daterange_index(apps, schema_editor):
+    # Sobreposição de períodos (daterange &&) por ferramenta. No SQLite o
+    # índice B-tree rental_conflict_idx (tool, status, start_date, end_date) atende.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS rental_active_daterange_gist "
+        "ON marketplace_rental USING gist (tool_id, daterange(start_date, end_date, '[]')) "
+        "WHERE status IN ('pending', 'approved')"
+    )
+
+
+def drop_daterange_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS rental_active_daterange_gist')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0009_tool_facet_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_daterange_index, drop_daterange_index),
+    ]
@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# Quantos conflitos listar na mensagem de erro
+MAX_LISTED_OVERLAPS = 20
+
+
+def find_overlapping_rentals(connection):
+    """Pares de aluguéis ativos da mesma ferramenta com períodos sobrepostos."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT a.tool_id, a.id, a.start_date, a.end_date, b.id, b.start_date, b.end_date "
+            "FROM marketplace_rental a JOIN marketplace_rental b "
+            "ON b.tool_id = a.tool_id AND b.id > a.id "
+            "AND b.start_date <= a.end_date AND a.start_date <= b.end_date "
+            "WHERE a.status IN ('pending', 'approved') AND b.status IN ('pending', 'approved') "
+            "ORDER BY a.tool_id, a.id, b.id"
+        )
+        return cursor.fetchall()
+
+
+def check_no_overlapping_rentals(apps, schema_editor):
+    # Com sobreposições já gravadas a constraint falharia com um erro genérico
+    # do PostgreSQL; aqui a migration para antes, listando os conflitos.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    overlaps = find_overlapping_rentals(schema_editor.connection)
+    if not overlaps:
+        return
+    lines = [
+        f"- ferramenta {tool_id}: aluguel {first_id} ({first_start} a {first_end}) "
+        f"x aluguel {second_id} ({second_start} a {second_end})"
+        for tool_id, first_id, first_start, first_end, second_id, second_start, second_end
+        in overlaps[:MAX_LISTED_OVERLAPS]
+    ]
+    if len(overlaps) > MAX_LISTED_OVERLAPS:
+        lines.append(f"- ... e mais {len(overlaps) - MAX_LISTED_OVERLAPS}")
+    raise RuntimeError(
+        f"{len(overlaps)} par(es) de aluguéis pendentes/aprovados com períodos sobrepostos "
+        "impedem a constraint rental_no_overlap. Rejeite ou cancele um aluguel de cada par "
+        "e rode o migrate de novo:\n" + "\n".join(lines)
+    )
+
+
+def add_no_overlap_constraint(apps, schema_editor):
+    # Dois aluguéis ativos da mesma ferramenta não podem ter períodos sobrepostos.
+    # O índice GiST da constraint substitui o rental_active_daterange_gist.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        "ALTER TABLE marketplace_rental ADD CONSTRAINT rental_no_overlap "
+        "EXCLUDE USING gist (tool_id WITH =, daterange(start_date, end_date, '[]') WITH &&) "
+        "WHERE (status IN ('pending', 'approved'))"
+    )
+    schema_editor.execute('DROP INDEX IF EXISTS rental_active_daterange_gist')
+
+
+def remove_no_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS rental_active_daterange_gist "
+        "ON marketplace_rental USING gist (tool_id, daterange(start_date, end_date, '[]')) "
+        "WHERE status IN ('pending', 'approved')"
+    )
+    schema_editor.execute('ALTER TABLE marketplace_rental DROP CONSTRAINT IF EXISTS rental_no_overlap')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0010_rental_daterange_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_overlapping_rentals, migrations.RunPython.noop),
+        migrations.RunPython(add_no_overlap_constraint, remove_no_overlap_constraint),
+    ]
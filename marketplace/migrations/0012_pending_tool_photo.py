@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0011_rental_no_overlap_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingToolPhoto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=500)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('tool', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pending_photo', to='marketplace.tool')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0012_pending_tool_photo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='photo_status',
+            field=models.CharField(choices=[('pending', 'Pendente'), ('ready', 'Pronta'), ('failed', 'Falhou')], default='ready', max_length=10),
+        ),
+    ]
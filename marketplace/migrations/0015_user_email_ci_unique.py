@@ -0,0 +1,57 @@
+from django.db import migrations
+
+# Quantos emails repetidos listar na mensagem de erro
+MAX_LISTED_DUPLICATES = 20
+
+
+def find_duplicate_emails(connection):
+    """Emails (em maiúsculas) usados por mais de uma conta, com os usernames."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT UPPER(email), username FROM auth_user "
+            "WHERE email <> '' AND UPPER(email) IN ("
+            "SELECT UPPER(email) FROM auth_user WHERE email <> '' "
+            "GROUP BY UPPER(email) HAVING COUNT(*) > 1"
+            ") ORDER BY UPPER(email), id"
+        )
+        duplicates = {}
+        for email, username in cursor.fetchall():
+            duplicates.setdefault(email, []).append(username)
+        return duplicates
+
+
+def check_no_duplicate_emails(apps, schema_editor):
+    # Com emails repetidos o índice falharia com um erro genérico do banco;
+    # aqui a migration para antes, listando as contas em conflito.
+    duplicates = find_duplicate_emails(schema_editor.connection)
+    if not duplicates:
+        return
+    lines = [
+        f"- {email}: {', '.join(usernames)}"
+        for email, usernames in list(duplicates.items())[:MAX_LISTED_DUPLICATES]
+    ]
+    if len(duplicates) > MAX_LISTED_DUPLICATES:
+        lines.append(f"- ... e mais {len(duplicates) - MAX_LISTED_DUPLICATES}")
+    raise RuntimeError(
+        f"{len(duplicates)} email(s) usados por mais de uma conta (sem diferenciar maiúsculas) "
+        "impedem o índice user_email_ci_unique. Altere o email das contas repetidas "
+        "e rode o migrate de novo:\n" + "\n".join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+    # Email único sem diferenciar maiúsculas (ver marketplace/accounts.py).
+    # Emails vazios ficam de fora; contas repetidas precisam ser resolvidas antes.
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('marketplace', '0014_revoked_token'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX user_email_ci_unique ON auth_user (UPPER(email)) WHERE email <> ''",
+            "DROP INDEX IF EXISTS user_email_ci_unique",
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+# Índices que saíram da 0006 (nenhuma consulta os usava): bancos que já
+# aplicaram a versão anterior da 0006 ainda os têm.
+UNUSED_INDEXES = ("tool_city_upper_idx", "tool_available_created_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0015_user_email_ci_unique'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [f"DROP INDEX IF EXISTS {name}" for name in UNUSED_INDEXES],
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,7 +1,17 @@
-from django.db import models
+from django.core.files import File
+from django.db import connections, models, router, transaction
+from django.db.models import DEFERRED, BooleanField, F, Func, Q, Value
+from django.db.models.functions import Upper
 from django.contrib.auth.models import User
 from cloudinary.models import CloudinaryField
 
+from .images import build_photo_urls, photo_urls_are_fresh
+
+
+def facet_key(tool):
+    """Chave (categoria, UF, disponível) usada nas contagens de facetas."""
+    return (tool.category, (tool.state or "").upper(), tool.is_available)
+
 
 class Tool(models.Model):
     CATEGORIES = [
@@ -21,20 +31,146 @@ class Tool(models.Model):
         ("outros", "Outros"),
     ]
 
+    PHOTO_PENDING = "pending"
+    PHOTO_READY = "ready"
+    PHOTO_FAILED = "failed"
+    PHOTO_STATUS = [
+        (PHOTO_PENDING, "Pendente"),
+        (PHOTO_READY, "Pronta"),
+        (PHOTO_FAILED, "Falhou"),
+    ]
+
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.CharField(max_length=120)
     description = models.TextField()
     category = models.CharField(max_length=50, choices=CATEGORIES)
     price_per_day = models.DecimalField(max_digits=8, decimal_places=2)
     photo = CloudinaryField('image', folder='tools')
+    # URLs pré-calculadas das variações da foto (ver marketplace/images.py)
+    photo_urls = models.JSONField(default=dict, blank=True, editable=False)
+    # Envio assíncrono da foto (ver marketplace/photos.py)
+    photo_status = models.CharField(max_length=10, choices=PHOTO_STATUS, default=PHOTO_READY)
     state = models.CharField(max_length=2, blank=True, null=True, help_text="Estado (UF) - ex: SP, RJ, MG")
     city = models.CharField(max_length=100, blank=True, null=True, help_text="Cidade - ex: São Paulo, Rio de Janeiro")
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Listagem padrão (-created_at) e ordenação por preço, com id de desempate (cursor)
+            models.Index(fields=["created_at", "id"], name="tool_created_idx"),
+            models.Index(fields=["price_per_day", "id"], name="tool_price_idx"),
+            # Filtro por categoria ordenado pela listagem padrão
+            models.Index(fields=["category", "-created_at"], name="tool_category_created_idx"),
+            # "Minhas ferramentas"
+            models.Index(fields=["owner", "-created_at"], name="tool_owner_created_idx"),
+            # Filtro state__iexact no PostgreSQL (city__icontains usa o índice de trigramas da 0006)
+            models.Index(Upper("state"), name="tool_state_upper_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        photo_changed = self._photo_changed(update_fields)
+        # Arquivos novos só viram CloudinaryResource no upload feito durante o save
+        uploading = photo_changed and isinstance(self.photo, File)
+        if photo_changed and not uploading and self._refresh_photo_urls():
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "photo_urls"}
+
+        # pre_save/post_save na mesma transação do save: a linha travada em
+        # facets.tool_saving só é liberada depois do ajuste das contagens
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+        if uploading and self._refresh_photo_urls():
+            type(self).objects.filter(pk=self.pk).update(photo_urls=self.photo_urls)
+        if "photo" not in self.get_deferred_fields():
+            self._loaded_photo = self._photo_value()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores carregados, para descontar das contagens de facetas ao remover
+        instance._facet_key = facet_key(instance) if instance._facet_fields_loaded() else None
+        # Foto carregada, para só recalcular photo_urls quando ela mudar
+        if "photo" not in instance.get_deferred_fields():
+            instance._loaded_photo = instance._photo_value()
+        return instance
+
+    def _facet_fields_loaded(self):
+        return not {"category", "state", "is_available"} & self.get_deferred_fields()
+
+    def _photo_value(self):
+        return self._meta.get_field("photo").get_prep_value(self.photo)
+
+    def _photo_changed(self, update_fields):
+        """
+        A foto será gravada com valor diferente do carregado do banco.
+        Foto adiada (only/defer) ou fora de update_fields não é lida nem gravada.
+        """
+        if "photo" in self.get_deferred_fields():
+            return False
+        if update_fields is not None and "photo" not in update_fields:
+            return False
+        loaded = getattr(self, "_loaded_photo", DEFERRED)
+        return loaded is DEFERRED or self._photo_value() != loaded
+
+    def _refresh_photo_urls(self):
+        """Recalcula photo_urls se a foto mudou. Retorna True se houve mudança."""
+        photo = self._meta.get_field("photo").to_python(self.photo)
+        if photo_urls_are_fresh(photo, self.photo_urls):
+            return False
+        self.photo_urls = build_photo_urls(photo)
+        return True
+
+
+class DateRange(Func):
+    """daterange(início, fim, '[]') do PostgreSQL (período fechado)."""
+
+    function = "daterange"
+    output_field = models.Field()
+
+    def __init__(self, start, end, **extra):
+        super().__init__(start, end, Value("[]"), **extra)
+
+
+class RangeOverlaps(Func):
+    """Operador && entre dois ranges (atendido pelo índice GiST)."""
+
+    template = "(%(expressions)s)"
+    arg_joiner = " && "
+    output_field = BooleanField()
+
+
+class RentalQuerySet(models.QuerySet):
+    # Status que ocupam a ferramenta no período do aluguel
+    ACTIVE_STATUSES = ("pending", "approved")
+
+    def active(self):
+        return self.filter(status__in=self.ACTIVE_STATUSES)
+
+    def overlapping(self, start_date, end_date):
+        """
+        Aluguéis cujo período se sobrepõe a [start_date, end_date]:
+        start_date <= outro.end_date AND end_date >= outro.start_date
+
+        No PostgreSQL a condição é escrita como sobreposição de daterange,
+        para usar o índice GiST da constraint rental_no_overlap (migration 0011).
+        """
+        if connections[self.db].vendor == "postgresql":
+            return self.filter(
+                RangeOverlaps(
+                    DateRange(F("start_date"), F("end_date")),
+                    DateRange(Value(start_date), Value(end_date)),
+                )
+            )
+        return self.filter(start_date__lte=end_date, end_date__gte=start_date)
+
 
 class Rental(models.Model):
     STATUS = [
@@ -53,6 +189,88 @@ class Rental(models.Model):
     status = models.CharField(max_length=20, choices=STATUS, default="pending")
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RentalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Verificação de conflito (tool, status, período). O índice parcial só com
+            # aluguéis ativos é menor, mas o SQLite não o usa com status parametrizado.
+            models.Index(
+                fields=["tool", "status", "start_date", "end_date"],
+                name="rental_conflict_idx",
+            ),
+            models.Index(
+                fields=["tool", "start_date", "end_date"],
+                condition=Q(status__in=RentalQuerySet.ACTIVE_STATUSES),
+                name="rental_active_period_idx",
+            ),
+            models.Index(fields=["renter", "-created_at"], name="rental_renter_created_idx"),
+            models.Index(fields=["tool", "-created_at"], name="rental_tool_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.tool.title} - {self.renter.username}"
+
+
+class ToolFacetCount(models.Model):
+    """
+    Contagem de ferramentas por (categoria, UF, disponibilidade), mantida
+    incrementalmente nos saves/deletes de Tool (ver marketplace/facets.py).
+    Permite responder as facetas sem filtro sem varrer a tabela de ferramentas.
+    """
+
+    category = models.CharField(max_length=50)
+    # UF em maiúsculas; vazio para ferramentas sem estado
+    state = models.CharField(max_length=2, blank=True, default="")
+    is_available = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "state", "is_available"],
+                name="tool_facet_count_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.category}/{self.state}/{self.is_available}: {self.count}"
+
+
+class PendingToolPhoto(models.Model):
+    """
+    Foto de uma ferramenta ainda não enviada (criação/edição pela API ou
+    importação em massa). O envio é feito em segundo plano (ver marketplace/photos.py).
+    """
+
+    tool = models.OneToOneField(Tool, on_delete=models.CASCADE, related_name="pending_photo")
+    # Arquivo na área de staging, URL ou caminho local (importação via linha de comando)
+    source = models.CharField(max_length=500)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.tool_id}: {self.source}"
+
+
+class RevokedToken(models.Model):
+    """
+    JTI de um token JWT revogado (logout ou comprometimento). Consultado pelo
+    filtro de Bloom em memória de marketplace/revocation.py; o registro pode
+    ser apagado depois que o token expira.
+    """
+
+    ACCESS = "access"
+    REFRESH = "refresh"
+    TOKEN_TYPES = [(ACCESS, "Access"), (REFRESH, "Refresh")]
+
+    jti = models.CharField(max_length=255, unique=True)
+    token_type = models.CharField(max_length=10, choices=TOKEN_TYPES)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.token_type}: {self.jti}"
@@ -0,0 +1,222 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) sobre a ordenação já aplicada no queryset.
+
+    O cursor guarda o valor do campo de ordenação e o id do último item visto,
+    então cada página é um `WHERE (campo, id) > (valor, id) LIMIT n`: não há
+    COUNT(*) nem OFFSET, e o custo não cresce com a profundidade da página.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    # Campos de ordenação suportados; o id entra sempre como desempate
+    ordering_fields = ("created_at", "price_per_day")
+    invalid_cursor_message = "Cursor inválido."
+
+    def get_ordering(self, queryset):
+        """Retorna (campo, decrescente) ou None se a ordenação não é suportada."""
+        order_by = queryset.query.order_by
+        if not order_by or not isinstance(order_by[0], str):
+            return None
+        field = order_by[0].lstrip("-")
+        if field not in self.ordering_fields:
+            return None
+        return field, order_by[0].startswith("-")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset com o async ORM (views async, ver async_views.py)."""
+        queryset = self.get_page_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """Queryset (ainda não executado) da página pedida, ou None se a ordenação não é suportada."""
+        ordering = self.get_ordering(queryset)
+        if ordering is None:
+            return None
+
+        self.request = request
+        self.field, descending = ordering
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor["r"])
+
+        # Páginas anteriores são lidas no sentido inverso e depois reordenadas
+        query_descending = descending != self.reverse
+        if query_descending:
+            queryset = queryset.order_by(f"-{self.field}", "-id")
+            lookup = "lt"
+        else:
+            queryset = queryset.order_by(self.field, "id")
+            lookup = "gt"
+
+        if self.cursor:
+            try:
+                value = queryset.model._meta.get_field(self.field).to_python(self.cursor["v"])
+            except DjangoValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{lookup}": value})
+                | Q(**{self.field: value, f"id__{lookup}": self.cursor["id"]})
+            )
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = rows
+        return rows
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            return {"v": str(cursor["v"]), "id": int(cursor["id"]), "r": bool(cursor.get("r"))}
+        except (binascii.Error, ValueError, TypeError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        value = getattr(row, self.field)
+        value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+        payload = json.dumps({"v": value, "id": row.pk, "r": reverse}, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+
+class MarketplacePagination(PageNumberPagination):
+    """
+    Paginação padrão da API.
+
+    Por padrão usa número de página (grid 3x3 do frontend, com `count`).
+    Com `?pagination=cursor` (ou ao seguir um link com `cursor`) passa a usar
+    KeysetPagination, desde que a ordenação da listagem seja suportada.
+    """
+
+    pagination_query_param = "pagination"
+    keyset = None
+
+    def wants_cursor(self, request):
+        return (
+            KeysetPagination.cursor_query_param in request.query_params
+            or request.query_params.get(self.pagination_query_param) == "cursor"
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.wants_cursor(request):
+            keyset = KeysetPagination()
+            page = keyset.paginate_queryset(queryset, request, view)
+            if page is not None:
+                self.keyset = keyset
+                return page
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset com o async ORM (views async, ver async_views.py)."""
+        self.keyset = None
+        if self.wants_cursor(request):
+            keyset = KeysetPagination()
+            page = await keyset.apaginate_queryset(queryset, request, view)
+            if page is not None:
+                self.keyset = keyset
+                return page
+
+        # Mesmo fluxo do PageNumberPagination.paginate_queryset; o Paginator só
+        # fatia o queryset, a contagem e os itens da página vêm do async ORM
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [item async for item in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_page_state(self):
+        """Estado da página (além dos itens) que entra no ETag da listagem."""
+        if self.keyset is not None:
+            return (self.keyset.has_next, self.keyset.has_previous)
+        return (self.page.paginator.count, self.page.number)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters += [
+            {
+                "name": self.pagination_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Use `cursor` para paginação por cursor (sem contagem total).",
+                "schema": {"type": "string", "enum": ["page", "cursor"]},
+            },
+            {
+                "name": KeysetPagination.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor retornado em `next`/`previous` no modo cursor.",
+                "schema": {"type": "string"},
+            },
+        ]
+        return parameters
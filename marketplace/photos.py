@@ -0,0 +1,331 @@
+"""
+Pipeline assíncrono das fotos de ferramentas.
+
+Criar/editar uma ferramenta com foto não envia a imagem durante a
+requisição: o arquivo é gravado na área de staging local
+(TOOL_PHOTO_STAGING_ROOT), a ferramenta fica com `photo_status = "pending"`
+e uma PendingToolPhoto registra a origem. Um worker em segundo plano envia a
+imagem, associa à ferramenta (recalculando as URLs das variações) e apaga o
+arquivo de staging. Falhas são tentadas de novo com espera crescente até
+MAX_ATTEMPTS; depois disso a ferramenta fica com `photo_status = "failed"`.
+
+O destino do envio é plugável (TOOL_PHOTO_BACKEND): CloudinaryPhotoBackend
+em produção e LocalPhotoBackend, que grava no disco, para desenvolvimento e
+testes sem rede. O modo do worker (TOOL_PHOTO_WORKER) é:
+
+- "thread": fila processada por uma thread do próprio processo (padrão)
+- "inline": processa logo após o commit, na mesma thread (testes)
+- "off": apenas o comando `manage.py upload_tool_photos` processa a fila
+"""
+import http.client
+import io
+import ipaddress
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import HTTPHandler, HTTPSHandler, build_opener
+
+from cloudinary import CloudinaryResource, uploader
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from .imaging import MAX_PHOTO_BYTES, PHOTO_TOO_LARGE_MESSAGE, InvalidImage, generate_thumbnails, inspect_image
+from .models import PendingToolPhoto, Tool
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+# Espera (segundos) antes de cada nova tentativa do worker
+RETRY_DELAYS = (5, 30, 120, 600)
+
+
+def _photo_field():
+    return Tool._meta.get_field("photo")
+
+
+class CloudinaryPhotoBackend:
+    """Envia a imagem ao Cloudinary com as mesmas opções do CloudinaryField."""
+
+    def upload(self, source):
+        field = _photo_field()
+        options = {"type": field.type, "resource_type": field.resource_type}
+        options.update(field.options)
+        return uploader.upload_resource(source, **options)
+
+
+class LocalPhotoBackend:
+    """
+    Armazenamento local (sem Cloudinary): grava a imagem em TOOL_PHOTO_LOCAL_ROOT
+    com o mesmo public_id que o Cloudinary usaria, gera as miniaturas WEBP das
+    variações e devolve o recurso. Também serve de substituto offline nos testes.
+    """
+
+    def __init__(self):
+        self.storage = FileSystemStorage(location=settings.TOOL_PHOTO_LOCAL_ROOT)
+
+    def upload(self, source):
+        path = urlparse(source).path if _is_url(source) else source
+        extension = Path(path).suffix.lstrip(".").lower() or "jpg"
+        public_id = f"{_photo_field().options.get('folder', 'tools')}/{uuid.uuid4().hex}"
+        with _open_source(source) as data:
+            # Mesma validação das fotos enviadas pela API (assinatura e dimensões)
+            inspect_image(data)
+            name = self.storage.save(f"{public_id}.{extension}", data)
+        # Miniaturas WEBP geradas no pool de processos (imaging.py)
+        path = self.storage.path(name)
+        generate_thumbnails(path, path[: -len(extension) - 1])
+        return CloudinaryResource(
+            public_id,
+            version=str(int(time.time())),
+            format=extension,
+            type="upload",
+            resource_type="image",
+        )
+
+
+def _is_url(source):
+    return urlparse(source).scheme in ("http", "https")
+
+
+def _open_source(source):
+    if _is_url(source):
+        return fetch_photo(source)
+    if os.path.getsize(source) > MAX_PHOTO_BYTES:
+        raise InvalidImage(PHOTO_TOO_LARGE_MESSAGE)
+    return open(source, "rb")
+
+
+class RejectedPhotoSource(ValueError):
+    """Origem da foto que não pode ser baixada (endereço interno)."""
+
+
+def is_public_host(hostname):
+    """
+    Recusa de antemão hosts que são claramente internos (localhost, IPs
+    privados/loopback/link-local). Nomes só são resolvidos no download.
+    """
+    hostname = (hostname or "").rstrip(".").lower()
+    if not hostname or hostname == "localhost" or hostname.endswith(".localhost"):
+        return False
+    try:
+        return ipaddress.ip_address(hostname).is_global
+    except ValueError:
+        return True
+
+
+class _PublicPeerMixin:
+    # Confere o endereço realmente conectado (após a resolução DNS e a cada
+    # redirecionamento), antes de enviar a requisição
+    def connect(self):
+        super().connect()
+        try:
+            public = ipaddress.ip_address(self.sock.getpeername()[0]).is_global
+        except ValueError:
+            public = False
+        if not public:
+            self.close()
+            raise RejectedPhotoSource(f"Endereço interno não permitido: {self.host}")
+
+
+class _PublicHTTPConnection(_PublicPeerMixin, http.client.HTTPConnection):
+    pass
+
+
+class _PublicHTTPSConnection(_PublicPeerMixin, http.client.HTTPSConnection):
+    pass
+
+
+class _PublicHTTPHandler(HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+def fetch_photo(url):
+    """
+    Baixa a foto de uma URL da importação para a memória. Só conecta a
+    endereços públicos e recusa respostas maiores que MAX_PHOTO_BYTES.
+    """
+    opener = build_opener(_PublicHTTPHandler, _PublicHTTPSHandler)
+    with opener.open(url, timeout=30) as response:
+        content = response.read(MAX_PHOTO_BYTES + 1)
+    if len(content) > MAX_PHOTO_BYTES:
+        raise InvalidImage(PHOTO_TOO_LARGE_MESSAGE)
+    return io.BytesIO(content)
+
+
+def get_photo_backend():
+    return import_string(settings.TOOL_PHOTO_BACKEND)()
+
+
+def _staging_storage():
+    return FileSystemStorage(location=settings.TOOL_PHOTO_STAGING_ROOT)
+
+
+def stage_photo(tool, uploaded_file):
+    """
+    Guarda a foto enviada na área de staging e agenda o envio.
+    A foto atual (se houver) continua valendo até o envio terminar.
+    """
+    storage = _staging_storage()
+    extension = Path(uploaded_file.name).suffix.lower()
+    source = storage.path(storage.save(f"{uuid.uuid4().hex}{extension}", uploaded_file))
+    return queue_photo(tool, source)
+
+
+def queue_photo(tool, source):
+    previous = PendingToolPhoto.objects.filter(tool=tool).first()
+    if previous is not None:
+        _discard_staged(previous.source)
+    pending, _ = PendingToolPhoto.objects.update_or_create(
+        tool=tool, defaults={"source": source, "attempts": 0, "last_error": ""}
+    )
+    if tool.photo_status != Tool.PHOTO_PENDING:
+        tool.photo_status = Tool.PHOTO_PENDING
+        tool.save(update_fields=["photo_status", "updated_at"])
+    schedule_upload(pending.pk)
+    return pending
+
+
+def _discard_staged(source):
+    staging_root = os.path.realpath(settings.TOOL_PHOTO_STAGING_ROOT)
+    path = os.path.realpath(source)
+    if path.startswith(staging_root + os.sep) and os.path.exists(path):
+        os.remove(path)
+
+
+def process_pending_photo(pending_id, backend=None):
+    """
+    Faz uma tentativa de envio da pendência. Retorna True se a foto foi
+    associada, False se falhou (ou já foi processada por outro worker).
+    """
+    pending = PendingToolPhoto.objects.select_related("tool").filter(pk=pending_id).first()
+    if pending is None or pending.attempts >= MAX_ATTEMPTS:
+        return False
+    # Reserva a tentativa: outro worker com a mesma pendência não passa daqui
+    claimed = PendingToolPhoto.objects.filter(pk=pending.pk, attempts=pending.attempts).update(
+        attempts=F("attempts") + 1
+    )
+    if not claimed:
+        return False
+    pending.attempts += 1
+
+    try:
+        resource = (backend or get_photo_backend()).upload(pending.source)
+    except Exception as exc:
+        # Qualquer erro do envio (rede, Cloudinary, imagem inválida) conta como tentativa
+        pending.last_error = f"{type(exc).__name__}: {exc}"
+        if isinstance(exc, (InvalidImage, RejectedPhotoSource)):
+            # Imagem inválida ou origem recusada não mudam em novas tentativas
+            pending.attempts = MAX_ATTEMPTS
+        pending.save(update_fields=["attempts", "last_error"])
+        if pending.attempts >= MAX_ATTEMPTS:
+            tool = pending.tool
+            tool.photo_status = Tool.PHOTO_FAILED
+            tool.save(update_fields=["photo_status", "updated_at"])
+            _discard_staged(pending.source)
+        return False
+
+    with transaction.atomic():
+        # Uma nova foto pode ter sido enviada enquanto esta subia
+        if not PendingToolPhoto.objects.filter(pk=pending.pk, source=pending.source).delete()[0]:
+            return False
+        tool = pending.tool
+        tool.photo = resource
+        tool.photo_status = Tool.PHOTO_READY
+        # photo_urls é recalculado pelo save
+        tool.save(update_fields=["photo", "photo_status", "updated_at"])
+    _discard_staged(pending.source)
+    return True
+
+
+def upload_pending_photos(limit=None):
+    """Processa as pendências em fila (comando/cron). Retorna (enviadas, falhas)."""
+    pending_ids = (
+        PendingToolPhoto.objects.filter(attempts__lt=MAX_ATTEMPTS)
+        .order_by("id")
+        .values_list("pk", flat=True)
+    )
+    if limit is not None:
+        pending_ids = pending_ids[:limit]
+
+    backend = get_photo_backend()
+    uploaded = failed = 0
+    for pending_id in list(pending_ids):
+        if process_pending_photo(pending_id, backend):
+            uploaded += 1
+        else:
+            failed += 1
+    return uploaded, failed
+
+
+class PhotoUploadWorker:
+    """Thread em segundo plano que processa as pendências enfileiradas."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, pending_id, delay=0):
+        if delay:
+            timer = threading.Timer(delay, self.submit, args=(pending_id,))
+            timer.daemon = True
+            timer.start()
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="photo-upload", daemon=True)
+                self.thread.start()
+        self.queue.put(pending_id)
+
+    def _run(self):
+        while True:
+            pending_id = self.queue.get()
+            try:
+                if not process_pending_photo(pending_id):
+                    self._retry(pending_id)
+            except Exception as exc:
+                # Erro fora do envio (ex.: banco indisponível): a thread segue com a fila
+                logger.exception("Falha ao processar a foto pendente %s", pending_id)
+                self._failed(pending_id, exc)
+            finally:
+                connection.close()
+                self.queue.task_done()
+
+    def _retry(self, pending_id):
+        attempts = PendingToolPhoto.objects.filter(pk=pending_id).values_list("attempts", flat=True).first()
+        if attempts is not None and attempts < MAX_ATTEMPTS:
+            self.submit(pending_id, delay=RETRY_DELAYS[min(max(attempts, 1), len(RETRY_DELAYS)) - 1])
+
+    def _failed(self, pending_id, exc):
+        try:
+            PendingToolPhoto.objects.filter(pk=pending_id).update(last_error=f"{type(exc).__name__}: {exc}")
+            self._retry(pending_id)
+        except Exception:
+            # Sem o banco não dá para ler as tentativas: espera o maior intervalo
+            self.submit(pending_id, delay=RETRY_DELAYS[-1])
+
+
+worker = PhotoUploadWorker()
+
+
+def schedule_upload(pending_id):
+    mode = settings.TOOL_PHOTO_WORKER
+    if mode == "thread":
+        transaction.on_commit(lambda: worker.submit(pending_id))
+    elif mode == "inline":
+        transaction.on_commit(lambda: process_pending_photo(pending_id))
@@ -0,0 +1,80 @@
+"""
+Renderer e parser JSON da API com orjson.
+
+O json da biblioteca padrão (com o JSONEncoder do DRF) pesa no tempo das
+listagens paginadas. Com API_JSON_BACKEND = "orjson" (padrão) a codificação
+e a leitura usam o orjson, em C, gerando os mesmos bytes do JSONRenderer do
+DRF: JSON compacto, UTF-8 sem escapes, U+2028/U+2029 escapados, datetimes
+com "Z" em UTC e Decimal/UUID/lazy strings convertidos pelo próprio
+JSONEncoder do DRF.
+
+Sem o orjson instalado, com API_JSON_BACKEND = "stdlib", com `indent`
+pedido (API navegável) ou com inteiros acima de 64 bits (que o orjson não
+codifica nem lê como int), as classes usam o caminho padrão do DRF.
+"""
+import io
+import re
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+if orjson is not None:
+    # Datetimes, dataclasses e chaves não-string seguem as regras do DRF
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+# O orjson lê inteiros acima de 64 bits como float; esses corpos vão para o json padrão
+_LONG_NUMBER = re.compile(rb"\d{19,}")
+
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def orjson_enabled():
+    return orjson is not None and settings.API_JSON_BACKEND == "orjson"
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not orjson_enabled() or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        for separator, escaped in _LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not orjson_enabled() or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if _LONG_NUMBER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Mensagem de erro (e inteiros grandes) como no parser do DRF
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,141 @@
+"""
+Serialização compilada (somente leitura) para as listagens.
+
+O caminho padrão do DRF, para cada item e cada campo, resolve `source`
+atributo por atributo, trata exceções, checa PKOnlyObject e chama o
+`to_representation` genérico do campo. Nas listagens de ferramentas e
+aluguéis isso domina o tempo da resposta.
+
+CompiledRepresentationMixin monta uma vez, a partir dos próprios campos do
+serializer, uma lista (nome, leitura, conversão) especializada por tipo de
+campo, e gera o dict de cada item com essa lista. A saída é idêntica à do
+DRF (ver tests/test_fast_serialization.py); campos de tipos não previstos
+usam o caminho do DRF. Os objetos relacionados exibidos devem vir
+pré-carregados (select_related) no queryset das views.
+
+Desligável com API_FAST_SERIALIZATION = False.
+"""
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.utils import timezone
+from rest_framework import fields as drf_fields
+from rest_framework import relations
+from rest_framework.settings import api_settings
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != drf_fields.ISO_8601:
+        return None
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if field_timezone is None:
+        return None
+
+    def convert(value):
+        if isinstance(value, str):
+            return value
+        if timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _date_converter(field):
+    output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+    if output_format is None or output_format.lower() != drf_fields.ISO_8601:
+        return None
+    return lambda value: value if isinstance(value, str) else value.isoformat()
+
+
+def _compile_field(serializer, field):
+    """Retorna (leitura, conversão) do campo, ou None se não há caminho rápido."""
+    if isinstance(field, drf_fields.SerializerMethodField):
+        # O valor já é a representação; None também é devolvido pelo método
+        return getattr(serializer, field.method_name), None
+
+    if field.source == "*" or field.source_attrs is None:
+        return None
+    source = ".".join(field.source_attrs)
+
+    if isinstance(field, relations.PrimaryKeyRelatedField) and len(field.source_attrs) == 1:
+        try:
+            model_field = serializer.Meta.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if field.pk_field is not None or not model_field.many_to_one:
+            return None
+        # Lê a coluna <campo>_id, sem carregar o objeto relacionado
+        return attrgetter(model_field.attname), None
+
+    if isinstance(field, drf_fields.CharField):
+        converter = _as_str
+    elif type(field) is drf_fields.IntegerField:
+        converter = _as_int
+    elif type(field) is drf_fields.BooleanField:
+        converter = _bool_converter(field)
+    elif isinstance(field, drf_fields.DateTimeField):
+        converter = _datetime_converter(field)
+    elif isinstance(field, drf_fields.DateField):
+        converter = _date_converter(field)
+    else:
+        # DecimalField, ChoiceField etc.: só a leitura do atributo é compilada
+        converter = None if isinstance(field, drf_fields.ModelField) else field.to_representation
+    if converter is None:
+        return None
+    return attrgetter(source), converter
+
+
+def _as_str(value):
+    return value if type(value) is str else str(value)
+
+
+def _as_int(value):
+    return value if type(value) is int else int(value)
+
+
+def _bool_converter(field):
+    return lambda value: value if type(value) is bool else field.to_representation(value)
+
+
+class CompiledRepresentationMixin:
+    """Mixin para ModelSerializer: to_representation compilado para leitura."""
+
+    def _compiled_fields(self):
+        compiled = self.__dict__.get("_compiled")
+        if compiled is None:
+            compiled = [
+                (field.field_name, field, *(_compile_field(self, field) or (None, None)))
+                for field in self._readable_fields
+            ]
+            self._compiled = compiled
+        return compiled
+
+    def to_representation(self, instance):
+        if not settings.API_FAST_SERIALIZATION:
+            return super().to_representation(instance)
+
+        data = {}
+        for name, field, read, convert in self._compiled_fields():
+            if read is not None:
+                try:
+                    value = read(instance)
+                except (AttributeError, KeyError, ObjectDoesNotExist):
+                    # Relação ausente no meio do source: o DRF decide (None/omitido)
+                    pass
+                else:
+                    data[name] = value if value is None or convert is None else convert(value)
+                    continue
+            # Caminho do DRF para o campo
+            try:
+                attribute = field.get_attribute(instance)
+            except drf_fields.SkipField:
+                continue
+            check_for_none = attribute.pk if isinstance(attribute, relations.PKOnlyObject) else attribute
+            data[name] = None if check_for_none is None else field.to_representation(attribute)
+        return data
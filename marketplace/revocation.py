@@ -0,0 +1,127 @@
+"""
+Revogação de tokens JWT (logout e tokens comprometidos).
+
+Os JTIs revogados ficam na tabela RevokedToken até o token expirar. Para que
+o caminho comum (token não revogado) não faça I/O, cada processo mantém um
+filtro de Bloom com os JTIs revogados ainda válidos, recarregado do banco a
+cada AUTH_REVOCATION_REFRESH_INTERVAL segundos:
+
+- JTI fora do filtro: não revogado, sem consulta
+- JTI no filtro: confirmado no banco (o filtro admite falsos positivos, na
+  taxa AUTH_REVOCATION_ERROR_RATE)
+
+Uma revogação vale na hora no processo que a fez e, nos demais, na próxima
+recarga do filtro.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.utils import timezone as django_timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+# Folga do filtro para as revogações feitas entre duas recargas
+CAPACITY_HEADROOM = 1024
+
+
+class BloomFilter:
+    """Filtro de Bloom de strings num bytearray (dupla hash sobre um blake2b)."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """Filtro de Bloom dos JTIs revogados, recarregado periodicamente do banco."""
+
+    def __init__(self):
+        self.filter = None
+        self.loaded_at = 0.0
+        # JTIs revogados neste processo: {jti: instante}, reaplicados se a recarga começou antes
+        self.local = {}
+        self.lock = threading.Lock()
+
+    def _stale(self):
+        return self.filter is None or time.monotonic() - self.loaded_at >= settings.AUTH_REVOCATION_REFRESH_INTERVAL
+
+    def refresh(self):
+        started = time.monotonic()
+        jtis = [
+            *RevokedToken.objects.filter(expires_at__gt=django_timezone.now()).values_list("jti", flat=True)
+        ]
+        bloom = BloomFilter(len(jtis) + CAPACITY_HEADROOM, settings.AUTH_REVOCATION_ERROR_RATE)
+        for jti in jtis:
+            bloom.add(jti)
+        with self.lock:
+            self.local = {jti: added for jti, added in self.local.items() if added >= started}
+            for jti in self.local:
+                bloom.add(jti)
+            self.filter = bloom
+            self.loaded_at = started
+
+    def add(self, jti):
+        with self.lock:
+            self.local[jti] = time.monotonic()
+            if self.filter is not None:
+                self.filter.add(jti)
+
+    def might_contain(self, jti):
+        if self._stale():
+            self.refresh()
+        return jti in self.filter
+
+    def clear(self):
+        with self.lock:
+            self.filter = None
+            self.local = {}
+
+
+revocation_list = RevocationList()
+
+
+def is_revoked(token):
+    """True se o JTI do token foi revogado (consulta o banco só se o filtro acusar)."""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if not jti or not revocation_list.might_contain(jti):
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke_token(token):
+    """Revoga o token (AccessToken/RefreshToken do simplejwt) até ele expirar."""
+    jti = token[api_settings.JTI_CLAIM]
+    RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            "token_type": token[api_settings.TOKEN_TYPE_CLAIM],
+            "expires_at": datetime.fromtimestamp(token["exp"], tz=timezone.utc),
+        },
+    )
+    revocation_list.add(jti)
+
+
+def purge_expired_tokens():
+    """Apaga as revogações de tokens já expirados; retorna quantas."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=django_timezone.now()).delete()
+    return deleted
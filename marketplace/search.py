@@ -0,0 +1,199 @@
+"""
+Busca textual indexada de ferramentas.
+
+Cada Tool possui um documento de busca mantido em uma tabela auxiliar,
+específica de cada banco:
+
+- PostgreSQL: coluna tsvector com índice GIN, usando a configuração
+  portuguesa (stemming) combinada com unaccent (acentos ignorados).
+- SQLite: tabela virtual FTS5 com tokenizer unicode61 removendo acentos.
+
+Os índices casam termos inteiros ou prefixos ("furad" encontra
+"Furadeira", "adeira" não). Só quando o índice não encontra nada a busca
+faz uma segunda consulta, com icontains em título e descrição: "adeira"
+encontra "Furadeira", mas "serra" encontra só "Serra circular" (pelo
+índice), não "Motosserra".
+
+Em bancos sem suporte (ou SQLite compilado sem FTS5) a busca volta para o
+icontains original em título e descrição.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Limita a quantidade de termos para evitar consultas gigantes
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _terms(search):
+    return _TERM_RE.findall(search.lower())[:MAX_TERMS]
+
+
+class LikeSearchBackend:
+    """Fallback sem índice: LIKE '%termo%' em título e descrição."""
+
+    def index(self, connection, tool_ids):
+        pass
+
+    def remove(self, connection, tool_ids):
+        pass
+
+    def search(self, queryset, search, rank=False):
+        queryset = queryset.filter(
+            Q(title__icontains=search) | Q(description__icontains=search)
+        )
+        if rank:
+            queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return queryset
+
+
+class PostgresSearchBackend(LikeSearchBackend):
+    table = "marketplace_tool_search"
+    config = "marketplace_portuguese"
+
+    @property
+    def document_sql(self):
+        return (
+            f"setweight(to_tsvector('{self.config}', coalesce(t.title, '')), 'A') || "
+            f"setweight(to_tsvector('{self.config}', coalesce(t.description, '')), 'B')"
+        )
+
+    def _upsert(self, connection, where="", params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self.table} (tool_id, document)
+                SELECT t.id, {self.document_sql} FROM marketplace_tool t {where}
+                ON CONFLICT (tool_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                params,
+            )
+
+    def index(self, connection, tool_ids):
+        self._upsert(connection, "WHERE t.id = ANY(%s)", [list(tool_ids)])
+
+    def remove(self, connection, tool_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE tool_id = ANY(%s)", [list(tool_ids)])
+
+    def search(self, queryset, search, rank=False):
+        terms = _terms(search)
+        if not terms:
+            return super().search(queryset, search, rank)
+
+        # Busca por prefixo em todos os termos: "furad eletr" -> furad:* & eletr:*
+        query = " & ".join(f"{term}:*" for term in terms)
+        tsquery = f"to_tsquery('{self.config}', %s)"
+        queryset = queryset.filter(
+            id__in=RawSQL(f"SELECT tool_id FROM {self.table} WHERE document @@ {tsquery}", [query])
+        )
+        if rank:
+            queryset = queryset.annotate(
+                search_rank=RawSQL(
+                    f"SELECT ts_rank_cd(s.document, {tsquery}) FROM {self.table} s "
+                    f"WHERE s.tool_id = marketplace_tool.id",
+                    [query],
+                    output_field=FloatField(),
+                )
+            )
+        return queryset
+
+
+class SQLiteSearchBackend(LikeSearchBackend):
+    table = "marketplace_tool_fts"
+
+    def index(self, connection, tool_ids):
+        tool_ids = list(tool_ids)
+        placeholders = ", ".join(["%s"] * len(tool_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", tool_ids)
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, description) "
+                f"SELECT id, title, description FROM marketplace_tool WHERE id IN ({placeholders})",
+                tool_ids,
+            )
+
+    def remove(self, connection, tool_ids):
+        tool_ids = list(tool_ids)
+        placeholders = ", ".join(["%s"] * len(tool_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", tool_ids)
+
+    def search(self, queryset, search, rank=False):
+        terms = _terms(search)
+        if not terms:
+            return super().search(queryset, search, rank)
+
+        # Busca por prefixo em todos os termos: "furad eletr" -> "furad"* "eletr"*
+        query = " ".join(f'"{term}"*' for term in terms)
+        queryset = queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [query])
+        )
+        if rank:
+            # bm25 é menor para os mais relevantes; o título pesa 10x a descrição
+            queryset = queryset.annotate(
+                search_rank=RawSQL(
+                    f"SELECT -bm25({self.table}, 10.0, 1.0) FROM {self.table} "
+                    f"WHERE {self.table} MATCH %s AND rowid = marketplace_tool.id",
+                    [query],
+                    output_field=FloatField(),
+                )
+            )
+        return queryset
+
+
+_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+# Cache (por alias de banco) de qual backend está efetivamente instalado
+_active_backends = {}
+
+
+def _backend_for_vendor(vendor):
+    return _BACKENDS.get(vendor, LikeSearchBackend)()
+
+
+def get_backend(using="default"):
+    backend = _active_backends.get(using)
+    if backend is None:
+        connection = connections[using]
+        backend = _backend_for_vendor(connection.vendor)
+        table = getattr(backend, "table", None)
+        if table and table not in connection.introspection.table_names():
+            backend = LikeSearchBackend()
+        _active_backends[using] = backend
+    return backend
+
+
+def search_tools(queryset, search, rank=False):
+    """
+    Filtra o queryset pelos termos de busca.
+    Com rank=True anota `search_rank` (maior = mais relevante).
+
+    Com índice, consulta se algo casa (EXISTS no índice, com os demais
+    filtros do queryset) e só sem nenhum resultado volta para o icontains.
+    """
+    backend = get_backend(queryset.db)
+    results = backend.search(queryset, search, rank)
+    if getattr(backend, "table", None) and not results.exists():
+        return LikeSearchBackend().search(queryset, search, rank)
+    return results
+
+
+def index_tools(tool_ids, using="default"):
+    tool_ids = [tool_id for tool_id in tool_ids if tool_id is not None]
+    if tool_ids:
+        get_backend(using).index(connections[using], tool_ids)
+
+
+def remove_tools(tool_ids, using="default"):
+    tool_ids = [tool_id for tool_id in tool_ids if tool_id is not None]
+    if tool_ids:
+        get_backend(using).remove(connections[using], tool_ids)
+
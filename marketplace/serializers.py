@@ -1,9 +1,24 @@
+from urllib.parse import urlparse
+
+from django.conf import settings
 from django.contrib.auth.models import User
 
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from .images import IMAGE_VARIANTS, get_photo_urls
+from .imaging import MAX_PHOTO_BYTES, PHOTO_TOO_LARGE_MESSAGE, InvalidImage, inspect_image
 from .models import Tool, Rental
+from .photos import is_public_host
+from .fieldsets import SparseFieldsMixin
+from .representation import CompiledRepresentationMixin
+
+# Formatos de imagem aceitos para a foto da ferramenta
+PHOTO_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp']
+
+
+def _has_photo_extension(name):
+    return f".{name.lower().split('.')[-1]}" in PHOTO_EXTENSIONS
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -12,11 +27,20 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email", "first_name", "last_name"]
 
 
-class ToolSerializer(serializers.ModelSerializer):
+class ToolSerializer(SparseFieldsMixin, CompiledRepresentationMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_urls = serializers.SerializerMethodField()
     available = serializers.BooleanField(source="is_available", read_only=True)
     owner_username = serializers.CharField(source="owner.username", read_only=True)
 
+    # Colunas lidas por campo, para ?fields= (ver fieldsets.py)
+    field_columns = {
+        "image_url": ("photo", "photo_urls"),
+        "image_urls": ("photo", "photo_urls"),
+        "available": ("is_available",),
+        "owner_username": ("owner__username",),
+    }
+
     class Meta:
         model = Tool
         fields = [
@@ -27,6 +51,8 @@ class ToolSerializer(serializers.ModelSerializer):
             "price_per_day",
             "photo",
             "image_url",
+            "image_urls",
+            "photo_status",
             "available",
             "state",
             "city",
@@ -34,50 +60,111 @@ class ToolSerializer(serializers.ModelSerializer):
             "owner",
             "owner_username",
         ]
-        read_only_fields = ["owner", "created_at", "is_available"]
+        read_only_fields = ["owner", "created_at", "is_available", "photo_status"]
 
     def validate_photo(self, value):
         """
         Valida o tamanho e formato da imagem.
-        Limite: 5MB
-        Formatos permitidos: JPEG, PNG, WEBP
+        Limite: 5MB e TOOL_PHOTO_MAX_DIMENSION pixels por lado
+        Formatos permitidos: JPEG, PNG, WEBP (conferidos pelo conteúdo)
         """
         if value:
-            # Limite de 5MB (5 * 1024 * 1024 bytes)
-            max_size = 5 * 1024 * 1024
-            if value.size > max_size:
-                raise serializers.ValidationError(
-                    "A imagem é muito grande. Tamanho máximo permitido: 5MB."
-                )
+            # Limite de 5MB
+            if value.size > MAX_PHOTO_BYTES:
+                raise serializers.ValidationError(PHOTO_TOO_LARGE_MESSAGE)
 
             # Verificar formato (extensão)
-            valid_extensions = ['.jpg', '.jpeg', '.png', '.webp']
-            file_extension = value.name.lower().split('.')[-1]
-            if f'.{file_extension}' not in valid_extensions:
+            if not _has_photo_extension(value.name):
                 raise serializers.ValidationError(
                     "Formato de imagem inválido. Use JPEG, PNG ou WEBP."
                 )
 
+            # Verificar conteúdo (assinatura e dimensões, só pelo cabeçalho)
+            try:
+                inspect_image(value)
+            except InvalidImage as exc:
+                raise serializers.ValidationError(str(exc))
+
         return value
 
+    def _absolute(self, url):
+        request = self.context.get("request")
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def _photo_urls(self, obj):
+        """
+        URLs absolutas da foto. image_url e image_urls usam as mesmas URLs:
+        calculadas uma vez por ferramenta.
+        """
+        cached = self.__dict__.get("_photo_urls_cache")
+        if cached is not None and cached[0] is obj:
+            return cached[1]
+
+        urls = get_photo_urls(obj)
+        if not urls:
+            result = {"original": self._absolute(obj.photo.url)}
+        else:
+            result = {name: self._absolute(urls[name]) for name in ["original", *IMAGE_VARIANTS]}
+        self._photo_urls_cache = (obj, result)
+        return result
+
     @extend_schema_field(serializers.URLField(allow_null=True))
     def get_image_url(self, obj):
         if not obj.photo:
             return None
 
-        request = self.context.get("request")
-        url = obj.photo.url
+        return self._photo_urls(obj)["original"]
 
-        if request is not None:
-            return request.build_absolute_uri(url)
-        return url
+    @extend_schema_field(
+        serializers.DictField(child=serializers.URLField(), allow_null=True,
+                              help_text="Variações da imagem: " + ", ".join(["original", *IMAGE_VARIANTS]))
+    )
+    def get_image_urls(self, obj):
+        if not obj.photo:
+            return None
+
+        return dict(self._photo_urls(obj))
 
 
-class RentalSerializer(serializers.ModelSerializer):
+class ToolImportSerializer(ToolSerializer):
+    """
+    Linha da importação em massa. `photo` é a origem da imagem (URL http/https
+    de endereço público, ou caminho local quando o contexto tem
+    allow_local_photos), enviada depois.
+    """
+
+    photo = serializers.CharField(max_length=500, write_only=True)
+
+    def validate_photo(self, value):
+        parsed = urlparse(value)
+        is_url = parsed.scheme in ("http", "https") and parsed.netloc
+        if not is_url and not self.context.get("allow_local_photos"):
+            raise serializers.ValidationError("Informe a URL (http/https) da imagem.")
+        if is_url and not is_public_host(parsed.hostname):
+            raise serializers.ValidationError("A URL da imagem deve apontar para um endereço público.")
+        if not _has_photo_extension(parsed.path if is_url else value):
+            raise serializers.ValidationError(
+                "Formato de imagem inválido. Use JPEG, PNG ou WEBP."
+            )
+        return value
+
+
+class RentalSerializer(SparseFieldsMixin, CompiledRepresentationMixin, serializers.ModelSerializer):
     renter_username = serializers.CharField(source="renter.username", read_only=True)
     owner_username = serializers.CharField(source="tool.owner.username", read_only=True)
     tool_details = serializers.SerializerMethodField()
 
+    # tool_details só com ?expand=tool quando a resposta é esparsa
+    expandable_fields = {"tool": "tool_details"}
+    field_columns = {
+        "renter_username": ("renter__username",),
+        "owner_username": ("tool__owner__username",),
+        # Colunas da ferramenta: as do ToolSerializer (ver RentalViewSet)
+        "tool_details": (),
+    }
+
     class Meta:
         model = Rental
         fields = [
@@ -97,7 +184,20 @@ class RentalSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(ToolSerializer)
     def get_tool_details(self, obj):
-        return ToolSerializer(obj.tool, context=self.context).data
+        if settings.API_FAST_SERIALIZATION:
+            # Um único ToolSerializer (compilado uma vez) para todos os aluguéis
+            return self._tool_serializer().to_representation(obj.tool)
+        return ToolSerializer(obj.tool, context=self._tool_context()).data
+
+    def _tool_serializer(self):
+        serializer = self.__dict__.get("_tool_details_serializer")
+        if serializer is None:
+            serializer = self._tool_details_serializer = ToolSerializer(context=self._tool_context())
+        return serializer
+
+    def _tool_context(self):
+        # ?fields= se refere aos campos do aluguel, não aos da ferramenta
+        return {key: value for key, value in self.context.items() if key not in ("fields", "expand")}
 
 
 class RentalCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import facets, search
+from .authentication import DELETED_VERSION, record_user_version, token_version, user_cache
+from .availability import invalidate_availability
+from .cache import bump_generation
+from .models import Rental, Tool
+
+# Campos que compõem o documento de busca da ferramenta
+SEARCH_FIELDS = {"title", "description"}
+
+
+@receiver(post_save, sender=Tool)
+def index_tool_search_document(sender, instance, created, update_fields=None, using="default", **kwargs):
+    # Saves parciais que não tocam título/descrição (ex.: is_available) não reindexam
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    search.index_tools([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Tool)
+def remove_tool_search_document(sender, instance, using="default", **kwargs):
+    search.remove_tools([instance.pk], using=using)
+
+
+@receiver(post_save, sender=Tool)
+@receiver(post_delete, sender=Tool)
+@receiver(post_save, sender=Rental)
+@receiver(post_delete, sender=Rental)
+def invalidate_tool_responses(sender, **kwargs):
+    # Aprovar/rejeitar/finalizar aluguéis altera is_available das ferramentas
+    bump_generation("tools")
+
+
+@receiver(pre_save, sender=Tool)
+def load_facet_key_before_save(sender, instance, update_fields=None, using="default", **kwargs):
+    facets.tool_saving(instance, update_fields=update_fields, using=using)
+
+
+@receiver(post_save, sender=Tool)
+def update_facet_counts_on_save(sender, instance, created, update_fields=None, using="default", **kwargs):
+    facets.tool_saved(instance, created, update_fields=update_fields, using=using)
+
+
+@receiver(post_delete, sender=Tool)
+def update_facet_counts_on_delete(sender, instance, using="default", **kwargs):
+    facets.tool_deleted(instance, using=using)
+
+
+@receiver(post_save, sender=Rental)
+@receiver(post_delete, sender=Rental)
+def invalidate_rental_calendar(sender, instance, **kwargs):
+    invalidate_availability(instance.tool_id)
+
+
+@receiver(post_delete, sender=Tool)
+def invalidate_tool_calendar(sender, instance, **kwargs):
+    invalidate_availability(instance.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+def refresh_user_token_version(sender, instance, **kwargs):
+    # Troca de senha ou desativação muda a versão e invalida os tokens anteriores
+    user_cache.discard(instance.pk)
+    record_user_version(instance.pk, token_version(instance))
+
+
+@receiver(post_delete, sender=get_user_model())
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    user_cache.discard(instance.pk)
+    record_user_version(instance.pk, DELETED_VERSION)
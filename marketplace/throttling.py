@@ -0,0 +1,89 @@
+"""
+Limites de taxa por janela deslizante para login e registro.
+
+Os throttles do DRF rodam antes da view, então tentativas acima do limite são
+recusadas (429, com Retry-After) sem calcular nenhum hash de senha. Cada
+limite usa dois contadores no cache (janela atual e anterior) e estima as
+requisições dos últimos `duração` segundos somando a janela atual à fração
+ainda coberta da anterior: custo constante, sem guardar a lista de horários
+como o SimpleRateThrottle. As taxas ficam em DEFAULT_THROTTLE_RATES.
+"""
+import hashlib
+from collections.abc import Mapping
+
+from django.contrib.auth import get_user_model
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        current_key = f"{self.key}:{window}"
+        counts = self.cache.get_many([f"{self.key}:{window - 1}", current_key])
+        self.previous = counts.get(f"{self.key}:{window - 1}", 0)
+        self.current = counts.get(current_key, 0)
+        self.elapsed = self.now - window * self.duration
+
+        estimated = self.previous * (1 - self.elapsed / self.duration) + self.current
+        if estimated >= self.num_requests:
+            return False
+        # A chave precisa durar a janela atual e a seguinte (quando vira a anterior)
+        if not self.cache.add(current_key, 1, 2 * self.duration):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                self.cache.set(current_key, 1, 2 * self.duration)
+        return True
+
+    def wait(self):
+        """Segundos até a estimativa ficar abaixo do limite."""
+        if self.current < self.num_requests and self.previous:
+            remaining = self.duration * (1 - (self.num_requests - self.current) / self.previous) - self.elapsed
+        else:
+            # Só a janela atual já estoura: espera ela virar a anterior e decair
+            remaining = self.duration - self.elapsed + self.duration * (1 - self.num_requests / self.current)
+        return max(remaining, 0)
+
+
+class IPSlidingWindowThrottle(SlidingWindowThrottle):
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class UsernameSlidingWindowThrottle(SlidingWindowThrottle):
+    """
+    Limite por nome de usuário enviado no corpo. Sem nome (ou com um corpo
+    que não é um objeto, como uma lista JSON) só vale o limite por IP.
+    """
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get(get_user_model().USERNAME_FIELD)
+        if not isinstance(username, str) or not username.strip():
+            return None
+        ident = hashlib.sha256(username.strip().lower().encode()).hexdigest()[:32]
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class LoginIPThrottle(IPSlidingWindowThrottle):
+    scope = "login_ip"
+
+
+class LoginUsernameThrottle(UsernameSlidingWindowThrottle):
+    scope = "login_username"
+
+
+class RegisterIPThrottle(IPSlidingWindowThrottle):
+    scope = "register_ip"
+
+
+class RegisterUsernameThrottle(UsernameSlidingWindowThrottle):
+    scope = "register_username"
@@ -0,0 +1,29 @@
+"""
+Geração das miniaturas WEBP, executada nos processos do pool (ver imaging.py).
+
+Este módulo depende só do Pillow: os processos do pool (spawn) o importam
+sem carregar Django nem Cloudinary.
+"""
+from PIL import Image, ImageOps
+
+
+def variant_path(base_path, name):
+    """Caminho da miniatura WEBP de uma variação: <foto>.<variação>.webp"""
+    return f"{base_path}.{name}.webp"
+
+
+def render_variant(source, destination, options):
+    """Gera uma variação WEBP (executado nos processos do pool)."""
+    width, height = options["width"], options.get("height")
+    with Image.open(source) as image:
+        # JPEG: decodifica direto em resolução reduzida quando possível
+        image.draft("RGB", (width, height or width))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        if options.get("crop") == "fill" and height:
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((width, height or image.height), Image.Resampling.LANCZOS)
+        image.save(destination, "WEBP", quality=80, method=4)
+    return destination
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ToolViewSet, RentalViewSet, me, register
@@ -11,3 +12,10 @@ urlpatterns = [
     path('auth/me/', me),
     path('auth/register/', register, name='register'),
 ]
+
+if settings.API_ASYNC_READS:
+    # Sob ASGI: leituras de ferramentas e de auth/me/ nas views async; as
+    # escritas das mesmas rotas continuam nas views síncronas
+    from .async_views import async_urlpatterns
+
+    urlpatterns = async_urlpatterns(router) + urlpatterns
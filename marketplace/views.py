@@ -1,16 +1,36 @@
+import io
+from collections.abc import Mapping
 from decimal import Decimal
+from functools import partial
 
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError
 from django.db.models import Q
 from django.utils import timezone
 
-from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes, action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from .accounts import INVALID_EMAIL_MESSAGE, conflict_message, create_account
+from .authentication import full_user
+from .availability import availability_window, tool_availability
+from .booking import UNAVAILABLE_MESSAGE, book_tool
+from .cache import cached_response
+from .conditional import ConditionalResponseMixin, object_etag, set_validators
+from .facets import compute_facets
+from .fieldsets import SparseFieldsViewMixin, restrict_queryset, serializer_columns
+from .filters import filter_tools, order_tools
+from .importer import IMPORT_FORMATS, InvalidImportFile, guess_format, import_tools, read_rows
 from .models import Tool, Rental
+from .photos import stage_photo
 from .permissions import IsToolOwnerOrReadOnly, IsRentalParticipant
 from .serializers import (
     ToolSerializer,
@@ -18,6 +38,19 @@ from .serializers import (
     RentalCreateSerializer,
     UserSerializer,
 )
+from .throttling import RegisterIPThrottle, RegisterUsernameThrottle
+
+
+FIELDS_PARAMETER = OpenApiParameter(
+    "fields", str,
+    description=(
+        "Campos da resposta, separados por vírgula (ex.: id,title,price_per_day,image_url). "
+        "A consulta ao banco também carrega só as colunas desses campos."
+    ),
+)
+EXPAND_PARAMETER = OpenApiParameter(
+    "expand", str, description="Expansões separadas por vírgula. `tool`: inclui `tool_details`."
+)
 
 
 @extend_schema_view(
@@ -25,11 +58,13 @@ from .serializers import (
         summary="Listar ferramentas",
         description="Lista todas as ferramentas disponíveis com suporte a filtros, busca, ordenação e paginação.",
         tags=["Ferramentas"],
+        parameters=[FIELDS_PARAMETER],
     ),
     retrieve=extend_schema(
         summary="Detalhes da ferramenta",
         description="Retorna os detalhes completos de uma ferramenta específica.",
         tags=["Ferramentas"],
+        parameters=[FIELDS_PARAMETER],
     ),
     create=extend_schema(
         summary="Criar ferramenta",
@@ -52,59 +87,66 @@ from .serializers import (
         tags=["Ferramentas"],
     ),
 )
-class ToolViewSet(ModelViewSet):
-    queryset = Tool.objects.all()
+class ToolViewSet(SparseFieldsViewMixin, ConditionalResponseMixin, ModelViewSet):
+    # owner_username é serializado em todas as respostas
+    queryset = Tool.objects.select_related("owner")
     serializer_class = ToolSerializer
     permission_classes = [IsAuthenticated, IsToolOwnerOrReadOnly]
 
     def get_permissions(self):
         """
-        Permite acesso público apenas para listagem (list e retrieve).
+        Permite acesso público apenas para listagem (list, retrieve, facets e availability).
         Para criar, editar ou deletar, exige autenticação.
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'facets', 'availability']:
             # Acesso público para listar e ver detalhes
             return [AllowAny()]
         # Para outras ações (create, update, destroy), exige autenticação
         return [IsAuthenticated(), IsToolOwnerOrReadOnly()]
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-
-        # Filtro por categoria (suporta múltiplas categorias)
-        categories = self.request.query_params.getlist("category")
-        if categories:
-            queryset = queryset.filter(category__in=categories)
-
-        # Filtro por estado (UF)
-        state = self.request.query_params.get("state")
-        if state:
-            queryset = queryset.filter(state__iexact=state)
-
-        # Filtro por cidade (busca parcial, case-insensitive)
-        city = self.request.query_params.get("city")
-        if city:
-            queryset = queryset.filter(city__icontains=city)
-
-        # Busca textual em título e descrição (param search)
-        search = self.request.query_params.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
+        params = self.request.query_params
+        queryset = order_tools(filter_tools(super().get_queryset(), params), params)
+        fields, _ = self.get_sparse_params()
+        if fields is not None:
+            # ?fields=: só as colunas e joins dos campos pedidos
+            queryset = restrict_queryset(queryset, serializer_columns(ToolSerializer, fields))
+        return queryset
 
-        # Ordenação (created_at, price_per_day)
-        ordering = self.request.query_params.get("ordering")
-        if ordering in ["created_at", "-created_at", "price_per_day", "-price_per_day"]:
-            queryset = queryset.order_by(ordering)
-        else:
-            # Ordenação padrão para evitar warnings de paginação
-            queryset = queryset.order_by("-created_at")
+    def list(self, request, *args, **kwargs):
+        # O queryset só é montado fora do cache (a busca textual pode consultar o banco)
+        return cached_response(
+            request, lambda: self.conditional_list_response(self.filter_queryset(self.get_queryset()))
+        )
 
-        return queryset
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(request, lambda: self.conditional_object_response(self.get_object()))
+
+    def update(self, request, *args, **kwargs):
+        # If-Match evita sobrescrever alterações feitas por outro cliente
+        response = self.conditional_write(partial(super().update, request, *args, **kwargs))
+        if response.status_code == status.HTTP_200_OK:
+            set_validators(response, object_etag(self.updated_instance))
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        return self.conditional_write(partial(super().destroy, request, *args, **kwargs))
 
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        # A foto vai para o staging e é enviada em segundo plano (photos.py)
+        photo = serializer.validated_data.pop("photo", None)
+        tool = serializer.save(owner=self.request.user, **self._photo_status(photo))
+        if photo:
+            stage_photo(tool, photo)
+
+    def perform_update(self, serializer):
+        photo = serializer.validated_data.pop("photo", None)
+        self.updated_instance = serializer.save(**self._photo_status(photo))
+        if photo:
+            stage_photo(self.updated_instance, photo)
+
+    def _photo_status(self, photo):
+        return {"photo_status": Tool.PHOTO_PENDING} if photo else {}
 
     @extend_schema(
         summary="Minhas ferramentas",
@@ -114,25 +156,99 @@ class ToolViewSet(ModelViewSet):
     @action(detail=False, methods=["get"], url_path="my", permission_classes=[IsAuthenticated])
     def my_tools(self, request):
         queryset = self.get_queryset().filter(owner=request.user)
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        return self.conditional_list_response(queryset)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+    @extend_schema(
+        summary="Importar ferramentas em massa",
+        description=(
+            "Importa ferramentas de um arquivo CSV ou JSONL (campo `file`, multipart) para o usuário "
+            "autenticado. Cada linha segue as regras de criação de ferramenta; `photo` é a URL da "
+            "imagem, enviada em segundo plano. Linhas inválidas são reportadas em `errors` sem "
+            "interromper a importação."
+        ),
+        tags=["Ferramentas"],
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {
+                    "file": {"type": "string", "format": "binary"},
+                    "format": {"type": "string", "enum": [*IMPORT_FORMATS]},
+                },
+                "required": ["file"],
+            }
+        },
+    )
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "Envie o arquivo CSV ou JSONL."})
+        file_format = request.data.get("format") or guess_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            raise ValidationError({"format": "Formato inválido. Use csv ou jsonl."})
+
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            report = import_tools(
+                read_rows(stream, file_format),
+                request.user,
+                max_rows=settings.TOOL_IMPORT_MAX_ROWS,
+            )
+        except UnicodeDecodeError:
+            raise ValidationError({"file": "O arquivo deve estar em UTF-8."})
+        except InvalidImportFile as exc:
+            raise ValidationError({"file": str(exc)})
+
+        response_status = status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=response_status)
+
+    @extend_schema(
+        summary="Facetas de ferramentas",
+        description=(
+            "Contagens por categoria, estado (UF) e disponibilidade para os mesmos filtros "
+            "da listagem (category, state, city, search). A contagem de categorias ignora "
+            "o filtro de categoria, para exibir quantas ferramentas cada opção retornaria."
+        ),
+        tags=["Ferramentas"],
+    )
+    @action(detail=False, methods=["get"], url_path="facets")
+    def facets(self, request):
+        return cached_response(request, lambda: Response(compute_facets(request.query_params)))
+
+    @extend_schema(
+        summary="Calendário de disponibilidade",
+        description=(
+            "Dias bloqueados (aluguéis pendentes ou aprovados) da ferramenta entre `from` e `to` "
+            "(padrão: próximos 90 dias, máximo 366). `blocked` traz os intervalos fechados "
+            "mesclados; `bitmap` é o base64 de um bit por dia a partir de `from`."
+        ),
+        tags=["Ferramentas"],
+    )
+    @action(detail=True, methods=["get"], url_path="availability")
+    def availability(self, request, pk=None):
+        start, end = availability_window(request.query_params)
+        try:
+            tool_id = int(pk)
+        except ValueError:
+            raise NotFound()
+        return Response(tool_availability(tool_id, start, end))
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="Listar aluguéis",
-        description="Lista aluguéis onde o usuário é renter ou owner da ferramenta.",
+        description=(
+            "Lista aluguéis onde o usuário é renter ou owner da ferramenta. Com `fields` ou `expand`, "
+            "`tool_details` só é incluído quando pedido (`expand=tool`)."
+        ),
         tags=["Aluguéis"],
+        parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER],
     ),
     retrieve=extend_schema(
         summary="Detalhes do aluguel",
         description="Retorna os detalhes completos de um aluguel específico.",
         tags=["Aluguéis"],
+        parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER],
     ),
     create=extend_schema(
         summary="Criar aluguel",
@@ -140,22 +256,46 @@ class ToolViewSet(ModelViewSet):
         tags=["Aluguéis"],
     ),
 )
-class RentalViewSet(ModelViewSet):
+class RentalViewSet(SparseFieldsViewMixin, ConditionalResponseMixin, ModelViewSet):
     queryset = Rental.objects.all()
     serializer_class = RentalSerializer
     permission_classes = [IsAuthenticated, IsRentalParticipant]
 
     def get_queryset(self):
         user = self.request.user
-        return Rental.objects.select_related("tool", "renter", "tool__owner").filter(
+        queryset = Rental.objects.select_related("tool", "renter", "tool__owner").filter(
             Q(renter=user) | Q(tool__owner=user)
         ).order_by("-created_at")
+        fields, expand = self.get_sparse_params()
+        if fields is not None or expand is not None:
+            queryset = restrict_queryset(queryset, self._sparse_columns(fields))
+        return queryset
+
+    def _sparse_columns(self, fields):
+        expanded = "tool" in self.get_expansions()
+        names = [*(fields or RentalSerializer().get_fields())]
+        columns = serializer_columns(RentalSerializer, names)
+        if expanded:
+            columns += serializer_columns(ToolSerializer, [*ToolSerializer().get_fields()], prefix="tool__")
+        return columns
 
     def get_serializer_class(self):
         if self.action == "create":
             return RentalCreateSerializer
         return RentalSerializer
 
+    def get_etag_objects(self, instance):
+        # Com tool_details, a representação do aluguel inclui os dados da ferramenta
+        if "tool" in self.get_expansions():
+            return (instance, instance.tool)
+        return (instance,)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_list_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_object_response(self.get_object())
+
     def perform_create(self, serializer):
         tool = serializer.validated_data["tool"]
         start_date = serializer.validated_data["start_date"]
@@ -164,7 +304,7 @@ class RentalViewSet(ModelViewSet):
 
         # Validação 1: Ferramenta deve estar disponível (verificar primeiro)
         if not tool.is_available:
-            raise ValidationError("Esta ferramenta não está disponível para aluguel.")
+            raise ValidationError(UNAVAILABLE_MESSAGE)
 
         # Validação 2: Data inicial não pode ser no passado
         if start_date < today:
@@ -179,32 +319,11 @@ class RentalViewSet(ModelViewSet):
         if days <= 0:
             raise ValidationError("Período de aluguel inválido.")
 
-        # Validação 5: Verificar conflito com outros aluguéis aprovados ou pendentes
-        # Um aluguel conflita se:
-        # - O período se sobrepõe (start_date <= outro.end_date AND end_date >= outro.start_date)
-        # - E o status é 'pending' ou 'approved'
-        conflicting_rentals = Rental.objects.filter(
-            tool=tool,
-            status__in=["pending", "approved"]
-        ).filter(
-            Q(start_date__lte=end_date) & Q(end_date__gte=start_date)
-        )
-
-        if conflicting_rentals.exists():
-            raise ValidationError(
-                "Já existe um aluguel aprovado ou pendente para este período. "
-                "Escolha outras datas."
-            )
-
         total_price = (tool.price_per_day or Decimal("0")) * days
 
-        tool.is_available = False
-        tool.save(update_fields=["is_available"])
-
-        serializer.save(
-            renter=self.request.user,
-            total_price=total_price,
-        )
+        # Validação 5 (conflito com aluguéis aprovados ou pendentes) e bloqueio
+        # da ferramenta acontecem atomicamente no banco (ver booking.py)
+        serializer.instance = book_tool(tool, self.request.user, start_date, end_date, total_price)
 
     def _ensure_tool_owner(self, rental, user):
         if rental.tool.owner != user:
@@ -222,13 +341,7 @@ class RentalViewSet(ModelViewSet):
     @action(detail=False, methods=["get"], url_path="my")
     def my_rentals(self, request):
         queryset = self.get_queryset().filter(renter=request.user)
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.conditional_list_response(queryset)
 
     @extend_schema(
         summary="Aluguéis recebidos",
@@ -238,13 +351,7 @@ class RentalViewSet(ModelViewSet):
     @action(detail=False, methods=["get"], url_path="received")
     def received_rentals(self, request):
         queryset = self.get_queryset().filter(tool__owner=request.user)
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.conditional_list_response(queryset)
 
     @extend_schema(
         summary="Aprovar aluguel",
@@ -259,8 +366,8 @@ class RentalViewSet(ModelViewSet):
 
         rental.status = "approved"
         rental.tool.is_available = False
-        rental.tool.save(update_fields=["is_available"])
-        rental.save(update_fields=["status"])
+        rental.tool.save(update_fields=["is_available", "updated_at"])
+        rental.save(update_fields=["status", "updated_at"])
 
         serializer = self.get_serializer(rental)
         return Response(serializer.data)
@@ -278,8 +385,8 @@ class RentalViewSet(ModelViewSet):
 
         rental.status = "rejected"
         rental.tool.is_available = True
-        rental.tool.save(update_fields=["is_available"])
-        rental.save(update_fields=["status"])
+        rental.tool.save(update_fields=["is_available", "updated_at"])
+        rental.save(update_fields=["status", "updated_at"])
 
         serializer = self.get_serializer(rental)
         return Response(serializer.data)
@@ -304,8 +411,8 @@ class RentalViewSet(ModelViewSet):
 
         rental.status = "finished"
         rental.tool.is_available = True
-        rental.tool.save(update_fields=["is_available"])
-        rental.save(update_fields=["status"])
+        rental.tool.save(update_fields=["is_available", "updated_at"])
+        rental.save(update_fields=["status", "updated_at"])
 
         serializer = self.get_serializer(rental)
         return Response(serializer.data)
@@ -320,7 +427,8 @@ class RentalViewSet(ModelViewSet):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def me(request):
-    serializer = UserSerializer(request.user)
+    # Nas leituras request.user tem só as claims do token
+    serializer = UserSerializer(full_user(request.user))
     return Response(serializer.data)
 
 
@@ -347,14 +455,15 @@ def me(request):
     },
 )
 @api_view(["POST"])
+@throttle_classes([RegisterIPThrottle, RegisterUsernameThrottle])
 def register(request):
     """Endpoint para registro de novos usuários"""
-    from django.contrib.auth import get_user_model
-    from django.core.exceptions import ValidationError
-    from django.core.validators import validate_email
-    
-    User = get_user_model()
-    
+    if not isinstance(request.data, Mapping):
+        return Response(
+            {'error': 'O corpo da requisição deve ser um objeto JSON'},
+            status=400
+        )
+
     username = request.data.get('username', '').strip()
     email = request.data.get('email', '').strip()
     password = request.data.get('password')
@@ -383,34 +492,27 @@ def register(request):
     # Validar formato do email
     try:
         validate_email(email)
-    except ValidationError:
-        return Response(
-            {'error': 'Email inválido'},
-            status=400
-        )
-    
-    # Verificar se usuário já existe
-    if User.objects.filter(username=username).exists():
+    except DjangoValidationError:
         return Response(
-            {'error': 'Nome de usuário já está em uso'},
+            {'error': INVALID_EMAIL_MESSAGE},
             status=400
         )
     
-    # Verificar se email já existe
-    if User.objects.filter(email=email).exists():
-        return Response(
-            {'error': 'Email já está cadastrado'},
-            status=400
+    # Criar usuário normal (não superusuário); username/email repetidos
+    # esbarram nas constraints do banco (ver accounts.py)
+    try:
+        user = create_account(
+            username=username,
+            email=email,
+            password=password,
+            first_name=first_name,
+            last_name=last_name
         )
-    
-    # Criar usuário normal (não superusuário)
-    user = User.objects.create_user(
-        username=username,
-        email=email,
-        password=password,
-        first_name=first_name,
-        last_name=last_name
-    )
+    except IntegrityError as exc:
+        message = conflict_message(exc)
+        if message is None:
+            raise
+        return Response({'error': message}, status=400)
     
     serializer = UserSerializer(user)
-    return Response(serializer.data, status=201)
\ No newline at end of file
+    return Response(serializer.data, status=201)
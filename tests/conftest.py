@@ -1,11 +1,38 @@
 from __future__ import annotations
 
+import cloudinary
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from model_bakery import baker
 from rest_framework.test import APIClient
 
+from marketplace.authentication import user_cache
 from marketplace.models import Tool
+from marketplace.revocation import revocation_list
+
+
+# Identificador Cloudinary usado nas ferramentas de teste (nenhum upload é feito)
+SAMPLE_PHOTO = "tools/sample"
+
+
+@pytest.fixture(autouse=True)
+def cloudinary_config():
+    # Montar URLs do Cloudinary é offline, mas exige um cloud_name configurado
+    if not cloudinary.config().cloud_name:
+        cloudinary.config(cloud_name="my-tools-test")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # O banco é revertido entre testes, o cache em memória não
+    cache.clear()
+    user_cache.clear()
+    revocation_list.clear()
+    yield
+    cache.clear()
+    user_cache.clear()
+    revocation_list.clear()
 
 
 @pytest.fixture
@@ -60,14 +87,32 @@ def other_client(api_client, other_user):
 
 @pytest.fixture
 def tool(owner_user) -> Tool:
-    return baker.make(Tool, owner=owner_user, is_available=True)
+    return baker.make(Tool, owner=owner_user, is_available=True, photo=SAMPLE_PHOTO)
 
 
 @pytest.fixture
 def tool_factory(owner_user):
     def _factory(**kwargs):
-        defaults = {"owner": owner_user}
+        defaults = {"owner": owner_user, "photo": SAMPLE_PHOTO}
         defaults.update(kwargs)
         return baker.make(Tool, **defaults)
 
     return _factory
+
+
+@pytest.fixture(autouse=True)
+def photo_pipeline(settings, tmp_path):
+    # Fotos gravadas em disco (sem Cloudinary) e enviadas logo após o commit
+    settings.TOOL_PHOTO_BACKEND = "marketplace.photos.LocalPhotoBackend"
+    settings.TOOL_PHOTO_WORKER = "inline"
+    settings.TOOL_PHOTO_STAGING_ROOT = str(tmp_path / "staging")
+    settings.TOOL_PHOTO_LOCAL_ROOT = str(tmp_path / "photos")
+
+
+@pytest.fixture(autouse=True)
+def static_storage(settings):
+    # Os testes não rodam collectstatic: sem manifest dos arquivos com hash
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    }
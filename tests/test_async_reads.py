@@ -0,0 +1,151 @@
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import AsyncClient
+from django.urls import clear_url_caches, resolve
+
+import core.urls
+import marketplace.urls
+from core.middleware import CorsMiddleware, SiteOnlyMiddleware, StaticFilesMiddleware
+from marketplace import search
+from marketplace.models import Tool
+
+
+def _reload_urls():
+    importlib.reload(marketplace.urls)
+    importlib.reload(core.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_client(settings):
+    """Cliente async com as rotas de leitura async, como sob ASGI (core/asgi.py)."""
+    settings.API_ASYNC_READS = True
+    _reload_urls()
+    assert iscoroutinefunction(resolve("/api/tools/").func)
+    yield AsyncClient()
+    settings.API_ASYNC_READS = False
+    _reload_urls()
+
+
+def _get(client, path, **headers):
+    return async_to_sync(client.get)(path, headers=headers)
+
+
+def _login(api_client, username="user_default", password="password123"):
+    response = api_client.post("/api/auth/login/", {"username": username, "password": password}, format="json")
+    return {"Authorization": f"Bearer {response.json()['access']}"}
+
+
+@pytest.mark.django_db
+def test_async_list_matches_sync_list(api_client, async_client, tool_factory):
+    """Testa que a listagem async devolve o mesmo corpo e ETag da síncrona, com cache"""
+    tool_factory(_quantity=12)
+    expected = api_client.get("/api/tools/?page=2&fields=id,title")
+
+    first = _get(async_client, "/api/tools/?page=2&fields=id,title&_=1")
+    second = _get(async_client, "/api/tools/?page=2&fields=id,title&_=1")
+
+    assert first.status_code == 200
+    assert first.json()["count"] == 12
+    assert first.json()["results"] == expected.json()["results"]
+    assert first["X-Cache"] == "MISS"
+    assert second["X-Cache"] == "HIT"
+    assert second["ETag"] == first["ETag"]
+
+
+@pytest.mark.django_db
+def test_async_list_cursor_pagination(api_client, async_client, tool_factory):
+    """Testa a paginação por cursor no caminho async"""
+    tool_factory(_quantity=12)
+
+    first = _get(async_client, "/api/tools/?pagination=cursor").json()
+    second = _get(async_client, first["next"].replace("http://testserver", "")).json()
+
+    ids = [item["id"] for item in first["results"] + second["results"]]
+    assert len(ids) == 12 == len(set(ids))
+    assert second["next"] is None
+    assert second["previous"] is not None
+
+
+@pytest.mark.django_db
+def test_async_search_in_fresh_process(async_client, tool_factory, monkeypatch):
+    """Testa a busca no caminho async sem o backend de busca já escolhido (processo novo)"""
+    tool_factory(title="Furadeira", description="Potente")
+    tool_factory(title="Martelo", description="Cabo de madeira")
+    # Os signals de indexação já escolheram o backend neste processo
+    monkeypatch.setattr(search, "_active_backends", {})
+
+    response = _get(async_client, "/api/tools/?search=furadeira")
+
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()["results"]] == ["Furadeira"]
+
+
+@pytest.mark.django_db
+def test_async_retrieve_conditional_and_not_found(async_client, tool):
+    """Testa o detalhe async com If-None-Match e ids inexistentes ou inválidos"""
+    response = _get(async_client, f"/api/tools/{tool.id}/")
+    assert response.status_code == 200
+    assert response.json()["title"] == tool.title
+
+    not_modified = _get(async_client, f"/api/tools/{tool.id}/", **{"If-None-Match": response["ETag"]})
+    assert not_modified.status_code == 304
+    assert _get(async_client, "/api/tools/99999/").status_code == 404
+    assert _get(async_client, "/api/tools/abc/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_me(api_client, async_client, user):
+    """Testa /api/auth/me/ async com o usuário completo e sem token"""
+    response = _get(async_client, "/api/auth/me/", **_login(api_client))
+
+    assert response.status_code == 200
+    assert response.json()["email"] == user.email
+    assert _get(async_client, "/api/auth/me/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_writes_use_sync_views(api_client, async_client, owner_user, tool):
+    """Testa que as escritas nas rotas async continuam nas views síncronas"""
+    headers = _login(api_client, username=owner_user.username)
+
+    response = async_to_sync(async_client.delete)(f"/api/tools/{tool.id}/", headers=headers)
+
+    assert response.status_code == 204
+    assert not Tool.objects.filter(pk=tool.pk).exists()
+
+
+@pytest.mark.django_db
+def test_async_cors_headers(async_client, settings):
+    """Testa o CORS no modo async, na resposta e no preflight"""
+    origin = settings.CORS_ALLOWED_ORIGINS[0]
+
+    response = _get(async_client, "/api/tools/", Origin=origin)
+    preflight = async_to_sync(async_client.options)(
+        "/api/tools/", headers={"Origin": origin, "Access-Control-Request-Method": "POST"}
+    )
+
+    assert response["Access-Control-Allow-Origin"] == origin
+    assert preflight.status_code == 200
+    assert preflight["Access-Control-Allow-Origin"] == origin
+
+
+def test_middleware_follow_handler_mode():
+    """Testa que os middlewares do projeto rodam em modo async sem adaptação"""
+
+    async def async_view(request):
+        return HttpResponse()
+
+    def sync_view(request):
+        return HttpResponse()
+
+    for middleware_class in (CorsMiddleware, StaticFilesMiddleware, SiteOnlyMiddleware):
+        assert iscoroutinefunction(middleware_class(async_view))
+        assert not iscoroutinefunction(middleware_class(sync_view))
+
+    site_only = SiteOnlyMiddleware(async_view)
+    assert iscoroutinefunction(site_only.process_view)
+    assert iscoroutinefunction(site_only.process_template_response)
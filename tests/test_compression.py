@@ -0,0 +1,136 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from core import middleware
+
+
+@pytest.fixture
+def catalog(tool_factory):
+    # Descrições longas o bastante para a listagem passar do limite de compressão
+    return [tool_factory(description="Furadeira de impacto " * 40) for _ in range(3)]
+
+
+@pytest.mark.django_db
+def test_listing_is_gzipped_when_accepted(api_client, catalog, monkeypatch):
+    """Testa que a listagem grande volta com gzip e o mesmo JSON"""
+    monkeypatch.setattr(middleware, "brotli", None)
+
+    response = api_client.get("/api/tools/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert int(response["Content-Length"]) == len(response.content)
+    assert len(json.loads(gzip.decompress(response.content))["results"]) == 3
+
+
+@pytest.mark.django_db
+def test_brotli_preferred_when_installed(api_client, catalog):
+    """Testa que brotli é usado quando o cliente aceita e o pacote está instalado"""
+    brotli = pytest.importorskip("brotli")
+
+    response = api_client.get("/api/tools/", HTTP_ACCEPT_ENCODING="gzip, br")
+
+    assert response["Content-Encoding"] == "br"
+    assert len(json.loads(brotli.decompress(response.content))["results"]) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("accept_encoding", ["", "identity", "gzip;q=0, br;q=0"])
+def test_not_compressed_without_accepted_encoding(api_client, catalog, accept_encoding):
+    """Testa que sem codificação aceita a resposta volta sem compressão"""
+    response = api_client.get("/api/tools/", HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    assert not response.has_header("Content-Encoding")
+    assert response.json()["count"] == 3
+    assert "Accept-Encoding" in response["Vary"]
+
+
+@pytest.mark.django_db
+def test_small_responses_are_not_compressed(api_client, tool):
+    """Testa que respostas abaixo do limite não são comprimidas"""
+    response = api_client.get(f"/api/tools/{tool.id}/?fields=id", HTTP_ACCEPT_ENCODING="gzip")
+
+    assert not response.has_header("Content-Encoding")
+    assert response.json() == {"id": tool.id}
+
+
+@pytest.mark.django_db
+def test_compressed_listing_has_weak_etag_for_conditional_requests(api_client, catalog):
+    """Testa o ETag fraco da resposta comprimida e o If-None-Match com ele (inclusive do cache)"""
+    plain = api_client.get("/api/tools/")
+    first = api_client.get("/api/tools/", HTTP_ACCEPT_ENCODING="gzip")
+
+    second = api_client.get("/api/tools/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert first["Content-Encoding"] == "gzip"
+    assert first["X-Cache"] == "HIT"
+    assert first["ETag"] == f"W/{plain['ETag']}"
+    assert second.status_code == 304
+
+
+@pytest.mark.django_db
+def test_weak_etag_accepted_by_if_match(owner_client, owner_user, tool_factory):
+    """Testa que o If-Match aceita o ETag fraco de um detalhe comprimido e ainda barra versões antigas"""
+    tool = tool_factory(owner=owner_user, description="Furadeira de impacto " * 80)
+    etag = owner_client.get(f"/api/tools/{tool.id}/", HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+    assert etag.startswith('W/"')
+
+    updated = owner_client.patch(f"/api/tools/{tool.id}/", {"title": "Nova"}, format="json", HTTP_IF_MATCH=etag)
+    stale = owner_client.patch(f"/api/tools/{tool.id}/", {"title": "Outra"}, format="json", HTTP_IF_MATCH=etag)
+
+    assert updated.status_code == 200
+    assert stale.status_code == 412
+
+
+@pytest.mark.django_db
+def test_only_api_responses_are_compressed(settings):
+    """Testa que páginas fora de API_PATH_PREFIX não são comprimidas"""
+    settings.RESPONSE_COMPRESSION_MIN_SIZE = 1
+
+    response = Client().get("/", HTTP_ACCEPT_ENCODING="gzip")
+
+    assert response.status_code == 200
+    assert not response.has_header("Content-Encoding")
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [("br;q=1.0, gzip;q=0.8", {"br", "gzip"}), ("GZIP;q=abc, *", {"*"}), ("", set())],
+)
+def test_accepted_encodings(header, expected):
+    """Testa a leitura do Accept-Encoding com q-values"""
+    assert middleware.accepted_encodings(header) == expected
+
+
+@pytest.fixture
+def collected_static(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path / "static"
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+    }
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return settings.STATIC_ROOT
+
+
+@pytest.mark.django_db
+def test_static_files_hashed_precompressed_and_cached_forever(collected_static):
+    """Testa o pipeline de estáticos: nome com hash, .gz pré-comprimido e cache longo"""
+    client = Client()  # o WhiteNoise indexa o STATIC_ROOT ao iniciar
+    home = client.get("/")
+    stylesheet = next(
+        line.split('href="')[1].split('"')[0] for line in home.content.decode().splitlines() if "home." in line
+    )
+
+    assert stylesheet != "/static/css/home.css"
+    assert (collected_static / stylesheet.removeprefix("/static/")).with_suffix(".css.gz").exists()
+
+    response = client.get(stylesheet, HTTP_ACCEPT_ENCODING="gzip")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert "immutable" in response["Cache-Control"]
+    assert "max-age=315360000" in response["Cache-Control"]
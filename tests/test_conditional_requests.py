@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from model_bakery import baker
+
+from marketplace.models import Rental
+from marketplace.views import ToolViewSet
+
+
+@pytest.fixture
+def rental(user, tool):
+    return baker.make(
+        Rental,
+        tool=tool,
+        renter=user,
+        start_date=date.today(),
+        end_date=date.today() + timedelta(days=2),
+    )
+
+
+@pytest.mark.django_db
+def test_tool_detail_returns_304_when_etag_matches(auth_client, tool):
+    """Testa If-None-Match no detalhe da ferramenta"""
+    first = auth_client.get(f"/api/tools/{tool.id}/")
+    assert first.status_code == 200
+    assert first["Last-Modified"]
+
+    second = auth_client.get(f"/api/tools/{tool.id}/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert second.status_code == 304
+    assert second["ETag"] == first["ETag"]
+    assert not second.content
+
+
+@pytest.mark.django_db
+def test_tool_detail_etag_changes_after_update(auth_client, tool):
+    """Testa que o ETag muda quando a ferramenta é alterada"""
+    etag = auth_client.get(f"/api/tools/{tool.id}/")["ETag"]
+
+    tool.title = "Outro título"
+    tool.save()
+    response = auth_client.get(f"/api/tools/{tool.id}/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_anonymous_cached_detail_returns_304(api_client, tool, django_assert_num_queries):
+    """Testa que o 304 para anônimos vem do cache, sem consultar o banco"""
+    etag = api_client.get(f"/api/tools/{tool.id}/")["ETag"]
+
+    with django_assert_num_queries(0):
+        response = api_client.get(f"/api/tools/{tool.id}/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_received_rentals_list_returns_304_until_rental_changes(owner_client, rental):
+    """Testa ETag da listagem de aluguéis recebidos"""
+    etag = owner_client.get("/api/rentals/received/")["ETag"]
+
+    response = owner_client.get("/api/rentals/received/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    owner_client.patch(f"/api/rentals/{rental.id}/approve/")
+    response = owner_client.get("/api/rentals/received/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["status"] == "approved"
+
+
+@pytest.mark.django_db
+def test_rental_detail_etag_follows_tool_changes(owner_client, rental):
+    """Testa que o ETag do aluguel muda quando a ferramenta embutida muda"""
+    etag = owner_client.get(f"/api/rentals/{rental.id}/")["ETag"]
+
+    rental.tool.title = "Ferramenta renomeada"
+    rental.tool.save()
+    response = owner_client.get(f"/api/rentals/{rental.id}/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_tool_patch_with_stale_if_match_returns_412(owner_client, tool):
+    """Testa que If-Match desatualizado impede a atualização (lost update)"""
+    etag = owner_client.get(f"/api/tools/{tool.id}/")["ETag"]
+    tool.title = "Alterado por outro cliente"
+    tool.save()
+
+    response = owner_client.patch(
+        f"/api/tools/{tool.id}/", {"title": "Minha alteração"}, format="json", HTTP_IF_MATCH=etag
+    )
+
+    assert response.status_code == 412
+    tool.refresh_from_db()
+    assert tool.title == "Alterado por outro cliente"
+
+
+@pytest.mark.django_db
+def test_tool_patch_with_current_if_match_succeeds(owner_client, tool):
+    """Testa PATCH com If-Match atual e novo ETag na resposta"""
+    etag = owner_client.get(f"/api/tools/{tool.id}/")["ETag"]
+
+    response = owner_client.patch(
+        f"/api/tools/{tool.id}/", {"title": "Nova"}, format="json", HTTP_IF_MATCH=etag
+    )
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_tool_delete_with_stale_if_match_returns_412(owner_client, tool):
+    """Testa If-Match no DELETE"""
+    response = owner_client.delete(f"/api/tools/{tool.id}/", HTTP_IF_MATCH='"desatualizado"')
+
+    assert response.status_code == 412
+
+
+@pytest.mark.django_db
+def test_conditional_write_locks_row_until_write(owner_client, tool, monkeypatch):
+    """Testa que a verificação do If-Match e a escrita usam a linha travada, na mesma transação"""
+    lookups = []
+    get_object = ToolViewSet.get_object
+
+    def spy(view):
+        # O teste já roda numa transação: a da escrita aparece como savepoint
+        lookups.append((view.get_queryset().query.select_for_update, bool(connection.savepoint_ids)))
+        return get_object(view)
+
+    etag = owner_client.get(f"/api/tools/{tool.id}/")["ETag"]
+    monkeypatch.setattr(ToolViewSet, "get_object", spy)
+
+    response = owner_client.patch(
+        f"/api/tools/{tool.id}/", {"title": "Nova"}, format="json", HTTP_IF_MATCH=etag
+    )
+    deleted = owner_client.delete(f"/api/tools/{tool.id}/", HTTP_IF_MATCH=response["ETag"])
+
+    assert response.status_code == 200
+    assert deleted.status_code == 204
+    # Verificação + escrita do PATCH e do DELETE
+    assert lookups == [(True, True)] * 4
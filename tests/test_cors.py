@@ -0,0 +1,95 @@
+import pytest
+from django.test import Client, override_settings
+from django.urls import resolvers
+
+from core.middleware import CorsMiddleware, CorsPolicy
+
+FRONTEND = "https://app.example.com"
+
+
+def _client():
+    # O middleware compila a política ao ser carregado: um Client novo por configuração
+    return Client()
+
+
+@override_settings(CORS_ALLOWED_ORIGINS=[FRONTEND], CORS_ALLOWED_ORIGIN_REGEXES=[])
+def test_preflight_answered_without_resolving_url(monkeypatch):
+    """Testa que o preflight é respondido pelo middleware, sem resolver a URL"""
+    def fail(*args, **kwargs):
+        raise AssertionError("URL resolvida no preflight")
+
+    monkeypatch.setattr(resolvers.URLResolver, "resolve", fail)
+
+    response = _client().options(
+        "/api/tools/", HTTP_ORIGIN=FRONTEND, HTTP_ACCESS_CONTROL_REQUEST_METHOD="POST"
+    )
+
+    assert response.status_code == 200
+    assert response["Access-Control-Allow-Origin"] == FRONTEND
+    assert response["Access-Control-Allow-Credentials"] == "true"
+    assert "PATCH" in response["Access-Control-Allow-Methods"]
+    assert "authorization" in response["Access-Control-Allow-Headers"]
+    assert "if-match" in response["Access-Control-Allow-Headers"]
+    assert "if-none-match" in response["Access-Control-Allow-Headers"]
+    assert "if-unmodified-since" in response["Access-Control-Allow-Headers"]
+    assert response["Access-Control-Max-Age"] == "86400"
+    assert response.content == b""
+
+
+@override_settings(CORS_ALLOWED_ORIGINS=[FRONTEND], CORS_ALLOWED_ORIGIN_REGEXES=[])
+def test_preflight_from_unknown_origin_gets_no_cors_headers():
+    """Testa que origens fora da política não recebem headers CORS"""
+    response = _client().options(
+        "/api/tools/", HTTP_ORIGIN="https://evil.example.com", HTTP_ACCESS_CONTROL_REQUEST_METHOD="GET"
+    )
+
+    assert response.status_code == 200
+    assert "Access-Control-Allow-Origin" not in response
+    assert response["Vary"] == "Origin"
+
+
+@pytest.mark.django_db
+@override_settings(CORS_ALLOWED_ORIGINS=[FRONTEND], CORS_ALLOWED_ORIGIN_REGEXES=[])
+def test_simple_request_gets_cors_headers():
+    """Testa os headers CORS de uma resposta comum de origem permitida"""
+    response = _client().get("/api/tools/", HTTP_ORIGIN=FRONTEND)
+
+    assert response.status_code == 200
+    assert response["Access-Control-Allow-Origin"] == FRONTEND
+    assert response["Access-Control-Expose-Headers"] == "content-type, etag, last-modified, x-total-count"
+    assert "Origin" in response["Vary"]
+    assert "Access-Control-Allow-Methods" not in response
+
+
+@pytest.mark.django_db
+def test_request_without_origin_has_only_vary():
+    """Testa que requisições sem Origin não recebem headers CORS, só o Vary"""
+    response = _client().get("/api/tools/")
+
+    assert "Access-Control-Allow-Origin" not in response
+    assert "Origin" in response["Vary"]
+
+
+def test_dev_regex_allows_localhost_any_port():
+    """Testa que as regexes de desenvolvimento aceitam localhost em qualquer porta"""
+    policy = CorsPolicy(
+        origins=["https://app.example.com/"],
+        origin_regexes=[r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$"],
+        methods=["get"], headers=["authorization"], expose_headers=[], credentials=False, max_age=60,
+    )
+
+    assert policy.allows("https://app.example.com")
+    assert policy.allows("http://localhost:4321")
+    assert policy.allows("http://127.0.0.1")
+    assert not policy.allows("http://localhost.evil.com")
+    assert policy.response_headers == ()
+
+
+@override_settings(CORS_ALLOWED_ORIGINS=[FRONTEND], CORS_ALLOWED_ORIGIN_REGEXES=[])
+def test_policy_compiled_once():
+    """Testa que a política é compilada na criação do middleware, não por requisição"""
+    middleware = CorsMiddleware(lambda request: None)
+
+    with override_settings(CORS_ALLOWED_ORIGINS=["https://outro.example.com"]):
+        assert middleware.policy.allows(FRONTEND)
+    assert isinstance(middleware.policy.origins, frozenset)
@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from marketplace.models import Rental
+
+
+def _follow(client, url):
+    """Percorre todas as páginas seguindo o link `next`."""
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert "count" not in data
+        ids.extend(item["id"] for item in data["results"])
+        url = data["next"]
+    return ids
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_walks_all_tools_by_price(api_client, tool_factory):
+    """Testa paginação por cursor com preços repetidos (id desempata)"""
+    tools = [tool_factory(price_per_day=Decimal(price)) for price in ["10.00"] * 12 + ["5.00"] * 8]
+    expected = [t.id for t in sorted(tools, key=lambda t: (t.price_per_day, t.id))]
+
+    ids = _follow(api_client, "/api/tools/?pagination=cursor&ordering=price_per_day")
+
+    assert ids == expected
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_default_ordering(api_client, tool_factory):
+    """Testa paginação por cursor na ordenação padrão (-created_at)"""
+    tools = [tool_factory() for _ in range(11)]
+
+    ids = _follow(api_client, "/api/tools/?pagination=cursor")
+
+    assert ids == [t.id for t in reversed(tools)]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_skips_count_query(api_client, tool_factory):
+    """Testa que o modo cursor não executa COUNT(*) nem OFFSET"""
+    for _ in range(12):
+        tool_factory()
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get("/api/tools/?pagination=cursor")
+
+    assert response.status_code == 200
+    sql = " ".join(query["sql"].upper() for query in ctx.captured_queries)
+    assert "COUNT(" not in sql
+    assert "OFFSET" not in sql
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_previous_link(api_client, tool_factory):
+    """Testa que o link `previous` volta para a página anterior"""
+    for _ in range(20):
+        tool_factory()
+
+    first = api_client.get("/api/tools/?pagination=cursor").json()
+    second = api_client.get(first["next"]).json()
+    back = api_client.get(second["previous"]).json()
+
+    assert first["previous"] is None
+    assert [item["id"] for item in back["results"]] == [item["id"] for item in first["results"]]
+    assert back["previous"] is None
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_invalid_cursor(api_client):
+    """Testa que um cursor malformado retorna 404"""
+    response = api_client.get("/api/tools/?cursor=nao-e-um-cursor")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_on_rentals(auth_client, user, tool):
+    """Testa paginação por cursor nas listagens de aluguéis"""
+    start = date.today()
+    rentals = [
+        baker.make(Rental, renter=user, tool=tool, start_date=start, end_date=start + timedelta(days=1))
+        for _ in range(10)
+    ]
+
+    ids = _follow(auth_client, "/api/rentals/my/?pagination=cursor")
+
+    assert ids == [r.id for r in reversed(rentals)]
+
+
+@pytest.mark.django_db
+def test_page_number_pagination_remains_default(api_client, tool_factory):
+    """Testa que sem opt-in a paginação por número de página continua"""
+    for _ in range(10):
+        tool_factory()
+
+    data = api_client.get("/api/tools/").json()
+
+    assert data["count"] == 10
+    assert len(data["results"]) == 9
@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from model_bakery import baker
+from rest_framework.test import APIRequestFactory
+
+from marketplace.models import Rental, Tool
+from marketplace.serializers import RentalSerializer, ToolSerializer
+
+
+@pytest.fixture
+def catalog(tool_factory, user):
+    tools = [
+        tool_factory(title="Furadeira", price_per_day=Decimal("25.50"), state="SP", city="São Paulo"),
+        tool_factory(title="Sem foto", photo=None, state=None, city=None, is_available=False),
+        tool_factory(title="Pendente", photo_status=Tool.PHOTO_PENDING),
+    ]
+    rentals = [
+        baker.make(
+            Rental,
+            tool=tool,
+            renter=user,
+            start_date=date(2026, 3, 1) + timedelta(days=index),
+            end_date=date(2026, 3, 4) + timedelta(days=index),
+            total_price=Decimal("100.00"),
+            status=status,
+        )
+        for index, (tool, status) in enumerate(zip(tools, ["pending", "approved", "finished"]))
+    ]
+    return tools, rentals
+
+
+def _both_paths(settings, serializer_class, instances, context):
+    settings.API_FAST_SERIALIZATION = False
+    slow = serializer_class(instances, many=True, context=context).data
+    settings.API_FAST_SERIALIZATION = True
+    fast = serializer_class(instances, many=True, context=context).data
+    return slow, fast
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("with_request", [False, True])
+def test_tool_fast_path_matches_drf(settings, catalog, with_request):
+    """Testa que a serialização compilada de ferramentas gera a mesma saída do DRF"""
+    context = {"request": APIRequestFactory().get("/api/tools/")} if with_request else {}
+    tools = list(Tool.objects.select_related("owner").order_by("id"))
+
+    slow, fast = _both_paths(settings, ToolSerializer, tools, context)
+
+    assert fast == slow
+    assert [list(item) for item in fast] == [list(item) for item in slow]
+
+
+@pytest.mark.django_db
+def test_rental_fast_path_matches_drf(settings, catalog):
+    """Testa que a serialização compilada de aluguéis (com tool_details) gera a mesma saída do DRF"""
+    context = {"request": APIRequestFactory().get("/api/rentals/")}
+    rentals = list(Rental.objects.select_related("tool", "renter", "tool__owner").order_by("id"))
+
+    slow, fast = _both_paths(settings, RentalSerializer, rentals, context)
+
+    assert fast == slow
+    assert fast[0]["tool_details"]["price_per_day"] == "25.50"
+
+
+@pytest.mark.django_db
+def test_rental_list_endpoint_same_with_fast_path(settings, auth_client, catalog):
+    """Testa que GET /api/rentals/ responde igual com e sem a serialização compilada"""
+    settings.API_FAST_SERIALIZATION = False
+    slow = auth_client.get("/api/rentals/").json()
+    settings.API_FAST_SERIALIZATION = True
+    fast = auth_client.get("/api/rentals/").json()
+
+    assert fast == slow
+    assert len(fast["results"]) == 3
+
+
+@pytest.mark.django_db
+def test_tool_list_queries_do_not_grow_with_page(auth_client, tool_factory, django_assert_max_num_queries):
+    """Testa que owner_username não gera uma query por ferramenta na listagem"""
+    for _ in range(8):
+        tool_factory()
+
+    with django_assert_max_num_queries(3):
+        response = auth_client.get("/api/tools/")
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 8
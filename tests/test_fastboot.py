@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from django.core.management import call_command
+
+from marketplace import fastboot
+
+
+@pytest.fixture
+def static_dirs(settings, tmp_path):
+    source = tmp_path / "src"
+    (source / "css").mkdir(parents=True)
+    (source / "css" / "site.css").write_text("body { color: black; }")
+    settings.STATICFILES_DIRS = [source]
+    settings.STATIC_ROOT = tmp_path / "static"
+    return source, tmp_path / "static"
+
+
+@pytest.mark.django_db
+def test_fastboot_skips_applied_migrations(monkeypatch, capsys):
+    """Testa que sem migrations pendentes o migrate não roda"""
+    calls = []
+    monkeypatch.setattr(fastboot, "call_command", lambda *args, **kwargs: calls.append(args))
+
+    call_command("fastboot", "--no-static")
+
+    assert fastboot.pending_migrations() == []
+    assert calls == []
+    assert "Migrations: nenhuma pendente" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_fastboot_runs_migrate_when_pending(monkeypatch, capsys):
+    """Testa que migrations pendentes disparam o migrate"""
+    calls = []
+    monkeypatch.setattr(fastboot, "pending_migrations", lambda database: ["0016_nova"])
+    monkeypatch.setattr(fastboot, "call_command", lambda *args, **kwargs: calls.append(args))
+
+    call_command("fastboot", "--no-static")
+
+    assert calls == [("migrate",)]
+    assert "Migrations: 1 aplicadas" in capsys.readouterr().out
+
+
+def test_fastboot_collects_static_only_when_sources_change(static_dirs, capsys):
+    """Testa o fingerprint dos estáticos: coleta na primeira vez e após mudanças"""
+    source, static_root = static_dirs
+
+    call_command("fastboot", "--no-migrate")
+    assert (static_root / "css" / "site.css").exists()
+    assert "Estáticos: coletados" in capsys.readouterr().out
+
+    call_command("fastboot", "--no-migrate")
+    assert "Estáticos: sem alterações" in capsys.readouterr().out
+
+    (source / "css" / "site.css").write_text("body { color: red; }")
+    call_command("fastboot", "--no-migrate")
+    assert "Estáticos: coletados" in capsys.readouterr().out
+    assert "red" in (static_root / "css" / "site.css").read_text()
+
+
+def test_fastboot_recollects_without_manifest(static_dirs, settings):
+    """Testa que o fingerprint só vale com o manifest dos estáticos presente"""
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+    }
+    _, static_root = static_dirs
+
+    assert fastboot.collectstatic_if_needed(verbosity=0)
+    (static_root / "staticfiles.json").unlink()
+
+    assert fastboot.collectstatic_if_needed(verbosity=0)
+    assert not fastboot.collectstatic_if_needed(verbosity=0)
+
+
+def test_fastboot_execs_server(monkeypatch):
+    """Testa que o comando substitui o processo pelo servidor com os argumentos intactos"""
+    executed = []
+    monkeypatch.setattr(os, "execvp", lambda file, args: executed.append((file, args)))
+
+    call_command(
+        "fastboot", "--no-migrate", "--no-static",
+        "gunicorn", "core.asgi:application", "--bind", "0.0.0.0:8000",
+    )
+
+    assert executed == [("gunicorn", ["gunicorn", "core.asgi:application", "--bind", "0.0.0.0:8000"])]
@@ -0,0 +1,88 @@
+import os
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from cloudinary import CloudinaryResource
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from marketplace import images, imaging
+from marketplace.imaging import InvalidImage, inspect_image
+
+
+def _image_file(image_format="JPEG", size=(64, 48), name=None):
+    buffer = BytesIO()
+    Image.new("RGB", size, color="green").save(buffer, format=image_format)
+    extension = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}[image_format]
+    return SimpleUploadedFile(name or f"foto.{extension}", buffer.getvalue())
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "PNG", "WEBP"])
+def test_inspect_reads_format_and_size(image_format):
+    """Testa a leitura de formato e dimensões pelo cabeçalho"""
+    assert inspect_image(_image_file(image_format)) == (image_format, 64, 48)
+
+
+def test_inspect_rejects_disguised_file():
+    """Testa que um arquivo que não é imagem é recusado mesmo com extensão .jpg"""
+    with pytest.raises(InvalidImage, match="Formato de imagem inválido"):
+        inspect_image(SimpleUploadedFile("foto.jpg", b"<?php echo 'oi'; ?>" * 10))
+
+
+def test_inspect_rejects_truncated_image():
+    """Testa que um arquivo com assinatura JPEG mas sem cabeçalho válido é recusado"""
+    with pytest.raises(InvalidImage, match="Não foi possível ler"):
+        inspect_image(SimpleUploadedFile("foto.jpg", b"\xff\xd8\xff\xe0" + b"\x00" * 20))
+
+
+def test_inspect_rejects_oversize_dimensions_without_decoding(settings, monkeypatch):
+    """Testa a recusa por dimensões sem decodificar os pixels"""
+    settings.TOOL_PHOTO_MAX_DIMENSION = 100
+    upload = _image_file("PNG", size=(101, 10))
+    monkeypatch.setattr(Image.Image, "load", lambda self: pytest.fail("imagem decodificada"))
+
+    with pytest.raises(InvalidImage, match="muito grande"):
+        inspect_image(upload)
+
+
+@pytest.mark.django_db
+def test_create_tool_rejects_non_image(auth_client):
+    """Testa a validação pelo endpoint de criação"""
+    payload = {
+        "title": "Serra",
+        "description": "Serra",
+        "category": "construcao",
+        "price_per_day": "10.00",
+        "photo": SimpleUploadedFile("serra.png", b"GIF89a" + b"\x00" * 100),
+    }
+
+    response = auth_client.post("/api/tools/", data=payload, format="multipart")
+
+    assert response.status_code == 400
+    assert "photo" in response.json()
+
+
+def test_generate_thumbnails_in_process_pool(tmp_path):
+    """Testa a geração das miniaturas WEBP no pool de processos"""
+    source = tmp_path / "foto.jpg"
+    Image.new("RGB", (2000, 1000), color="red").save(source)
+
+    paths = imaging.generate_thumbnails(str(source), str(tmp_path / "foto"))
+
+    with Image.open(paths["thumbnail"]) as thumbnail:
+        assert (thumbnail.format, thumbnail.size) == ("WEBP", (400, 400))
+    with Image.open(paths["medium"]) as medium:
+        assert medium.size == (1024, 512)
+    assert os.path.basename(paths["medium"]) == "foto.medium.webp"
+
+
+def test_local_photo_urls_without_cloudinary(settings, monkeypatch):
+    """Testa as URLs do armazenamento local quando o Cloudinary não está configurado"""
+    monkeypatch.setattr(images.cloudinary, "config", lambda: SimpleNamespace(cloud_name=None))
+    photo = CloudinaryResource("tools/abc", format="png", type="upload", resource_type="image")
+
+    urls = images.build_photo_urls(photo)
+
+    assert urls["original"] == f"{settings.TOOL_PHOTO_LOCAL_URL}tools/abc.png"
+    assert urls["thumbnail"] == f"{settings.TOOL_PHOTO_LOCAL_URL}tools/abc.thumbnail.webp"
@@ -0,0 +1,115 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from marketplace import renderers
+from marketplace.renderers import ORJSONParser, ORJSONRenderer
+
+PAYLOAD = {
+    "id": 7,
+    "price": Decimal("25.50"),
+    "created_at": datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+    "local": datetime(2026, 3, 1, 9, 30, tzinfo=ZoneInfo("America/Sao_Paulo")),
+    "naive": datetime(2026, 3, 1, 9, 30),
+    "day": date(2026, 3, 1),
+    "hour": time(8, 15),
+    "duration": timedelta(hours=2),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "lazy": gettext_lazy("Ferramenta"),
+    "text": "São Paulo – furadeira \u2028linha\u2029fim \"aspas\"",
+    "nested": ReturnDict({"a": [1, 2.5, None, True]}, serializer=None),
+    "tuple": (1, 2),
+    "gen": (n for n in range(3)),
+    1: "chave inteira",
+}
+
+
+def _payload():
+    data = dict(PAYLOAD)
+    data["gen"] = (n for n in range(3))
+    return data
+
+
+def test_orjson_renderer_matches_drf_bytes(settings):
+    """Testa que o renderer com orjson gera exatamente os mesmos bytes do JSONRenderer do DRF"""
+    settings.API_JSON_BACKEND = "orjson"
+
+    assert ORJSONRenderer().render(_payload()) == JSONRenderer().render(_payload())
+
+
+def test_orjson_renderer_falls_back_for_indent_and_big_ints(settings):
+    """Testa que indent e inteiros acima de 64 bits usam o caminho do DRF"""
+    settings.API_JSON_BACKEND = "orjson"
+    data = {"big": 2**70, "price": Decimal("1.10")}
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert ORJSONRenderer().render(data, "application/json; indent=4") == JSONRenderer().render(
+        data, "application/json; indent=4"
+    )
+    assert ORJSONRenderer().render(None) == b""
+
+
+@pytest.mark.parametrize("backend", ["stdlib", "missing"])
+def test_renderer_and_parser_without_orjson(settings, monkeypatch, backend):
+    """Testa o fallback para o json padrão (setting stdlib ou orjson não instalado)"""
+    if backend == "missing":
+        monkeypatch.setattr(renderers, "orjson", None)
+    else:
+        settings.API_JSON_BACKEND = backend
+
+    assert ORJSONRenderer().render(_payload()) == JSONRenderer().render(_payload())
+    assert ORJSONParser().parse(io.BytesIO(b'{"a": [1, "b"]}')) == {"a": [1, "b"]}
+
+
+def test_orjson_parser_matches_drf(settings):
+    """Testa que o parser com orjson lê o mesmo que o do DRF e gera os mesmos erros"""
+    settings.API_JSON_BACKEND = "orjson"
+    body = '{"title": "Serra", "price": 10.5, "tags": ["a", null], "big": 123456789012345678901234}'
+
+    parsed = ORJSONParser().parse(io.BytesIO(body.encode()))
+    assert parsed == JSONParser().parse(io.BytesIO(body.encode()))
+
+    for invalid in (b'{"a": ', b'{"a": NaN}'):
+        with pytest.raises(ParseError) as orjson_error:
+            ORJSONParser().parse(io.BytesIO(invalid))
+        with pytest.raises(ParseError) as drf_error:
+            JSONParser().parse(io.BytesIO(invalid))
+        assert str(orjson_error.value.detail) == str(drf_error.value.detail)
+
+
+@pytest.mark.django_db
+def test_tool_listing_bytes_identical_across_backends(settings, api_client, tool_factory):
+    """Testa que a listagem de ferramentas tem o mesmo corpo com orjson e com o json padrão"""
+    tool_factory(title="Furadeira – 220V", price_per_day=Decimal("25.50"), city="São Paulo")
+    tool_factory(title="Serra", price_per_day=Decimal("10.00"))
+
+    settings.API_JSON_BACKEND = "stdlib"
+    stdlib = api_client.get("/api/tools/", HTTP_ACCEPT="application/json").content
+    cache.clear()  # a listagem anônima fica em cache
+    settings.API_JSON_BACKEND = "orjson"
+    fast = api_client.get("/api/tools/", HTTP_ACCEPT="application/json").content
+
+    assert fast == stdlib
+
+
+@pytest.mark.django_db
+def test_invalid_json_body_returns_400(settings, owner_client):
+    """Testa que JSON inválido no corpo retorna 400 com a mensagem do DRF"""
+    settings.API_JSON_BACKEND = "orjson"
+
+    response = owner_client.post(
+        "/api/rentals/", data=b'{"tool_id": ', content_type="application/json"
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("JSON parse error")
@@ -0,0 +1,131 @@
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory
+
+from marketplace.throttling import LoginIPThrottle
+
+
+def _login(client, username="user_default", password="password123", **extra):
+    return client.post(
+        "/api/auth/login/", {"username": username, "password": password}, format="json", **extra
+    )
+
+
+@pytest.mark.django_db
+def test_new_passwords_use_tuned_scrypt(user):
+    """Testa que senhas novas usam o scrypt com os parâmetros das settings"""
+    algorithm, work_factor, _salt, block_size, parallelism, _hash = user.password.split("$")
+
+    assert (algorithm, work_factor, block_size, parallelism) == ("scrypt", "16384", "8", "1")
+
+
+@pytest.mark.django_db
+def test_login_rehashes_pbkdf2_password(api_client, user):
+    """Testa que o login regrava com o hasher preferido uma senha em PBKDF2"""
+    User.objects.filter(pk=user.pk).update(password=make_password("password123", hasher="pbkdf2_sha256"))
+
+    assert _login(api_client).status_code == 200
+
+    user.refresh_from_db()
+    assert user.password.startswith("scrypt$")
+    assert user.check_password("password123")
+
+
+@pytest.mark.django_db
+def test_login_rehashes_when_parameters_change(settings, api_client, user):
+    """Testa que mudar o custo do scrypt regrava o hash no próximo login"""
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 12
+
+    assert _login(api_client).status_code == 200
+
+    user.refresh_from_db()
+    assert user.password.startswith("scrypt$4096$")
+
+
+@pytest.mark.django_db
+def test_login_username_throttle_skips_hashing(api_client, user, monkeypatch):
+    """Testa que, acima do limite por usuário, o login responde 429 sem verificar a senha"""
+    for _ in range(10):
+        assert _login(api_client, password="errada").status_code == 401
+
+    checks = []
+    monkeypatch.setattr(User, "check_password", lambda self, raw: checks.append(raw))
+    response = _login(api_client)
+
+    assert response.status_code == 429
+    assert int(response["Retry-After"]) > 0
+    assert checks == []
+
+
+@pytest.mark.django_db
+def test_login_username_throttle_is_case_insensitive(api_client, user):
+    """Testa que variações de maiúsculas contam para o mesmo usuário"""
+    for index in range(10):
+        _login(api_client, username="User_Default" if index % 2 else "user_default", password="errada")
+
+    assert _login(api_client, username="USER_DEFAULT").status_code == 429
+
+
+@pytest.mark.django_db
+def test_login_ip_throttle_across_usernames(api_client, user):
+    """Testa que o limite por IP vale para tentativas com usuários diferentes"""
+    for index in range(30):
+        assert _login(api_client, username=f"alvo{index}", password="x").status_code == 401
+
+    assert _login(api_client).status_code == 429
+    assert _login(api_client, REMOTE_ADDR="10.0.0.2").status_code == 200
+
+
+@pytest.mark.django_db
+def test_spoofed_forwarded_for_does_not_reset_ip_window(api_client, user):
+    """Testa que trocar o X-Forwarded-For enviado pelo cliente não zera o limite por IP (NUM_PROXIES=1)"""
+    for index in range(30):
+        # O roteador da plataforma anexa o IP real ao que o cliente enviou
+        forwarded = f"10.9.{index}.1, 203.0.113.7"
+        assert _login(api_client, username=f"alvo{index}", password="x", HTTP_X_FORWARDED_FOR=forwarded).status_code == 401
+
+    assert _login(api_client, HTTP_X_FORWARDED_FOR="198.51.100.1, 203.0.113.7").status_code == 429
+    assert _login(api_client, HTTP_X_FORWARDED_FOR="203.0.113.8").status_code == 200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("path", ["/api/auth/login/", "/api/auth/register/"])
+def test_non_object_body_returns_400(api_client, path):
+    """Testa que um corpo JSON que não é objeto (lista) é recusado com 400, limitado só por IP"""
+    response = api_client.post(path, [{"username": "user_default"}], format="json")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_register_ip_throttle(api_client):
+    """Testa que o registro é limitado por IP"""
+    for index in range(20):
+        assert api_client.post("/api/auth/register/", {"username": f"novo{index}"}, format="json").status_code == 400
+
+    response = api_client.post("/api/auth/register/", {"username": "outro"}, format="json")
+    assert response.status_code == 429
+
+
+def test_sliding_window_counts_previous_window_fraction(monkeypatch):
+    """Testa que a janela anterior pesa proporcionalmente ao tempo que ainda cobre"""
+    now = [600.0]
+    monkeypatch.setattr(LoginIPThrottle, "timer", lambda self: now[0])
+    request = APIRequestFactory().post("/api/auth/login/")
+
+    def allowed():
+        return LoginIPThrottle().allow_request(request, None)
+
+    assert all(allowed() for _ in range(30))
+    throttle = LoginIPThrottle()
+    assert not throttle.allow_request(request, None)
+    assert throttle.wait() == pytest.approx(60)
+
+    # 15 s na janela seguinte: a anterior ainda pesa 75% (22,5 de 30)
+    now[0] = 675.0
+    assert sum(allowed() for _ in range(10)) == 8
+
+    # 2 min depois as duas janelas saíram do intervalo
+    now[0] = 795.0
+    assert sum(allowed() for _ in range(40)) == 30
@@ -0,0 +1,101 @@
+from datetime import date
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from marketplace.booking import busy_rentals
+from marketplace.models import Rental
+from marketplace.views import RentalViewSet, ToolViewSet
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor not in {"sqlite", "postgresql"},
+    reason="Planos verificados apenas em SQLite e PostgreSQL",
+)
+
+# Índices que atendem a sobreposição de períodos de aluguéis ativos
+RENTAL_PERIOD_INDEXES = ("rental_conflict_idx", "rental_active_period_idx", "rental_no_overlap")
+
+
+def _plan(queryset):
+    if connection.vendor == "postgresql":
+        # Com poucas linhas o PostgreSQL prefere seq scan; força o uso de índices
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+def _list_queryset(viewset, params=None, user=None, action="list"):
+    """Queryset da listagem montado pelo próprio viewset (get_queryset + filtros)."""
+    request = Request(APIRequestFactory().get("/", params or {}))
+    if user is not None:
+        request.user = user
+    view = viewset(action=action, format_kwarg=None, request=request, kwargs={})
+    return view.filter_queryset(view.get_queryset())
+
+
+@pytest.mark.django_db
+def test_default_listing_uses_created_index(tool):
+    """Testa que a listagem padrão (-created_at) usa índice"""
+    assert "tool_created_idx" in _plan(_list_queryset(ToolViewSet))
+
+
+@pytest.mark.django_db
+def test_price_ordering_uses_price_index(tool):
+    """Testa que a ordenação por preço usa índice"""
+    queryset = _list_queryset(ToolViewSet, {"ordering": "price_per_day"})
+    assert "tool_price_idx" in _plan(queryset)
+
+
+@pytest.mark.django_db
+def test_category_filter_uses_category_index(tool):
+    """Testa que o filtro por categoria ordenado usa o índice composto"""
+    queryset = _list_queryset(ToolViewSet, {"category": "construcao"})
+    assert "tool_category_created_idx" in _plan(queryset)
+
+
+@pytest.mark.django_db
+def test_my_tools_uses_owner_index(tool):
+    """Testa que 'minhas ferramentas' usa o índice por dono"""
+    queryset = _list_queryset(ToolViewSet, user=tool.owner, action="my_tools").filter(owner=tool.owner)
+    assert "tool_owner_created_idx" in _plan(queryset)
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="SQLite traduz iexact para LIKE")
+def test_state_filter_uses_functional_index(tool):
+    """Testa que o filtro por estado usa o índice funcional UPPER(state)"""
+    assert "tool_state_upper_idx" in _plan(_list_queryset(ToolViewSet, {"state": "sp"}))
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="Índice de trigramas só no PostgreSQL")
+def test_city_filter_uses_trigram_index(tool):
+    """Testa que o filtro por cidade (icontains) usa o índice de trigramas"""
+    assert "tool_city_trgm_idx" in _plan(_list_queryset(ToolViewSet, {"city": "paulo"}))
+
+
+@pytest.mark.django_db
+def test_rental_conflict_check_uses_index(tool, user):
+    """Testa que a verificação de conflito de aluguel usa índice"""
+    today = date.today()
+    rental = Rental(tool=tool, renter=user, start_date=today, end_date=today)
+    plan = _plan(busy_rentals(rental, DEFAULT_DB_ALIAS))
+    assert any(name in plan for name in RENTAL_PERIOD_INDEXES)
+
+
+@pytest.mark.django_db
+def test_availability_filter_uses_rental_period_index(tool):
+    """Testa que o filtro por período disponível (anti-join) usa índice nos aluguéis"""
+    today = date.today().isoformat()
+    queryset = _list_queryset(ToolViewSet, {"available_from": today, "available_to": today})
+    plan = _plan(queryset)
+    assert any(name in plan for name in RENTAL_PERIOD_INDEXES)
+
+
+@pytest.mark.django_db
+def test_my_rentals_uses_renter_index(user):
+    """Testa que 'meus aluguéis' usa o índice por locatário"""
+    queryset = _list_queryset(RentalViewSet, user=user, action="my_rentals").filter(renter=user)
+    assert "rental_renter_created_idx" in _plan(queryset)
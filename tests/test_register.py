@@ -0,0 +1,170 @@
+import importlib
+import json
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from marketplace.accounts import (
+    EMAIL_TAKEN_MESSAGE, EMAIL_UNIQUE_INDEX, USERNAME_TAKEN_MESSAGE, conflict_message, provision_users,
+)
+
+
+def _register(client, **data):
+    payload = {"username": "novo", "email": "novo@example.com", "password": "senha-forte-123", **data}
+    return client.post("/api/auth/register/", payload, format="json")
+
+
+@pytest.mark.django_db
+def test_register_is_a_single_insert(api_client):
+    """Testa que o registro grava o usuário sem consultas prévias de existência"""
+    with CaptureQueriesContext(connection) as queries:
+        response = _register(api_client, first_name="Ana")
+
+    assert response.status_code == 201
+    assert response.json()["first_name"] == "Ana"
+    statements = [query["sql"].split()[0].upper() for query in queries.captured_queries]
+    assert statements.count("INSERT") == 1
+    assert "SELECT" not in statements
+    assert User.objects.get(username="novo").check_password("senha-forte-123")
+
+
+@pytest.mark.django_db
+def test_register_duplicate_username(api_client, user):
+    """Testa que username repetido devolve a mensagem de sempre"""
+    response = _register(api_client, username=user.username)
+
+    assert response.status_code == 400
+    assert response.json() == {"error": USERNAME_TAKEN_MESSAGE}
+
+
+@pytest.mark.django_db
+def test_register_duplicate_email_ignores_case(api_client, user):
+    """Testa que o email é único sem diferenciar maiúsculas"""
+    response = _register(api_client, email=user.email.upper())
+
+    assert response.status_code == 400
+    assert response.json() == {"error": EMAIL_TAKEN_MESSAGE}
+    assert User.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_register_invalid_email(api_client):
+    """Testa a validação do formato do email"""
+    response = _register(api_client, email="sem-arroba")
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "Email inválido"}
+
+
+@pytest.mark.django_db
+def test_email_index_ignores_case_and_blank_emails():
+    """Testa que o índice de email aceita várias contas sem email e barra variações de maiúsculas"""
+    User.objects.create_user(username="a")
+    User.objects.create_user(username="b")
+
+    with pytest.raises(IntegrityError):
+        User.objects.create_user(username="c", email="X@example.com")
+        User.objects.create_user(username="d", email="x@EXAMPLE.com")
+
+
+@pytest.mark.django_db
+def test_email_index_migration_lists_existing_duplicates():
+    """Testa que a migration do índice de email para com a lista das contas repetidas"""
+    migration = importlib.import_module("marketplace.migrations.0015_user_email_ci_unique")
+    with connection.cursor() as cursor:
+        # Estado anterior à migration (o DDL é desfeito com a transação do teste)
+        cursor.execute(f"DROP INDEX {EMAIL_UNIQUE_INDEX}")
+    User.objects.create_user(username="ana", email="Ana@example.com")
+    User.objects.create_user(username="ana2", email="ana@EXAMPLE.com")
+    User.objects.create_user(username="bia", email="bia@example.com")
+    User.objects.create_user(username="sem-email-1")
+    User.objects.create_user(username="sem-email-2")
+
+    with pytest.raises(RuntimeError) as excinfo:
+        migration.check_no_duplicate_emails(None, SimpleNamespace(connection=connection))
+
+    message = str(excinfo.value)
+    assert message.startswith("1 email(s)")
+    assert "- ANA@EXAMPLE.COM: ana, ana2" in message
+    assert "bia" not in message
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("UNIQUE constraint failed: auth_user.username", USERNAME_TAKEN_MESSAGE),
+    (f"UNIQUE constraint failed: index '{EMAIL_UNIQUE_INDEX}'", EMAIL_TAKEN_MESSAGE),
+    ("UNIQUE constraint failed: auth_user.first_name_username_note", None),
+    ('duplicate key value violates unique constraint "outra" DETAIL: Key (username)=(x)', None),
+])
+def test_conflict_message_matches_constraint(message, expected):
+    """Testa que a mensagem sai do nome da constraint violada, não de palavras no texto do erro"""
+    assert conflict_message(IntegrityError(message)) == expected
+
+
+def test_conflict_message_uses_postgres_constraint_name():
+    """Testa o nome da constraint informado pelo driver do PostgreSQL"""
+    exc = IntegrityError("duplicate key value violates unique constraint")
+    exc.__cause__ = Exception()
+    exc.__cause__.diag = SimpleNamespace(constraint_name="auth_user_username_key")
+
+    assert conflict_message(exc) == USERNAME_TAKEN_MESSAGE
+
+
+@pytest.mark.django_db
+def test_provision_users_reports_invalid_and_duplicate_rows(user):
+    """Testa o provisionamento em lotes com linhas inválidas, repetidas e já existentes"""
+    hashed = make_password("senha-parceiro")
+    rows = [
+        {"username": "p1", "email": "p1@example.com", "password": hashed, "first_name": "Parceiro"},
+        {"username": "p2", "email": "P1@EXAMPLE.COM", "password": hashed},
+        {"username": "p3", "email": "p3@example.com", "password": "texto-puro"},
+        None,
+        {"username": user.username, "email": "outro@example.com", "password": hashed},
+        {"username": "p4", "email": "p4@example.com"},
+        {"username": "p5", "email": "p5@example.com", "password": hashed},
+    ]
+
+    report = provision_users(rows, chunk_size=2)
+
+    assert report["created"] == 3
+    assert [error["row"] for error in report["errors"]] == [2, 3, 4, 5]
+    assert report["errors"][0]["errors"] == {"email": [EMAIL_TAKEN_MESSAGE]}
+    assert report["errors"][3]["errors"] == {"username": [USERNAME_TAKEN_MESSAGE]}
+    assert User.objects.get(username="p1").check_password("senha-parceiro")
+    assert not User.objects.get(username="p4").has_usable_password()
+
+
+@pytest.mark.django_db
+def test_provision_users_command(tmp_path, capsys):
+    """Testa o comando provision_users com um arquivo JSONL"""
+    path = tmp_path / "parceiros.jsonl"
+    hashed = make_password("senha")
+    path.write_text("\n".join(
+        json.dumps({"username": f"parceiro{index}", "email": f"p{index}@example.com", "password": hashed})
+        for index in range(5)
+    ))
+
+    call_command("provision_users", str(path), chunk_size=2)
+
+    assert User.objects.filter(username__startswith="parceiro").count() == 5
+    assert "5 contas criadas" in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_provision_users_falls_back_to_row_inserts_on_conflict(user, monkeypatch):
+    """Testa que um conflito não detectado antes do lote (corrida) afeta só a linha repetida"""
+    monkeypatch.setattr("marketplace.accounts._taken", lambda chunk: (set(), set()))
+    hashed = make_password("senha")
+    rows = [
+        {"username": "q1", "email": "q1@example.com", "password": hashed},
+        {"username": "q2", "email": user.email, "password": hashed},
+    ]
+
+    report = provision_users(rows)
+
+    assert report["created"] == 1
+    assert report["errors"] == [{"row": 2, "errors": {"email": [EMAIL_TAKEN_MESSAGE]}}]
@@ -0,0 +1,121 @@
+import importlib
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from model_bakery import baker
+from rest_framework.exceptions import ValidationError
+
+from marketplace.booking import CONFLICT_MESSAGE, book_tool
+from marketplace.models import Rental, Tool, ToolFacetCount
+
+
+@pytest.mark.django_db
+def test_booking_creates_rental_and_blocks_tool(auth_client, tool_factory):
+    """Testa a criação do aluguel via API e o bloqueio da ferramenta"""
+    tool = tool_factory(is_available=True, price_per_day=Decimal("20.00"))
+    start = date.today() + timedelta(days=1)
+
+    response = auth_client.post(
+        "/api/rentals/",
+        data={"tool_id": tool.id, "start_date": start.isoformat(), "end_date": (start + timedelta(days=2)).isoformat()},
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert response.json()["total_price"] == "60.00"
+    assert response.json()["status"] == "pending"
+    rental = Rental.objects.get(pk=response.json()["id"])
+    assert rental.tool_id == tool.id
+    tool.refresh_from_db()
+    assert tool.is_available is False
+
+
+@pytest.mark.django_db
+def test_booking_conflict_keeps_validation_message(auth_client, tool_factory, other_user):
+    """Testa que o conflito detectado no banco mantém a mensagem original"""
+    tool = tool_factory(is_available=True)
+    start = date.today() + timedelta(days=5)
+    baker.make(Rental, tool=tool, renter=other_user, status="pending",
+               start_date=start, end_date=start + timedelta(days=5), total_price=10)
+
+    response = auth_client.post(
+        "/api/rentals/",
+        data={"tool_id": tool.id, "start_date": (start + timedelta(days=3)).isoformat(),
+              "end_date": (start + timedelta(days=8)).isoformat()},
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert response.json() == [CONFLICT_MESSAGE]
+    assert Rental.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_booking_updates_facet_counts(tool_factory, user):
+    """Testa que o bloqueio da ferramenta (sem signals) atualiza as facetas"""
+    tool = Tool.objects.get(pk=tool_factory(is_available=True, category="pintura", state="SP").pk)
+    start = date.today() + timedelta(days=1)
+
+    book_tool(tool, user, start, start, Decimal("10.00"))
+
+    counts = dict(
+        ToolFacetCount.objects.filter(category="pintura", state="SP").values_list("is_available", "count")
+    )
+    assert counts == {True: 0, False: 1}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_bookings_create_a_single_rental(tool_factory, user):
+    """Testa reservas simultâneas do mesmo período: apenas uma é criada"""
+    tool = tool_factory(is_available=True)
+    start = date.today() + timedelta(days=3)
+    workers = 8
+    barrier = threading.Barrier(workers)
+    results = []
+
+    def attempt(offset):
+        try:
+            barrier.wait()
+            book_tool(tool, user, start + timedelta(days=offset % 2), start + timedelta(days=2), Decimal("1"))
+            results.append("ok")
+        except ValidationError as exc:
+            results.append(str(exc.detail[0]))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=attempt, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count("ok") == 1
+    assert results.count(CONFLICT_MESSAGE) == workers - 1
+    assert Rental.objects.filter(tool=tool).count() == 1
+
+
+@pytest.mark.django_db
+def test_no_overlap_migration_lists_existing_conflicts(user, tool_factory, monkeypatch):
+    """Testa que a migration da constraint para com a lista dos aluguéis sobrepostos já gravados"""
+    migration = importlib.import_module("marketplace.migrations.0011_rental_no_overlap_constraint")
+    tool = tool_factory()
+    start = date.today() + timedelta(days=1)
+    first = baker.make(Rental, tool=tool, renter=user, start_date=start, end_date=start + timedelta(days=3))
+    second = baker.make(
+        Rental, tool=tool, renter=user, start_date=start + timedelta(days=2), end_date=start + timedelta(days=5)
+    )
+    baker.make(Rental, tool=tool, renter=user, start_date=start, end_date=start, status="rejected")
+    schema_editor = SimpleNamespace(connection=connection)
+    monkeypatch.setattr(connection, "vendor", "postgresql")
+
+    with pytest.raises(RuntimeError) as excinfo:
+        migration.check_no_overlapping_rentals(None, schema_editor)
+
+    message = str(excinfo.value)
+    assert message.startswith("1 par(es)")
+    assert f"ferramenta {tool.id}: aluguel {first.id}" in message
+    assert f"x aluguel {second.id}" in message
@@ -0,0 +1,53 @@
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client
+
+
+@pytest.mark.django_db
+def test_api_requests_skip_session_csrf_and_messages(auth_client):
+    """Testa que requisições /api/ não passam pelos middlewares de sessão, CSRF e mensagens"""
+    response = auth_client.get("/api/tools/")
+
+    assert response.status_code == 200
+    request = response.wsgi_request
+    assert not hasattr(request, "session")
+    assert not hasattr(request, "_messages")
+    assert "CSRF_COOKIE" not in request.META
+    assert "Cookie" not in response.get("Vary", "")
+
+
+@pytest.mark.django_db
+def test_api_post_needs_no_csrf_token(api_client, user):
+    """Testa que escritas na API continuam sem exigir token CSRF"""
+    client = Client(enforce_csrf_checks=True)
+
+    response = client.post(
+        "/api/auth/login/", {"username": "user_default", "password": "password123"},
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_admin_keeps_full_stack():
+    """Testa que o admin continua com sessão, autenticação e CSRF"""
+    User.objects.create_superuser("admin", "admin@example.com", "senha-admin-123")
+    client = Client(enforce_csrf_checks=True)
+
+    page = client.get("/admin/login/")
+    assert page.status_code == 200
+    assert hasattr(page.wsgi_request, "session")
+    assert "csrftoken" in page.cookies
+
+    rejected = client.post("/admin/login/", {"username": "admin", "password": "senha-admin-123"})
+    assert rejected.status_code == 403
+
+    accepted = client.post("/admin/login/", {
+        "username": "admin",
+        "password": "senha-admin-123",
+        "csrfmiddlewaretoken": page.cookies["csrftoken"].value,
+        "next": "/admin/",
+    })
+    assert accepted.status_code == 302
+    assert client.get("/admin/").status_code == 200
@@ -0,0 +1,115 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from marketplace.models import Rental
+
+
+@pytest.fixture
+def rental(tool, user):
+    return baker.make(Rental, tool=tool, renter=user, status="pending")
+
+
+def _select_sql(context):
+    return [query["sql"] for query in context.captured_queries if "COUNT(" not in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_tool_fields_trim_response_and_query(auth_client, tool):
+    """Testa que ?fields= devolve só os campos pedidos e não lê descrição nem o dono"""
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.get("/api/tools/?fields=id,title,price_per_day,image_url")
+
+    assert response.status_code == 200
+    item = response.json()["results"][0]
+    assert list(item) == ["id", "title", "price_per_day", "image_url"]
+    assert item["image_url"].endswith("tools/sample")
+    [sql] = _select_sql(context)
+    assert '"description"' not in sql
+    assert "auth_user" not in sql
+
+
+@pytest.mark.django_db
+def test_tool_fields_with_owner_username_joins_owner(auth_client, tool, django_assert_num_queries):
+    """Testa que campos de relações continuam vindo do join (sem query por item)"""
+    # Paginação por cursor: uma única query, sem COUNT
+    with django_assert_num_queries(1):
+        response = auth_client.get("/api/tools/?fields=id,owner_username&pagination=cursor&ordering=price_per_day")
+
+    assert response.json()["results"] == [{"id": tool.id, "owner_username": tool.owner.username}]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["fields=id,password", "fields=", "fields=id&expand=tool"])
+def test_tool_invalid_fields_or_expand(api_client, tool, query):
+    """Testa que campos ou expansões desconhecidos retornam 400"""
+    response = api_client.get(f"/api/tools/?{query}")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_anonymous_cache_separates_fieldsets(api_client, tool):
+    """Testa que respostas com fields diferentes não compartilham o cache"""
+    full = api_client.get("/api/tools/").json()["results"][0]
+    sparse = api_client.get("/api/tools/?fields=id").json()["results"][0]
+    detail = api_client.get(f"/api/tools/{tool.id}/?fields=title").json()
+
+    assert "description" in full
+    assert sparse == {"id": tool.id}
+    assert detail == {"title": tool.title}
+
+
+@pytest.mark.django_db
+def test_rental_list_keeps_tool_details_by_default(auth_client, rental):
+    """Testa que sem fields/expand os aluguéis continuam com tool_details"""
+    item = auth_client.get("/api/rentals/").json()["results"][0]
+
+    assert item["tool_details"]["id"] == rental.tool_id
+
+
+@pytest.mark.django_db
+def test_rental_sparse_fields_skip_tool_join(auth_client, rental):
+    """Testa que ?fields= nos aluguéis não serializa nem carrega a ferramenta"""
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.get("/api/rentals/?fields=id,status,tool")
+
+    assert response.json()["results"] == [{"id": rental.id, "tool": rental.tool_id, "status": "pending"}]
+    [sql] = _select_sql(context)
+    assert '"marketplace_tool"."title"' not in sql
+    assert "auth_user" not in sql
+    assert response["ETag"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["expand=tool", "fields=id,tool_details", "fields=id&expand=tool"])
+def test_rental_expand_tool(auth_client, rental, django_assert_num_queries, query):
+    """Testa que ?expand=tool (ou tool_details em fields) inclui a ferramenta com um único join"""
+    with django_assert_num_queries(2):
+        response = auth_client.get(f"/api/rentals/?{query}")
+
+    item = response.json()["results"][0]
+    assert item["tool_details"]["owner_username"] == rental.tool.owner.username
+    if query.startswith("fields"):
+        assert list(item) == ["id", "tool_details"]
+    else:
+        assert "status" in item
+
+
+@pytest.mark.django_db
+def test_rental_expand_empty_omits_tool_details(auth_client, rental):
+    """Testa que ?expand= vazio devolve o aluguel sem tool_details"""
+    item = auth_client.get(f"/api/rentals/{rental.id}/?expand=").json()
+
+    assert "tool_details" not in item
+    assert item["owner_username"] == rental.tool.owner.username
+
+
+@pytest.mark.django_db
+def test_rental_invalid_expand(auth_client, rental):
+    """Testa que expansões desconhecidas nos aluguéis retornam 400"""
+    response = auth_client.get("/api/rentals/?expand=owner")
+
+    assert response.status_code == 400
+    assert "expand" in response.json()
@@ -0,0 +1,195 @@
+import time
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.core.cache import cache
+from model_bakery import baker
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from marketplace.authentication import _version_key, user_cache
+from marketplace.models import Rental
+
+
+@pytest.fixture(autouse=True)
+def stateless_reads(settings):
+    # Padrão apenas com cache compartilhado (REDIS_URL); nos testes há um único processo
+    settings.AUTH_STATELESS_READS = True
+
+
+def _login(client, username="user_default", password="password123"):
+    response = client.post(
+        "/api/auth/login/", {"username": username, "password": password}, format="json"
+    )
+    assert response.status_code == 200
+    return response.json()["access"]
+
+
+def _bearer(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def _user_queries(queries):
+    return [query["sql"] for query in queries if 'FROM "auth_user"' in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_access_token_carries_user_claims(api_client, user):
+    """Testa que o token de acesso traz username, is_active e a versão"""
+    token = AccessToken(_login(api_client))
+
+    assert token["username"] == user.username
+    assert token["is_active"] is True
+    assert token["ver"]
+
+
+@pytest.mark.django_db
+def test_read_does_not_query_user(api_client, user):
+    """Testa que uma leitura autenticada não consulta a tabela de usuários"""
+    client = _bearer(_login(api_client))
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/rentals/")
+
+    assert response.status_code == 200
+    assert _user_queries(queries.captured_queries) == []
+
+
+@pytest.mark.django_db
+def test_claims_user_passes_object_permissions(api_client, user, tool_factory):
+    """Testa que o usuário montado das claims é igual ao dono nas permissões de objeto"""
+    rental = baker.make(
+        Rental, tool=tool_factory(), renter=user, start_date=date(2026, 3, 1), end_date=date(2026, 3, 3)
+    )
+
+    response = _bearer(_login(api_client)).get(f"/api/rentals/{rental.pk}/")
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_writes_reuse_user_from_cache(api_client, user):
+    """Testa que escritas seguidas buscam o usuário no banco só uma vez"""
+    client = _bearer(_login(api_client))
+    user_cache.clear()
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(3):
+            client.post("/api/rentals/", {}, format="json")
+
+    assert len(_user_queries(queries.captured_queries)) == 1
+
+
+@pytest.mark.django_db
+def test_me_returns_full_user(api_client, user):
+    """Testa que /api/auth/me/ devolve o usuário completo com o token sem consulta"""
+    response = _bearer(_login(api_client)).get("/api/auth/me/")
+
+    assert response.status_code == 200
+    assert response.json()["email"] == user.email
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ["get", "post"])
+def test_password_change_revokes_token(api_client, user, method):
+    """Testa que trocar a senha invalida os tokens emitidos antes, em leituras e escritas"""
+    client = _bearer(_login(api_client))
+    client.post("/api/rentals/", {}, format="json")  # usuário no LRU
+
+    user.set_password("nova-senha-456")
+    user.save()
+
+    response = getattr(client, method)("/api/rentals/", format="json")
+    assert response.status_code == 401
+    assert _bearer(_login(api_client, password="nova-senha-456")).get("/api/rentals/").status_code == 200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ["get", "post"])
+def test_deactivation_revokes_token(api_client, user, method):
+    """Testa que desativar o usuário invalida os tokens emitidos antes"""
+    client = _bearer(_login(api_client))
+
+    user.is_active = False
+    user.save()
+
+    response = getattr(client, method)("/api/rentals/", format="json")
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_password_change_revokes_refresh_token(api_client, user):
+    """Testa que trocar a senha também invalida o refresh token emitido antes"""
+    refresh = api_client.post(
+        "/api/auth/login/", {"username": user.username, "password": "password123"}, format="json"
+    ).json()["refresh"]
+
+    user.set_password("nova-senha-456")
+    user.save()
+
+    response = api_client.post("/api/auth/refresh/", {"refresh": refresh}, format="json")
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_version_kept_for_refresh_token_lifetime(user):
+    """Testa que a versão gravada no cache dura o tempo de vida do refresh token"""
+    user.save()
+
+    expires = cache._expire_info[cache.make_and_validate_key(_version_key(user.pk))]
+    assert expires - time.time() > api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    assert expires - time.time() <= api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("path", ["/api/rentals/", "/api/auth/me/"])
+def test_read_without_cached_version_checks_user(api_client, user, path):
+    """Testa que, sem a versão no cache, a leitura confere a versão no usuário em vez de confiar nas claims"""
+    client = _bearer(_login(api_client))
+    assert client.get(path).status_code == 200
+
+    user.set_password("nova-senha-456")
+    user.save()
+    cache.delete(_version_key(user.pk))
+
+    assert client.get(path).status_code == 401
+    assert _bearer(_login(api_client, password="nova-senha-456")).get(path).status_code == 200
+
+
+@pytest.mark.django_db
+def test_deleted_user_token_rejected(api_client, user):
+    """Testa que o token de um usuário removido é recusado"""
+    client = _bearer(_login(api_client))
+
+    user.delete()
+
+    assert client.get("/api/rentals/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_token_without_claims_still_accepted(user):
+    """Testa que tokens emitidos sem as novas claims continuam válidos (buscando o usuário)"""
+    client = _bearer(str(AccessToken.for_user(user)))
+
+    response = client.get("/api/auth/me/")
+
+    assert response.status_code == 200
+    assert response.json()["username"] == user.username
+
+
+@pytest.mark.django_db
+def test_stateless_reads_can_be_disabled(settings, api_client, user):
+    """Testa que com AUTH_STATELESS_READS desligado as leituras usam o usuário do banco/LRU"""
+    settings.AUTH_STATELESS_READS = False
+    client = _bearer(_login(api_client))
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/rentals/")
+        client.get("/api/rentals/")
+
+    assert len(_user_queries(queries.captured_queries)) == 1
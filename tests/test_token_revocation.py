@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from marketplace.models import RevokedToken
+from marketplace.revocation import BloomFilter, revocation_list
+
+
+def _login(client, username="user_default", password="password123"):
+    response = client.post(
+        "/api/auth/login/", {"username": username, "password": password}, format="json"
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def _bearer(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Testa que o filtro de Bloom acusa todas as chaves adicionadas e poucas das demais"""
+    bloom = BloomFilter(1000, 0.01)
+    for index in range(1000):
+        bloom.add(f"jti-{index}")
+
+    assert all(f"jti-{index}" in bloom for index in range(1000))
+    false_positives = sum(f"outro-{index}" in bloom for index in range(10000))
+    assert false_positives < 300
+
+
+@pytest.mark.django_db
+def test_logout_revokes_access_and_refresh(api_client, user):
+    """Testa que o logout revoga o access token da requisição e o refresh token enviado"""
+    tokens = _login(api_client)
+    client = _bearer(tokens["access"])
+
+    response = client.post("/api/auth/logout/", {"refresh": tokens["refresh"]}, format="json")
+
+    assert response.status_code == 204
+    assert RevokedToken.objects.count() == 2
+    assert client.get("/api/rentals/").status_code == 401
+    refresh = APIClient().post("/api/auth/refresh/", {"refresh": tokens["refresh"]}, format="json")
+    assert refresh.status_code == 401
+
+
+@pytest.mark.django_db
+def test_logout_keeps_other_sessions(api_client, user):
+    """Testa que o logout de uma sessão não afeta os tokens de outra"""
+    first = _login(api_client)
+    second = _login(api_client)
+
+    _bearer(first["access"]).post("/api/auth/logout/", {"refresh": first["refresh"]}, format="json")
+
+    assert _bearer(second["access"]).get("/api/rentals/").status_code == 200
+    refresh = APIClient().post("/api/auth/refresh/", {"refresh": second["refresh"]}, format="json")
+    assert refresh.status_code == 200
+
+
+@pytest.mark.django_db
+def test_logout_rejects_refresh_of_other_user(api_client, user, other_user):
+    """Testa que não é possível revogar o refresh token de outro usuário"""
+    mine = _login(api_client)
+    theirs = _login(api_client, username=other_user.username)
+
+    response = _bearer(mine["access"]).post("/api/auth/logout/", {"refresh": theirs["refresh"]}, format="json")
+
+    assert response.status_code == 400
+    assert not RevokedToken.objects.exists()
+
+
+@pytest.mark.django_db
+def test_logout_requires_authentication(api_client):
+    """Testa que o logout exige autenticação"""
+    assert api_client.post("/api/auth/logout/", {}, format="json").status_code == 401
+
+
+@pytest.mark.django_db
+def test_valid_token_check_costs_no_query(api_client, user):
+    """Testa que, com o filtro carregado, um token não revogado não consulta a tabela de revogações"""
+    client = _bearer(_login(api_client)["access"])
+    client.get("/api/rentals/")  # carrega o filtro
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/rentals/")
+
+    assert not [query for query in queries.captured_queries if "revokedtoken" in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_revocation_from_other_process_applies_after_refresh(settings, api_client, user):
+    """Testa que revogações gravadas por outro processo valem após a recarga do filtro"""
+    settings.AUTH_REVOCATION_REFRESH_INTERVAL = 3600
+    tokens = _login(api_client)
+    client = _bearer(tokens["access"])
+    assert client.get("/api/rentals/").status_code == 200
+
+    # Outro processo: grava no banco sem passar pelo filtro deste
+    access = AccessToken(tokens["access"])
+    RevokedToken.objects.create(
+        jti=access["jti"], token_type="access", expires_at=timezone.now() + timedelta(hours=1)
+    )
+    assert client.get("/api/rentals/").status_code == 200
+
+    revocation_list.refresh()
+    assert client.get("/api/rentals/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_purge_revoked_tokens_command(capsys):
+    """Testa que o comando apaga só as revogações de tokens expirados"""
+    now = timezone.now()
+    RevokedToken.objects.create(jti="velho", token_type="access", expires_at=now - timedelta(minutes=1))
+    RevokedToken.objects.create(jti="atual", token_type="refresh", expires_at=now + timedelta(days=1))
+
+    call_command("purge_revoked_tokens")
+
+    assert [*RevokedToken.objects.values_list("jti", flat=True)] == ["atual"]
+    assert "1" in capsys.readouterr().out
@@ -0,0 +1,127 @@
+import base64
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+from model_bakery import baker
+
+from marketplace.availability import encode_bitmap
+from marketplace.cache import GENERATION_KEY
+from marketplace.models import Rental
+
+
+@pytest.fixture
+def window():
+    start = date.today() + timedelta(days=1)
+    return start, start + timedelta(days=13)
+
+
+def _url(tool, start, end):
+    return f"/api/tools/{tool.id}/availability/?from={start}&to={end}"
+
+
+def _rent(tool, renter, start, end, status="approved"):
+    return baker.make(Rental, tool=tool, renter=renter, status=status,
+                      start_date=start, end_date=end, total_price=10)
+
+
+def test_bitmap_marks_one_bit_per_day():
+    """Testa a codificação do bitmap (primeiro dia = bit mais significativo)"""
+    start = date(2026, 1, 1)
+    ranges = [[date(2026, 1, 1), date(2026, 1, 2)], [date(2026, 1, 9), date(2026, 1, 9)]]
+
+    encoded = encode_bitmap(ranges, start, date(2026, 1, 10))
+
+    assert base64.b64decode(encoded) == bytes([0b11000000, 0b10000000])
+
+
+@pytest.mark.django_db
+def test_returns_merged_blocked_ranges(api_client, tool, user, window):
+    """Testa intervalos recortados à janela e mesclados quando contíguos"""
+    start, end = window
+    _rent(tool, user, start - timedelta(days=3), start + timedelta(days=1))
+    _rent(tool, user, start + timedelta(days=2), start + timedelta(days=3), status="pending")
+    _rent(tool, user, start + timedelta(days=6), start + timedelta(days=7), status="rejected")
+    _rent(tool, user, end, end + timedelta(days=5))
+
+    response = api_client.get(_url(tool, start, end))
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["blocked"] == [
+        [start.isoformat(), (start + timedelta(days=3)).isoformat()],
+        [end.isoformat(), end.isoformat()],
+    ]
+    assert data["blocked_days"] == 5
+    bits = base64.b64decode(data["bitmap"])
+    assert len(bits) == 2
+    assert bits[0] == 0b11110000
+    assert bits[1] == 0b00000100
+
+
+@pytest.mark.django_db
+def test_calendar_is_cached_and_invalidated(api_client, tool, user, window, django_assert_num_queries):
+    """Testa o cache por ferramenta e a invalidação quando um aluguel muda"""
+    start, end = window
+    rental = _rent(tool, user, start, start, status="pending")
+    api_client.get(_url(tool, start, end))
+
+    with django_assert_num_queries(0):
+        cached = api_client.get(_url(tool, start, end))
+    assert cached.json()["blocked_days"] == 1
+
+    rental.status = "rejected"
+    rental.save()
+
+    assert api_client.get(_url(tool, start, end)).json()["blocked"] == []
+
+
+@pytest.mark.django_db
+def test_tool_generation_expires(api_client, tool, user, window, settings):
+    """Testa que a geração do calendário de cada ferramenta tem TTL e que sem ela a leitura só erra o cache"""
+    settings.TOOL_CACHE_TIMEOUT = 120
+    start, end = window
+    api_client.get(_url(tool, start, end))
+    key = GENERATION_KEY.format(namespace=f"availability:{tool.id}")
+
+    # LocMemCache guarda o instante de expiração de cada chave
+    assert cache._expire_info[cache.make_and_validate_key(key)] is not None
+
+    cache.delete(key)
+    _rent(tool, user, start, start)
+
+    assert api_client.get(_url(tool, start, end)).json()["blocked_days"] == 1
+    assert cache._expire_info[cache.make_and_validate_key(key)] is not None
+
+
+@pytest.mark.django_db
+def test_booking_invalidates_calendar(auth_client, tool, window):
+    """Testa que uma nova reserva aparece no calendário já consultado"""
+    start, end = window
+    auth_client.get(_url(tool, start, end))
+
+    auth_client.post(
+        "/api/rentals/",
+        data={"tool_id": tool.id, "start_date": start.isoformat(), "end_date": start.isoformat()},
+        format="json",
+    )
+
+    assert auth_client.get(_url(tool, start, end)).json()["blocked_days"] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query",
+    ["from=2026-01-10&to=2026-01-01", "from=2026-01-01&to=2027-06-01", "from=ontem"],
+)
+def test_invalid_window_returns_400(api_client, tool, query):
+    """Testa janelas inválidas"""
+    response = api_client.get(f"/api/tools/{tool.id}/availability/?{query}")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_unknown_tool_returns_404(api_client):
+    """Testa ferramenta inexistente"""
+    assert api_client.get("/api/tools/999999/availability/").status_code == 404
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+
+import pytest
+from model_bakery import baker
+
+from marketplace.models import Rental
+
+
+def _ids(response):
+    return {item["id"] for item in response.json()["results"]}
+
+
+@pytest.fixture
+def booked_tool(tool_factory, user):
+    tool = tool_factory(is_available=True)
+    start = date.today() + timedelta(days=10)
+    baker.make(
+        Rental, tool=tool, renter=user, status="approved",
+        start_date=start, end_date=start + timedelta(days=4), total_price=50,
+    )
+    return tool
+
+
+@pytest.mark.django_db
+def test_excludes_tools_with_overlapping_rentals(api_client, booked_tool, tool):
+    """Testa que ferramentas com aluguel sobreposto ficam fora da listagem"""
+    start = date.today() + timedelta(days=12)
+    response = api_client.get(
+        f"/api/tools/?available_from={start}&available_to={start + timedelta(days=5)}"
+    )
+
+    assert response.status_code == 200
+    assert _ids(response) == {tool.id}
+
+
+@pytest.mark.django_db
+def test_includes_tools_booked_outside_period(api_client, booked_tool, tool):
+    """Testa que aluguéis fora do período não bloqueiam a ferramenta"""
+    start = date.today() + timedelta(days=15)
+    response = api_client.get(f"/api/tools/?available_from={start}&available_to={start}")
+
+    assert _ids(response) == {booked_tool.id, tool.id}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("status", ["rejected", "finished"])
+def test_inactive_rentals_do_not_block(api_client, booked_tool, status):
+    """Testa que aluguéis recusados/finalizados não contam como ocupação"""
+    Rental.objects.filter(tool=booked_tool).update(status=status)
+    day = date.today() + timedelta(days=10)
+
+    response = api_client.get(f"/api/tools/?available_from={day}")
+
+    assert _ids(response) == {booked_tool.id}
+
+
+@pytest.mark.django_db
+def test_single_date_checks_that_day(api_client, booked_tool):
+    """Testa que apenas available_to filtra aquele único dia"""
+    last_day = date.today() + timedelta(days=14)
+
+    assert _ids(api_client.get(f"/api/tools/?available_to={last_day}")) == set()
+    assert _ids(api_client.get(f"/api/tools/?available_to={last_day + timedelta(days=1)}")) == {booked_tool.id}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query",
+    ["available_from=amanha", "available_from=2026-02-30", "available_from=2030-01-10&available_to=2030-01-01"],
+)
+def test_invalid_period_returns_400(api_client, query):
+    """Testa datas inválidas ou período invertido"""
+    response = api_client.get(f"/api/tools/?{query}")
+
+    assert response.status_code == 400
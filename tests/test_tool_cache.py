@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+import pytest
+from django.http import QueryDict
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from marketplace.cache import normalize_query
+from marketplace.models import Rental
+
+
+def test_normalize_query_is_order_and_case_insensitive():
+    """Testa que parâmetros equivalentes geram a mesma query normalizada"""
+    first = QueryDict("state=sp&category=pintura&category=construcao&search=Furadeira")
+    second = QueryDict("category=construcao&search=furadeira&category=pintura&state=SP&city=")
+
+    assert normalize_query(first) == normalize_query(second)
+
+
+@pytest.mark.django_db
+def test_anonymous_listing_served_from_cache(api_client, tool, django_assert_num_queries):
+    """Testa que a segunda listagem idêntica não consulta o banco"""
+    first = api_client.get("/api/tools/?category=construcao&category=pintura")
+    assert first["X-Cache"] == "MISS"
+
+    with django_assert_num_queries(0):
+        second = api_client.get("/api/tools/?category=pintura&category=construcao")
+
+    assert second["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+
+@pytest.mark.django_db
+def test_anonymous_detail_served_from_cache(api_client, tool, django_assert_num_queries):
+    """Testa cache do detalhe da ferramenta"""
+    api_client.get(f"/api/tools/{tool.id}/")
+
+    with django_assert_num_queries(0):
+        response = api_client.get(f"/api/tools/{tool.id}/")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == tool.id
+
+
+@pytest.mark.django_db
+def test_authenticated_requests_bypass_cache(auth_client, tool):
+    """Testa que requisições autenticadas não usam o cache"""
+    auth_client.get("/api/tools/")
+    response = auth_client.get("/api/tools/")
+
+    assert "X-Cache" not in response
+
+
+@pytest.mark.django_db
+def test_tool_update_invalidates_cache(api_client, tool):
+    """Testa que alterar uma ferramenta invalida as respostas em cache"""
+    api_client.get(f"/api/tools/{tool.id}/")
+
+    tool.title = "Título novo"
+    tool.save()
+    response = api_client.get(f"/api/tools/{tool.id}/")
+
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["title"] == "Título novo"
+
+
+@pytest.mark.django_db
+def test_rental_approval_invalidates_cache(api_client, owner_user, user, tool):
+    """Testa que aprovar um aluguel invalida a listagem em cache"""
+    rental = baker.make(
+        Rental,
+        tool=tool,
+        renter=user,
+        start_date=date.today(),
+        end_date=date.today() + timedelta(days=1),
+    )
+    api_client.get("/api/tools/")
+
+    owner = APIClient()
+    owner.force_authenticate(user=owner_user)
+    assert owner.patch(f"/api/rentals/{rental.id}/approve/").status_code == 200
+
+    response = api_client.get("/api/tools/")
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["results"][0]["available"] is False
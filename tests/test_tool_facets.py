@@ -0,0 +1,154 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import override_settings
+
+from marketplace import facets
+from marketplace.facets import compute_facets
+from marketplace.models import Tool, ToolFacetCount
+
+
+def _counts(items):
+    return {item["value"]: item["count"] for item in items}
+
+
+@pytest.fixture
+def catalog(tool_factory):
+    return [
+        tool_factory(category="construcao", state="SP", city="Campinas", is_available=True),
+        tool_factory(category="construcao", state="sp", city="Santos", is_available=False),
+        tool_factory(category="pintura", state="RJ", city="Niterói", is_available=True),
+        tool_factory(category="jardinagem", state="SP", city="Campinas", is_available=True),
+    ]
+
+
+@pytest.mark.django_db
+def test_facets_without_filters(api_client, catalog):
+    """Testa as contagens de facetas sem filtros"""
+    response = api_client.get("/api/tools/facets/")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    categories = _counts(data["category"])
+    assert categories["construcao"] == 2
+    assert categories["pintura"] == 1
+    assert categories["eletrica"] == 0
+    assert _counts(data["state"]) == {"SP": 3, "RJ": 1}
+    assert _counts(data["available"]) == {True: 3, False: 1}
+
+
+@pytest.mark.django_db
+def test_category_facet_ignores_category_filter(api_client, catalog):
+    """Testa que a faceta de categoria mostra as outras opções e as demais respeitam o filtro"""
+    data = api_client.get("/api/tools/facets/?category=construcao&state=SP").json()
+
+    assert _counts(data["category"])["construcao"] == 2
+    assert _counts(data["category"])["jardinagem"] == 1
+    assert _counts(data["category"])["pintura"] == 0
+    assert _counts(data["state"]) == {"SP": 2}
+    assert data["total"] == 2
+
+
+@pytest.mark.django_db
+def test_aggregate_table_matches_grouped_query(catalog):
+    """Testa que a tabela agregada acompanha criação, edição e remoção"""
+    tool = catalog[0]
+    tool.is_available = False
+    tool.state = "MG"
+    tool.save()
+    catalog[2].delete()
+    Tool.objects.get(pk=catalog[3].pk).delete()
+
+    with override_settings(TOOL_FACETS_AGGREGATE_TABLE=True):
+        from_table = compute_facets(QueryDict())
+    with override_settings(TOOL_FACETS_AGGREGATE_TABLE=False):
+        from_query = compute_facets(QueryDict())
+
+    assert from_table == from_query
+    assert from_table["total"] == 2
+
+
+@pytest.mark.django_db
+def test_save_without_loaded_facet_fields_adjusts_deltas(catalog, monkeypatch):
+    """Testa que instâncias com campos adiados ajustam as contagens pela linha atual, sem recalcular tudo"""
+    def fail(*args, **kwargs):
+        raise AssertionError("rebuild_facet_counts chamado no save")
+
+    monkeypatch.setattr(facets, "rebuild_facet_counts", fail)
+
+    deferred = Tool.objects.only("id", "title").get(pk=catalog[2].pk)
+    deferred.title = "Outro título"
+    deferred.save()
+    by_pk = Tool.objects.get(pk=catalog[3].pk)
+    by_pk._facet_key = None
+    by_pk.category = "pintura"
+    by_pk.save()
+
+    with override_settings(TOOL_FACETS_AGGREGATE_TABLE=True):
+        from_table = compute_facets(QueryDict())
+    with override_settings(TOOL_FACETS_AGGREGATE_TABLE=False):
+        from_query = compute_facets(QueryDict())
+
+    assert from_table == from_query
+    assert _counts(from_table["category"])["pintura"] == 2
+
+
+@pytest.mark.django_db
+def test_stale_instances_adjust_from_stored_row(catalog):
+    """Testa que duas instâncias carregadas antes de salvar não aplicam o mesmo delta duas vezes"""
+    first = Tool.objects.get(pk=catalog[0].pk)
+    second = Tool.objects.get(pk=catalog[0].pk)
+    first.category = second.category = "pintura"
+    first.save()
+    second.save()
+    partial = Tool.objects.get(pk=catalog[1].pk)
+    Tool.objects.get(pk=catalog[1].pk).save(update_fields=["title"])
+    partial.is_available = not partial.is_available
+    partial.save(update_fields=["is_available"])
+
+    with override_settings(TOOL_FACETS_AGGREGATE_TABLE=True):
+        from_table = compute_facets(QueryDict())
+    with override_settings(TOOL_FACETS_AGGREGATE_TABLE=False):
+        from_query = compute_facets(QueryDict())
+
+    assert from_table == from_query
+
+
+@pytest.mark.django_db
+def test_facet_deltas_run_in_the_save_transaction(catalog, monkeypatch):
+    """Testa que a leitura da linha e o ajuste das contagens ficam na transação do save"""
+    in_transaction = []
+    adjust = facets._adjust
+
+    def spy(*args, **kwargs):
+        in_transaction.append(bool(connection.savepoint_ids))
+        return adjust(*args, **kwargs)
+
+    monkeypatch.setattr(facets, "_adjust", spy)
+    tool = Tool.objects.get(pk=catalog[0].pk)
+    tool.category = "pintura"
+    tool.save()
+
+    assert in_transaction == [True, True]
+
+
+@pytest.mark.django_db
+def test_rebuild_after_bulk_update(catalog):
+    """Testa a reconstrução da tabela após update() (que não dispara signals)"""
+    Tool.objects.update(is_available=False)
+    call_command("rebuild_facet_counts")
+
+    rows = ToolFacetCount.objects.filter(is_available=True, count__gt=0)
+    assert not rows.exists()
+    assert sum(ToolFacetCount.objects.values_list("count", flat=True)) == 4
+
+
+@pytest.mark.django_db
+def test_facets_use_aggregate_table_without_filters(api_client, catalog, django_assert_num_queries):
+    """Testa que as facetas sem filtro fazem uma única query"""
+    with django_assert_num_queries(1):
+        response = api_client.get("/api/tools/facets/")
+
+    assert response.json()["total"] == 4
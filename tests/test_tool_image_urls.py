@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from marketplace import images
+from marketplace.models import Tool
+from marketplace.serializers import ToolSerializer
+
+
+@pytest.mark.django_db
+def test_photo_urls_are_computed_on_save(tool):
+    """Testa que as URLs das variações são calculadas e guardadas no save"""
+    tool.refresh_from_db()
+
+    assert tool.photo_urls["original"] == tool.photo.url
+    assert "c_fill" in tool.photo_urls["thumbnail"]
+    assert "w_1024" in tool.photo_urls["medium"]
+
+
+@pytest.mark.django_db
+def test_listing_uses_stored_urls(api_client, tool, monkeypatch):
+    """Testa que a listagem não recalcula URLs já guardadas"""
+    def fail(photo):
+        raise AssertionError("URLs recalculadas na listagem")
+
+    monkeypatch.setattr(images, "build_photo_urls", fail)
+    response = api_client.get("/api/tools/")
+
+    item = response.json()["results"][0]
+    assert item["image_url"] == tool.photo_urls["original"]
+    assert item["image_urls"] == {
+        "original": tool.photo_urls["original"],
+        "thumbnail": tool.photo_urls["thumbnail"],
+        "medium": tool.photo_urls["medium"],
+    }
+
+
+@pytest.mark.django_db
+def test_photo_change_recomputes_urls(tool):
+    """Testa que trocar a foto recalcula as URLs"""
+    tool.photo = "tools/outra-foto"
+    tool.save()
+
+    tool.refresh_from_db()
+    assert "tools/outra-foto" in tool.photo_urls["thumbnail"]
+
+
+@pytest.mark.django_db
+def test_partial_save_without_photo_keeps_urls(tool, monkeypatch):
+    """Testa que um save parcial sem a foto não recalcula nem grava as URLs"""
+    Tool.objects.filter(pk=tool.pk).update(photo_urls={})
+    tool.refresh_from_db()
+    monkeypatch.setattr("marketplace.models.build_photo_urls", lambda photo: pytest.fail("URLs recalculadas"))
+
+    tool.is_available = False
+    tool.save(update_fields=["is_available"])
+
+    tool.refresh_from_db()
+    assert tool.photo_urls == {}
+
+
+@pytest.mark.django_db
+def test_save_of_unchanged_photo_skips_urls(tool, monkeypatch):
+    """Testa que salvar sem trocar a foto não recalcula as URLs"""
+    tool = Tool.objects.get(pk=tool.pk)
+    monkeypatch.setattr("marketplace.models.build_photo_urls", lambda photo: pytest.fail("URLs recalculadas"))
+
+    tool.title = "Outro título"
+    tool.save()
+
+
+@pytest.mark.django_db
+def test_save_of_deferred_instance_does_not_load_photo(tool):
+    """Testa que salvar uma instância com only() não carrega a foto adiada"""
+    tool = Tool.objects.only("id", "title").get(pk=tool.pk)
+    tool.title = "Outro título"
+
+    with CaptureQueriesContext(connection) as context:
+        tool.save(update_fields=["title"])
+
+    assert not [query for query in context.captured_queries if "photo" in query["sql"]]
+    assert "photo" in tool.get_deferred_fields()
+
+
+@pytest.mark.django_db
+def test_serializer_computes_urls_when_not_stored(tool):
+    """Testa que o serializer calcula as URLs se não estiverem guardadas"""
+    Tool.objects.filter(pk=tool.pk).update(photo_urls={})
+    tool.refresh_from_db()
+
+    data = ToolSerializer(tool).data
+
+    assert data["image_url"] == tool.photo.url
+    assert "c_fill" in data["image_urls"]["thumbnail"]
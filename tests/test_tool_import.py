@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from marketplace.importer import import_tools, read_rows
+from marketplace.models import PendingToolPhoto, Tool, ToolFacetCount
+from marketplace.search import search_tools
+
+CSV = (
+    "title,description,category,price_per_day,photo,state,city\n"
+    "Furadeira,Furadeira de impacto,construcao,25.00,https://example.com/furadeira.jpg,SP,Campinas\n"
+    "Sem preço,Linha inválida,construcao,,https://example.com/x.jpg,SP,\n"
+    "Escada,Escada de alumínio,pintura,15.50,https://example.com/escada.png,,\n"
+)
+
+
+def _jsonl(*rows):
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+
+def _row(**kwargs):
+    row = {
+        "title": "Serra",
+        "description": "Serra circular",
+        "category": "construcao",
+        "price_per_day": "30.00",
+        "photo": "https://example.com/serra.webp",
+    }
+    row.update(kwargs)
+    return row
+
+
+@pytest.mark.django_db
+def test_import_csv_reports_row_errors(owner_user):
+    """Testa a importação de CSV com linhas válidas e inválidas"""
+    report = import_tools(read_rows(io.StringIO(CSV), "csv"), owner_user, chunk_size=1)
+
+    assert report["created"] == 2
+    assert [error["row"] for error in report["errors"]] == [2]
+    assert "price_per_day" in report["errors"][0]["errors"]
+    assert set(Tool.objects.values_list("title", flat=True)) == {"Furadeira", "Escada"}
+    assert PendingToolPhoto.objects.count() == 2
+    assert set(Tool.objects.values_list("photo_status", flat=True)) == {Tool.PHOTO_PENDING}
+
+
+@pytest.mark.django_db
+def test_import_updates_search_and_facets(owner_user):
+    """Testa que o bulk_create mantém índice de busca e facetas em dia"""
+    import_tools(read_rows(io.StringIO(CSV), "csv"), owner_user)
+
+    assert list(search_tools(Tool.objects.all(), "aluminio").values_list("title", flat=True)) == ["Escada"]
+    assert ToolFacetCount.objects.get(category="construcao", state="SP", is_available=True).count == 1
+    assert ToolFacetCount.objects.get(category="pintura", state="", is_available=True).count == 1
+
+
+@pytest.mark.django_db
+def test_import_rejects_local_photo_paths_by_default(owner_user):
+    """Testa que a API só aceita URLs como origem da foto"""
+    rows = read_rows(io.StringIO(_jsonl(_row(photo="/etc/passwd.jpg"), "não é json", "[1, 2]")), "jsonl")
+
+    report = import_tools(rows, owner_user)
+
+    assert report["created"] == 0
+    assert [error["row"] for error in report["errors"]] == [1, 2, 3]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/foto.jpg",
+    "http://localhost:8000/foto.jpg",
+    "http://169.254.169.254/latest/foto.png",
+    "http://10.0.0.5/foto.webp",
+    "http://[::1]/foto.jpg",
+])
+def test_import_rejects_internal_photo_urls(owner_user, url):
+    """Testa que a importação recusa fotos em endereços internos"""
+    report = import_tools(read_rows(io.StringIO(_jsonl(_row(photo=url))), "jsonl"), owner_user)
+
+    assert report["created"] == 0
+    assert "photo" in report["errors"][0]["errors"]
+
+
+@pytest.mark.django_db
+def test_import_endpoint_rejects_malformed_csv(auth_client):
+    """Testa que um CSV malformado responde 400 em vez de erro interno"""
+    content = 'title,description\n"' + "a" * (csv.field_size_limit() + 1) + '",x\n'
+    upload = SimpleUploadedFile("tools.csv", content.encode())
+
+    response = auth_client.post("/api/tools/import/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 400
+    assert "CSV inválido" in response.json()["file"]
+
+
+@pytest.mark.django_db
+def test_import_endpoint(auth_client, user):
+    """Testa o endpoint de importação com arquivo JSONL"""
+    upload = SimpleUploadedFile("tools.jsonl", _jsonl(_row(), _row(category="inexistente")).encode())
+
+    response = auth_client.post("/api/tools/import/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["created"] == 1
+    assert data["errors"][0]["row"] == 2
+    assert Tool.objects.get().owner == user
+
+
+@pytest.mark.django_db
+def test_import_endpoint_requires_authentication(api_client):
+    """Testa que a importação exige autenticação"""
+    upload = SimpleUploadedFile("tools.csv", CSV.encode())
+
+    response = api_client.post("/api/tools/import/", {"file": upload}, format="multipart")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_import_command(tmp_path, owner_user):
+    """Testa o comando import_tools (sem envio de fotos)"""
+    path = tmp_path / "tools.csv"
+    path.write_text(CSV, encoding="utf-8")
+    out, err = io.StringIO(), io.StringIO()
+
+    call_command("import_tools", str(path), owner=owner_user.username, skip_photos=True, stdout=out, stderr=err)
+
+    assert "2 ferramentas importadas" in out.getvalue()
+    assert "Linha 2" in err.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_command_uploads_local_photos(tmp_path, owner_user):
+    """Testa o comando com fotos em caminhos locais enviadas ao final"""
+    photo = tmp_path / "serra.jpg"
+    Image.new("RGB", (50, 50)).save(photo)
+    path = tmp_path / "tools.jsonl"
+    path.write_text(_jsonl(_row(photo=str(photo))), encoding="utf-8")
+    out = io.StringIO()
+
+    call_command("import_tools", str(path), owner=owner_user.username, stdout=out)
+
+    assert "Fotos enviadas: 1" in out.getvalue()
+    tool = Tool.objects.get()
+    assert tool.photo_status == Tool.PHOTO_READY
+    assert tool.photo.public_id.startswith("tools/")
+    assert not PendingToolPhoto.objects.exists()
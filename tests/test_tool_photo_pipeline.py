@@ -0,0 +1,227 @@
+import os
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from cloudinary.exceptions import Error as CloudinaryError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from marketplace import photos
+from marketplace.imaging import InvalidImage
+from marketplace.models import PendingToolPhoto, Tool
+
+
+def _image(name="foto.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (50, 50), color="blue").save(buffer, format="JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+def _payload(**kwargs):
+    payload = {
+        "title": "Martelete",
+        "description": "Martelete rompedor",
+        "category": "construcao",
+        "price_per_day": "80.00",
+        "photo": _image(),
+    }
+    payload.update(kwargs)
+    return payload
+
+
+class FailingBackend:
+    def upload(self, source):
+        raise CloudinaryError("timeout")
+
+
+class BrokenBackend:
+    def upload(self, source):
+        raise ValueError("formato inesperado")
+
+
+@pytest.mark.django_db
+def test_create_returns_pending_and_worker_attaches_photo(auth_client, settings, django_capture_on_commit_callbacks):
+    """Testa que a criação responde sem enviar a foto e o worker a associa depois"""
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = auth_client.post("/api/tools/", data=_payload(), format="multipart")
+
+    assert response.status_code == 201
+    assert response.json()["photo_status"] == "pending"
+    assert response.json()["image_url"] is None
+    pending = PendingToolPhoto.objects.get()
+    assert pending.source.startswith(settings.TOOL_PHOTO_STAGING_ROOT)
+
+    for callback in callbacks:
+        callback()
+
+    tool = Tool.objects.get(pk=response.json()["id"])
+    assert tool.photo_status == Tool.PHOTO_READY
+    assert tool.photo_urls["original"].endswith(f"{tool.photo.public_id}.jpg")
+    assert os.path.exists(os.path.join(settings.TOOL_PHOTO_LOCAL_ROOT, f"{tool.photo.public_id}.jpg"))
+    assert not os.path.exists(pending.source)
+    assert not PendingToolPhoto.objects.exists()
+
+
+@pytest.mark.django_db
+def test_update_keeps_current_photo_until_upload(owner_client, tool, django_capture_on_commit_callbacks):
+    """Testa que a troca de foto mantém a atual enquanto a nova está pendente"""
+    with django_capture_on_commit_callbacks(execute=False):
+        response = owner_client.patch(f"/api/tools/{tool.id}/", data={"photo": _image("nova.png")}, format="multipart")
+
+    assert response.status_code == 200
+    assert response.json()["photo_status"] == "pending"
+    tool.refresh_from_db()
+    assert tool.photo.public_id == "tools/sample"
+
+
+@pytest.mark.django_db
+def test_failed_uploads_are_retried_then_marked_failed(tool, tmp_path):
+    """Testa as novas tentativas e o status final de falha"""
+    source = tmp_path / "foto.jpg"
+    source.write_bytes(b"jpeg")
+    pending = PendingToolPhoto.objects.create(tool=tool, source=str(source))
+
+    for attempt in range(1, photos.MAX_ATTEMPTS + 1):
+        assert photos.process_pending_photo(pending.pk, FailingBackend()) is False
+        pending.refresh_from_db()
+        assert pending.attempts == attempt
+
+    assert "timeout" in pending.last_error
+    tool.refresh_from_db()
+    assert tool.photo_status == Tool.PHOTO_FAILED
+    # Esgotadas as tentativas, a pendência não é mais processada
+    assert photos.process_pending_photo(pending.pk) is False
+
+
+@pytest.mark.django_db
+def test_unexpected_upload_error_counts_as_attempt(tool, tmp_path):
+    """Testa que um erro inesperado do envio (ValueError) é registrado como tentativa falha"""
+    source = tmp_path / "foto.jpg"
+    source.write_bytes(b"jpeg")
+    pending = PendingToolPhoto.objects.create(tool=tool, source=str(source))
+
+    assert photos.process_pending_photo(pending.pk, BrokenBackend()) is False
+
+    pending.refresh_from_db()
+    assert pending.attempts == 1
+    assert pending.last_error == "ValueError: formato inesperado"
+    assert source.exists()
+
+
+@pytest.mark.django_db
+def test_upload_command_processes_queue(tool, tmp_path):
+    """Testa o processamento da fila pelo comando (modo sem worker)"""
+    source = tmp_path / "foto.webp"
+    Image.new("RGB", (50, 50)).save(source)
+    PendingToolPhoto.objects.create(tool=tool, source=str(source))
+
+    assert photos.upload_pending_photos() == (1, 0)
+    tool.refresh_from_db()
+    assert tool.photo.format == "webp"
+
+
+@pytest.mark.django_db
+def test_thread_worker_processes_submitted_photo(transactional_db, tool, tmp_path):
+    """Testa o worker em thread processando a pendência enfileirada"""
+    source = tmp_path / "foto.jpg"
+    Image.new("RGB", (50, 50)).save(source)
+    pending = PendingToolPhoto.objects.create(tool=tool, source=str(source))
+    worker = photos.PhotoUploadWorker()
+
+    worker.submit(pending.pk)
+    worker.queue.join()
+
+    tool.refresh_from_db()
+    assert tool.photo_status == Tool.PHOTO_READY
+
+
+@pytest.mark.django_db
+def test_thread_worker_survives_unexpected_error(transactional_db, tool, tmp_path, monkeypatch):
+    """Testa que o worker registra o erro, agenda nova tentativa e continua processando a fila"""
+    source = tmp_path / "foto.jpg"
+    Image.new("RGB", (50, 50)).save(source)
+    pending = PendingToolPhoto.objects.create(tool=tool, source=str(source))
+    process = photos.process_pending_photo
+    calls = []
+
+    def flaky(pending_id):
+        calls.append(pending_id)
+        if len(calls) == 1:
+            raise ValueError("erro inesperado")
+        return process(pending_id)
+
+    monkeypatch.setattr(photos, "process_pending_photo", flaky)
+    # Sem espera: a nova tentativa volta direto para a fila
+    monkeypatch.setattr(photos, "RETRY_DELAYS", (0,))
+    worker = photos.PhotoUploadWorker()
+
+    worker.submit(pending.pk)
+    worker.queue.join()
+
+    assert calls == [pending.pk, pending.pk]
+    assert worker.thread.is_alive()
+    tool.refresh_from_db()
+    assert tool.photo_status == Tool.PHOTO_READY
+
+
+@pytest.fixture
+def photo_server():
+    """Servidor HTTP local (endereço interno) que registra os pedidos recebidos."""
+    requests = []
+    body = {"content": _image().read()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.end_headers()
+            self.wfile.write(body["content"])
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield SimpleNamespace(url=f"http://127.0.0.1:{server.server_port}/foto.jpg", requests=requests, body=body)
+    server.shutdown()
+    server.server_close()
+
+
+def test_local_backend_refuses_internal_addresses(photo_server):
+    """Testa que o download da foto não conecta a endereços internos"""
+    with pytest.raises(photos.RejectedPhotoSource):
+        photos.LocalPhotoBackend().upload(photo_server.url)
+
+    assert photo_server.requests == []
+
+
+def test_photo_download_is_capped(photo_server, monkeypatch):
+    """Testa que downloads acima do limite de tamanho são recusados"""
+    # Libera o endereço local só para exercitar o limite de tamanho
+    monkeypatch.setattr(photos, "build_opener", lambda *handlers: urllib.request.build_opener())
+    photo_server.body["content"] = b"\xff\xd8\xff" + b"0" * photos.MAX_PHOTO_BYTES
+
+    with pytest.raises(InvalidImage, match="5MB"):
+        photos.fetch_photo(photo_server.url)
+
+
+@pytest.mark.django_db
+def test_invalid_image_fails_without_retries(tool, tmp_path):
+    """Testa que uma origem que não é imagem válida falha de vez, sem novas tentativas"""
+    source = tmp_path / "foto.jpg"
+    source.write_bytes(b"<html>nada de imagem</html>")
+    pending = PendingToolPhoto.objects.create(tool=tool, source=str(source))
+
+    assert photos.process_pending_photo(pending.pk, photos.LocalPhotoBackend()) is False
+
+    pending.refresh_from_db()
+    assert pending.attempts == photos.MAX_ATTEMPTS
+    assert pending.last_error.startswith("InvalidImage")
+    tool.refresh_from_db()
+    assert tool.photo_status == Tool.PHOTO_FAILED
@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from marketplace.models import Tool
+from marketplace.search import get_backend, search_tools
+
+
+def _items(response):
+    data = response.json()
+    return data.get("results", data) if isinstance(data, dict) else data
+
+
+@pytest.mark.django_db
+def test_search_uses_index_table(api_client, tool_factory):
+    """Testa que a busca consulta o índice textual em vez de LIKE na descrição"""
+    tool_factory(title="Furadeira", description="Potente")
+    backend = get_backend()
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.get("/api/tools/?search=furadeira")
+
+    assert response.status_code == 200
+    assert len(_items(response)) == 1
+    if hasattr(backend, "table"):
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        assert backend.table in sql
+        assert "LIKE" not in sql.upper()
+
+
+@pytest.mark.django_db
+def test_search_matches_prefix_and_ignores_accents(api_client, tool_factory):
+    """Testa busca por prefixo e sem acentos"""
+    tool_factory(title="Serra Elétrica", description="Corta madeira")
+    tool_factory(title="Martelo", description="Cabo de madeira")
+
+    response = api_client.get("/api/tools/?search=eletri")
+
+    items = _items(response)
+    assert [item["title"] for item in items] == ["Serra Elétrica"]
+
+
+@pytest.mark.django_db
+def test_search_falls_back_to_substring(api_client, tool_factory):
+    """Testa o icontains quando o índice não encontra nada (trecho no meio da palavra)"""
+    tool_factory(title="Furadeira", description="Potente")
+    tool_factory(title="Serra circular", description="Disco de 7 polegadas")
+    tool_factory(title="Motosserra", description="A gasolina")
+
+    substring = _items(api_client.get("/api/tools/?search=adeira"))
+    indexed = _items(api_client.get("/api/tools/?search=serra"))
+    ranked = _items(api_client.get("/api/tools/?search=adeira&ordering=relevance"))
+
+    assert [item["title"] for item in substring] == ["Furadeira"]
+    assert [item["title"] for item in ranked] == ["Furadeira"]
+    # Com resultados no índice o fallback não entra
+    assert [item["title"] for item in indexed] == ["Serra circular"]
+
+
+@pytest.mark.django_db
+def test_search_requires_all_terms(api_client, tool_factory):
+    """Testa que múltiplos termos são combinados com AND"""
+    tool_factory(title="Furadeira de impacto", description="Potente")
+    tool_factory(title="Furadeira simples", description="Leve")
+
+    response = api_client.get("/api/tools/?search=furadeira impacto")
+
+    items = _items(response)
+    assert [item["title"] for item in items] == ["Furadeira de impacto"]
+
+
+@pytest.mark.django_db
+def test_search_ordering_by_relevance(api_client, tool_factory):
+    """Testa ordenação por relevância: título pesa mais que descrição"""
+    in_description = tool_factory(title="Martelete", description="Melhor que uma furadeira comum")
+    in_title = tool_factory(title="Furadeira", description="Potente")
+
+    response = api_client.get("/api/tools/?search=furadeira&ordering=relevance")
+
+    items = _items(response)
+    assert [item["id"] for item in items] == [in_title.id, in_description.id]
+
+
+@pytest.mark.django_db
+def test_relevance_ordering_without_search_falls_back_to_default(api_client, tool_factory):
+    """Testa que ordering=relevance sem busca usa a ordenação padrão"""
+    first = tool_factory(title="Primeira")
+    second = tool_factory(title="Segunda")
+
+    response = api_client.get("/api/tools/?ordering=relevance")
+
+    items = _items(response)
+    assert [item["id"] for item in items] == [second.id, first.id]
+
+
+@pytest.mark.django_db
+def test_search_index_follows_updates_and_deletes(tool_factory):
+    """Testa que o documento de busca acompanha save e delete"""
+    tool = tool_factory(title="Furadeira", description="Potente")
+
+    tool.title = "Parafusadeira"
+    tool.save()
+    assert not Tool.objects.filter(pk__in=_search_ids("furadeira")).exists()
+    assert list(_search_ids("parafusadeira")) == [tool.pk]
+
+    tool.delete()
+    assert list(_search_ids("parafusadeira")) == []
+
+
+def _search_ids(term):
+    return search_tools(Tool.objects.all(), term).values_list("pk", flat=True)